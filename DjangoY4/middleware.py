@@ -0,0 +1,185 @@
+"""
+Per-request timings, reported as a Server-Timing header and in sampled log
+lines.
+
+ServerTimingMiddleware tracks the following for every request:
+
+- db: the number of SQL queries and the time spent in them. Each
+  connection gets one execute wrapper, which adds to the timings of the
+  request in the current context. Concurrent async requests that share a
+  connection are therefore counted apart.
+- serialize: time spent turning objects into data. Code that serializes
+  marks this with timed("serialize"); see tasks/serializers.py and
+  tasks/fast_serializers.py.
+- render: time spent rendering template and DRF responses.
+- total: the whole request, down to this middleware.
+
+Keep it early in MIDDLEWARE so that "total" covers the rest of the stack.
+The overhead is a context variable lookup and two perf_counter() calls
+per query and per span, plus a random() call per request to decide
+whether to log it.
+"""
+
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("DjangoY4.timing")
+
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.spans = {}
+        self._open = set()
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def metrics(self, total):
+        """(name, milliseconds, description) for each recorded metric."""
+        metrics = [("db", self.db_time * 1000, f"{self.db_queries} queries")]
+        metrics += [(name, seconds * 1000, "") for name, seconds in self.spans.items()]
+        metrics.append(("total", total * 1000, ""))
+        return metrics
+
+
+@contextmanager
+def timed(name):
+    """
+    Adds the time spent in the block to the current request's `name`
+    span. Nested blocks for the same span are counted once. Outside a
+    request this does nothing. Can also be used as a decorator.
+    """
+    timings = _current.get()
+    if timings is None or name in timings._open:
+        yield
+        return
+    timings._open.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._open.discard(name)
+        timings.add(name, time.perf_counter() - start)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_time += time.perf_counter() - start
+        timings.db_queries += 1
+
+
+def install_query_timer(connection):
+    """Adds the query timer to `connection` once."""
+    if _time_query not in connection.execute_wrappers:
+        # First, so connection.execute_wrapper() blocks, which pop the
+        # last wrapper, leave it in place
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+def _connection_created(sender, connection, **kwargs):
+    install_query_timer(connection)
+
+
+connection_created.connect(_connection_created)
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        # Connections opened before this module was imported
+        for alias in connections:
+            install_query_timer(connections[alias])
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        # sync_to_async copies this context into the ORM's thread, where
+        # _time_query finds it
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    def process_template_response(self, request, response):
+        # Called right before the response renders
+        timings = _current.get()
+        if timings is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                timings.add("render", time.perf_counter() - start)
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, timings):
+        total = time.perf_counter() - timings.start
+        metrics = timings.metrics(total)
+        if _setting("SERVER_TIMING_HEADER", True):
+            response["Server-Timing"] = ", ".join(
+                f'{name};dur={ms:.1f};desc="{desc}"' if desc else f"{name};dur={ms:.1f}"
+                for name, ms, desc in metrics
+            )
+        total_ms = total * 1000
+        slow = total_ms >= _setting("SERVER_TIMING_LOG_SLOW_MS", 1000)
+        if slow or random.random() < _setting("SERVER_TIMING_LOG_SAMPLE_RATE", 0.01):
+            self.log(request, response, timings, metrics, slow)
+        return response
+
+    def log(self, request, response, timings, metrics, slow):
+        match = request.resolver_match
+        record = {
+            "view": match.view_name if match else None,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "db_queries": timings.db_queries,
+        }
+        record.update({f"{name}_ms": round(ms, 1) for name, ms, _ in metrics})
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            json.dumps(record),
+            extra={"timing": record},
+        )
@@ -0,0 +1,38 @@
+"""
+Read routing for the "replica" database alias (see DB_READ_REPLICA in
+settings).
+
+Reads of models in READ_REPLICA_APPS go to the replica. All writes, and
+every other read, go to "default". A transaction on "default" keeps
+reading from "default", so it sees its own uncommitted writes.
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = "replica"
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in getattr(settings, "READ_REPLICA_APPS", ()):
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is the primary's file, or a copy of it
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
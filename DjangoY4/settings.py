@@ -30,15 +30,43 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# Mail is queued in the notifications outbox and delivered by the
+# drain_outbox worker through OUTBOX_DELIVERY_BACKEND
+EMAIL_BACKEND = "notifications.backends.OutboxEmailBackend"
+OUTBOX_DELIVERY_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_BACKOFF_BASE = 30
+OUTBOX_BACKOFF_MAX = 3600
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("GMAIL_APP_PASSWORD")
 
+# Minutes before the due date that send_reminders reminds an open task
+REMINDER_WINDOW_MINUTES = 60
+
+# Telegram notifications, sent by the dispatch_telegram worker
+TELEGRAM_BOT_TOKEN = config("TELEGRAM_BOT_TOKEN", default="")
+TELEGRAM_API_BASE_URL = "https://api.telegram.org/bot"
+TELEGRAM_CONCURRENCY = 8
+TELEGRAM_GLOBAL_RATE = 30
+TELEGRAM_CHAT_INTERVAL = 1.0
+
 STRIPE_PUBLISHABLE_KEY = config("STRIPE_PUBLISHABLE_KEY")
 STRIPE_SECRET_KEY = config("STRIPE_SECRET_KEY")
+# Signing secret of the webhook endpoint (/payment/webhook/)
+STRIPE_WEBHOOK_SECRET = config("STRIPE_WEBHOOK_SECRET", default="")
+STRIPE_API_BASE = "https://api.stripe.com"
+# The shared client (payments/stripe_client.py); timeouts in seconds
+STRIPE_CONNECT_TIMEOUT = 3.0
+STRIPE_READ_TIMEOUT = 15.0
+STRIPE_MAX_NETWORK_RETRIES = 2
+STRIPE_POOL_SIZE = 10
+# How long a Checkout session stays open, and so reusable (30 to 720)
+STRIPE_CHECKOUT_TTL_MINUTES = 30
+# Attempts before process_stripe_events gives up on an event
+STRIPE_EVENT_MAX_ATTEMPTS = 5
 
 # Application definition
 
@@ -58,9 +86,12 @@ INSTALLED_APPS = [
     "tasks",
     "accounts",
     "payments",
+    "notifications",
 ]
 
 MIDDLEWARE = [
+    # First, so its "total" covers everything below (DjangoY4/middleware.py)
+    "DjangoY4.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -70,11 +101,34 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Server-Timing headers, and one JSON log line ("DjangoY4.timing") for a
+# sample of requests plus every slow one
+SERVER_TIMING_HEADER = True
+SERVER_TIMING_LOG_SAMPLE_RATE = 0.01
+SERVER_TIMING_LOG_SLOW_MS = 1000
+
 ROOT_URLCONF = "DjangoY4.urls"
 
+# Local memory per process; a shared backend such as
+# "django.core.cache.backends.filebased.FileBasedCache" works as well
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "djangoy4",
+    }
+}
+
+# Serialized category/tag responses (tasks/cache.py)
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = 600
+
+# Token -> user lookups (accounts/authentication.py)
+TOKEN_CACHE_ALIAS = "default"
+TOKEN_CACHE_TIMEOUT = 300
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "accounts.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
 }
@@ -129,13 +183,61 @@ WSGI_APPLICATION = "DjangoY4.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Run on every new SQLite connection (bench_sqlite shows the effect)
+SQLITE_PRAGMAS = {
+    # Readers and the writer no longer block each other
+    "journal_mode": "WAL",
+    # With WAL, fsync at checkpoints only; a crash can't corrupt the file
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative means KiB: 64 MiB of page cache per connection
+    "cache_size": -64000,
+}
+SQLITE_OPTIONS = {
+    "init_command": ";".join(
+        f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+    ),
+    # busy_timeout: seconds to wait for another connection's write lock
+    "timeout": 20,
+    # Take the write lock when a transaction starts. A deferred transaction
+    # that reads and then writes fails with "database is locked" at once
+    # when another writer got in between; busy_timeout doesn't cover that
+    "transaction_mode": "IMMEDIATE",
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": SQLITE_OPTIONS,
+        # Seconds a connection is kept between requests; use 0 under ASGI,
+        # where connections don't outlive their thread-sensitive executor
+        "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Opt-in read routing for READ_REPLICA_APPS (DjangoY4/routers.py):
+# DB_READ_REPLICA=primary reads through a second, read-only connection to
+# the same file; a path reads from a replica file kept in sync elsewhere
+DB_READ_REPLICA = config("DB_READ_REPLICA", default="")
+READ_REPLICA_APPS = ["tasks"]
+if DB_READ_REPLICA:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": (
+            DATABASES["default"]["NAME"]
+            if DB_READ_REPLICA == "primary"
+            else DB_READ_REPLICA
+        ),
+        "OPTIONS": {
+            **SQLITE_OPTIONS,
+            "init_command": SQLITE_OPTIONS["init_command"] + ";PRAGMA query_only=ON",
+        },
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS = ["DjangoY4.routers.ReadReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -17,7 +17,15 @@ class CustomUserAdmin(UserAdmin):
         (None, {"fields": ("email", "password")}),
         (
             "Personal info",
-            {"fields": ("first_name", "last_name", "phone_number", "address")},
+            {
+                "fields": (
+                    "first_name",
+                    "last_name",
+                    "phone_number",
+                    "address",
+                    "telegram_chat_id",
+                )
+            },
         ),
         (
             "Permissions",
@@ -0,0 +1,122 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+# Prefix for every key written by the token cache
+KEY_PREFIX = "accounts:tokens"
+
+
+def _cache():
+    return caches[getattr(settings, "TOKEN_CACHE_ALIAS", "default")]
+
+
+def token_cache_key(key):
+    # Hashed so raw tokens never end up in cache keys (or file names)
+    return f"{KEY_PREFIX}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def invalidate_tokens(keys):
+    """Drops cached lookups for the given token keys."""
+    _cache().delete_many([token_cache_key(key) for key in keys])
+
+
+def _count(outcome):
+    cache = _cache()
+    key = f"{KEY_PREFIX}:stats:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+async def _acount(outcome):
+    cache = _cache()
+    key = f"{KEY_PREFIX}:stats:{outcome}"
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, timeout=None):
+            await cache.aincr(key)
+
+
+def token_cache_stats():
+    """Returns {"hits": n, "misses": n}."""
+    cache = _cache()
+    return {
+        outcome: cache.get(f"{KEY_PREFIX}:stats:{outcome}", 0)
+        for outcome in ("hits", "misses")
+    }
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that keeps the token (with its user) in the cache
+    for TOKEN_CACHE_TIMEOUT seconds, saving the token/user JOIN on every
+    request. accounts.signals drops entries when a token is deleted
+    (djoser's token_destroy) and when a user's password or is_active
+    changes, so the TTL only bounds how long other user edits take to show.
+
+    Settings:
+        TOKEN_CACHE_ALIAS    cache alias to use (default "default")
+        TOKEN_CACHE_TIMEOUT  seconds an entry lives (default 300)
+    """
+
+    def authenticate_credentials(self, key):
+        cache = _cache()
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            _count("misses")
+            user, token = super().authenticate_credentials(key)
+            # Pickled together with the select_related user
+            cache.set(cache_key, token, getattr(settings, "TOKEN_CACHE_TIMEOUT", 300))
+            return user, token
+
+        _count("hits")
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return token.user, token
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views: takes a plain HttpRequest and uses
+        the async cache and ORM APIs. Returns (user, token) or None.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_("Invalid token header."))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_("Invalid token header."))
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        cache = _cache()
+        cache_key = token_cache_key(key)
+        token = await cache.aget(cache_key)
+        if token is None:
+            await _acount("misses")
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related("user").aget(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            await cache.aset(
+                cache_key, token, getattr(settings, "TOKEN_CACHE_TIMEOUT", 300)
+            )
+        else:
+            await _acount("hits")
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return token.user, token
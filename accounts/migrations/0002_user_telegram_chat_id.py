@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="telegram_chat_id",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -43,6 +43,8 @@ class User(AbstractUser):
     # Your fields from the old Profile model are now here directly
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
+    # Chat that receives task reminders through the Telegram dispatcher
+    telegram_chat_id = models.CharField(max_length=64, blank=True, null=True)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
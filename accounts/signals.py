@@ -1,11 +1,25 @@
-from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
 
-from .models import Profile
+from .authentication import invalidate_tokens
 
+# --- Cached token lookups (accounts.authentication) ---
 
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    # Covers djoser's token_destroy (logout) and cascades from user deletes
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, created, update_fields=None, **kwargs):
     if created:
-        Profile.objects.create(user=instance)
+        return
+    # Logins only write last_login; anything that may touch the password or
+    # is_active (set_password, deactivation, admin edits) drops the entries
+    if update_fields is not None and not {"password", "is_active"} & set(update_fields):
+        return
+    invalidate_tokens(Token.objects.filter(user=instance).values_list("key", flat=True))
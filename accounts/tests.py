@@ -1,3 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from tasks.models import Category
+
+from .authentication import token_cache_stats
+
+User = get_user_model()
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="owner@example.com", password="pw")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        # Served from the response cache after the first request, so only
+        # authentication can hit the database
+        self.url = f"/api/categories/{Category.objects.create(name='Work').pk}/"
+
+    def test_token_lookup_is_cached(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(token_cache_stats(), {"hits": 1, "misses": 1})
+
+    def test_invalid_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token missing")
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_logout_invalidates(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.post("/api/auth/token/logout/").status_code, 204)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_password_change_invalidates(self):
+        self.client.get(self.url)
+        self.user.set_password("new")
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+        self.assertEqual(token_cache_stats()["misses"], 2)
+
+    def test_deactivation_invalidates(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_last_login_update_keeps_entry(self):
+        self.client.get(self.url)
+        self.user.save(update_fields=["last_login"])
+        self.client.get(self.url)
+        self.assertEqual(token_cache_stats(), {"hits": 1, "misses": 1})
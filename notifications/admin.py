@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from .models import EmailOutbox, ReminderWatermark, TelegramOutbox
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "next_attempt_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "from_email")
+    readonly_fields = ("message", "created_at", "sent_at")
+
+
+@admin.register(TelegramOutbox)
+class TelegramOutboxAdmin(admin.ModelAdmin):
+    list_display = ("chat_id", "status", "attempts", "next_attempt_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("chat_id", "text")
+    readonly_fields = ("created_at", "sent_at")
+
+
+@admin.register(ReminderWatermark)
+class ReminderWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("name", "due_date", "task_id", "updated_at")
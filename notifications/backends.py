@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import sanitize_address
+
+from .models import EmailOutbox
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Email backend that only writes messages to the EmailOutbox table; the
+    drain_outbox command delivers them through OUTBOX_DELIVERY_BACKEND.
+
+    Rows are inserted in the caller's transaction, so an email sent while
+    handling a request that rolls back is never delivered.
+    """
+
+    def send_messages(self, email_messages):
+        rows = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            encoding = message.encoding or settings.DEFAULT_CHARSET
+            rows.append(
+                EmailOutbox(
+                    # Addresses are sanitized as the SMTP backend would
+                    from_email=sanitize_address(message.from_email, encoding),
+                    recipients=[
+                        sanitize_address(address, encoding)
+                        for address in message.recipients()
+                    ],
+                    subject=str(message.subject)[:998],
+                    message=message.message().as_bytes(linesep="\r\n"),
+                )
+            )
+        EmailOutbox.objects.bulk_create(rows)
+        return len(rows)
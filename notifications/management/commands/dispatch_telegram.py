@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.telegram_dispatch import dispatch_due
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends queued Telegram messages over one pooled client, with bounded"
+        " concurrency and Telegram's per-chat and global rate limits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Messages claimed from the queue at a time.",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            help="Stop after this many batches (default: until nothing is due).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="Requests in flight at once (default: TELEGRAM_CONCURRENCY).",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling for due messages every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds between polls with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.TELEGRAM_BOT_TOKEN:
+            raise CommandError("TELEGRAM_BOT_TOKEN is not set.")
+        verbose = options["verbosity"] > 1
+
+        def on_batch(result):
+            if verbose:
+                self.stdout.write(
+                    f"  batch: {result.sent} sent, {result.retried} to retry,"
+                    f" {result.failed} failed, {result.rate_limited} rate limited"
+                )
+
+        while True:
+            started = time.perf_counter()
+            result = asyncio.run(
+                dispatch_due(
+                    max(1, options["batch_size"]),
+                    options["max_batches"],
+                    options["concurrency"],
+                    on_batch=on_batch,
+                )
+            )
+            elapsed = time.perf_counter() - started
+            handled = result.sent + result.retried + result.failed
+            if handled or not options["loop"]:
+                rate = result.sent / elapsed if elapsed else 0.0
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Sent {result.sent}, {result.retried} to retry,"
+                        f" {result.failed} failed, {result.rate_limited} rate"
+                        f" limited in {elapsed:.2f}s ({rate:.1f} messages/s)."
+                    )
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
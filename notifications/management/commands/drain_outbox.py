@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import drain
+
+
+class Command(BaseCommand):
+    help = (
+        "Delivers queued email from the outbox, one connection of"
+        " OUTBOX_DELIVERY_BACKEND per batch. Failed messages are retried with"
+        " exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Messages sent per connection.",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            help="Stop after this many batches (default: until nothing is due).",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling for due messages every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds between polls with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        verbose = options["verbosity"] > 1
+
+        def on_batch(result):
+            if verbose:
+                self.stdout.write(
+                    f"  batch: {result.sent} sent, {result.retried} to retry,"
+                    f" {result.failed} failed"
+                )
+
+        while True:
+            started = time.perf_counter()
+            result = drain(batch_size, options["max_batches"], on_batch=on_batch)
+            elapsed = time.perf_counter() - started
+            handled = result.sent + result.retried + result.failed
+            if handled or not options["loop"]:
+                rate = result.sent / elapsed if elapsed else 0.0
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Sent {result.sent}, {result.retried} to retry,"
+                        f" {result.failed} failed in {elapsed:.2f}s"
+                        f" ({rate:.0f} messages/s)."
+                    )
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
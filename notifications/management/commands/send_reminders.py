@@ -0,0 +1,41 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from notifications.reminders import send_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Queues email and Telegram reminders for open tasks that entered the"
+        " reminder window since the last run. Meant to run every minute or so."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window",
+            type=int,
+            help="Minutes before the due date to remind (default: REMINDER_WINDOW_MINUTES).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Tasks handled per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        window = options["window"]
+        started = time.perf_counter()
+        result = send_reminders(
+            window=None if window is None else timedelta(minutes=window),
+            batch_size=max(1, options["batch_size"]),
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reminded {result.tasks} tasks: queued {result.emails} emails and"
+                f" {result.telegram} Telegram messages in {elapsed:.2f}s."
+            )
+        )
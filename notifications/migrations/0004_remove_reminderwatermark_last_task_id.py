@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:20
+
+from django.db import migrations
+from django.db.models import F
+
+
+def mark_reminded_tasks(apps, schema_editor):
+    # Tasks behind the watermark were reminded before Task.reminded_due_date
+    # existed; don't remind them again
+    ReminderWatermark = apps.get_model("notifications", "ReminderWatermark")
+    Task = apps.get_model("tasks", "Task")
+    for watermark in ReminderWatermark.objects.all():
+        Task.objects.filter(due_date__lte=watermark.due_date).update(
+            reminded_due_date=F("due_date")
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_reminderwatermark"),
+        ("tasks", "0010_task_reminded_due_date"),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_reminded_tasks, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="reminderwatermark",
+            name="last_task_id",
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    SENT = "sent", "Sent"
+    FAILED = "failed", "Failed"
+
+
+class QueuedMessage(models.Model):
+    """Delivery state shared by the outbox tables."""
+
+    status = models.CharField(
+        max_length=10, choices=OutboxStatus.choices, default=OutboxStatus.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    # When the message is next due; also moved forward while a worker holds it
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+
+class EmailOutbox(QueuedMessage):
+    """
+    An email waiting to be delivered by the drain_outbox worker. The
+    message is stored as the exact MIME bytes the SMTP backend would send,
+    so attachments and alternatives survive unchanged.
+    """
+
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(help_text="Envelope recipients (to, cc and bcc).")
+    subject = models.CharField(max_length=998, blank=True)
+    message = models.BinaryField(help_text="The MIME message, CRLF line endings.")
+
+    class Meta:
+        verbose_name_plural = "Email outbox"
+        indexes = [
+            # The worker's "what is due" scan
+            models.Index(
+                fields=["status", "next_attempt_at", "id"], name="email_outbox_due_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
+
+
+class TelegramOutbox(QueuedMessage):
+    """A Telegram message waiting to be sent by the dispatch_telegram worker."""
+
+    chat_id = models.CharField(max_length=64)
+    text = models.TextField()
+
+    class Meta:
+        verbose_name_plural = "Telegram outbox"
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at", "id"],
+                name="telegram_outbox_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.chat_id}: {self.text[:50]}"
+
+
+class ReminderWatermark(models.Model):
+    """
+    How far the send_reminders scan has got: the (due_date, task id) of the
+    last task reminded.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    due_date = models.DateTimeField()
+    task_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.due_date} / {self.task_id}"
@@ -0,0 +1,202 @@
+"""
+Delivery of queued EmailOutbox rows (see drain_outbox), and the claim,
+retry and backoff helpers the Telegram dispatcher shares.
+
+Each batch is claimed, then sent over one connection of
+OUTBOX_DELIVERY_BACKEND. A failed message is retried with exponential
+backoff until OUTBOX_MAX_ATTEMPTS; permanent SMTP rejections (5xx) fail
+at once.
+
+Settings:
+    OUTBOX_DELIVERY_BACKEND  backend that really sends (default: SMTP)
+    OUTBOX_MAX_ATTEMPTS      attempts before a message is marked failed (8)
+    OUTBOX_BACKOFF_BASE      seconds before the first retry, doubled per attempt (30)
+    OUTBOX_BACKOFF_MAX       longest wait between attempts, in seconds (3600)
+    OUTBOX_LEASE             seconds a claimed batch is hidden from other workers (300)
+"""
+
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox, OutboxStatus
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class _RawMIME:
+    """Stands in for the MIME object EmailMessage.message() returns."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def as_bytes(self, unixfrom=False, linesep="\n"):
+        # Stored with CRLF endings, which is what the SMTP backend asks for
+        if linesep == "\r\n":
+            return self.raw
+        return self.raw.replace(b"\r\n", linesep.encode())
+
+    def as_string(self, unixfrom=False, linesep="\n"):
+        return self.as_bytes(linesep=linesep).decode("utf-8", "replace")
+
+
+class StoredEmailMessage(EmailMessage):
+    """An EmailMessage that sends the stored MIME bytes of an outbox row."""
+
+    def __init__(self, row):
+        super().__init__(
+            subject=row.subject, from_email=row.from_email, to=row.recipients
+        )
+        self.row = row
+
+    def message(self, *args, **kwargs):
+        return _RawMIME(bytes(self.row.message))
+
+
+def backoff_delay(attempts):
+    """Seconds to wait after the given number of failed attempts."""
+    base = _setting("OUTBOX_BACKOFF_BASE", 30)
+    return min(base * 2 ** max(attempts - 1, 0), _setting("OUTBOX_BACKOFF_MAX", 3600))
+
+
+def claim_batch(batch_size, model=EmailOutbox):
+    """
+    Returns up to `batch_size` due rows of `model`, oldest first. They are leased
+    by moving next_attempt_at forward: if the worker dies, they become due
+    again when the lease runs out, and a concurrent worker skips them.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=_setting("OUTBOX_LEASE", 300))
+    with transaction.atomic():
+        ids = list(
+            model.objects.filter(status=OutboxStatus.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        model.objects.filter(pk__in=ids, next_attempt_at__lte=now).update(
+            next_attempt_at=lease_until
+        )
+    # The exact lease timestamp tells our rows from any another worker took
+    return list(
+        model.objects.filter(pk__in=ids, next_attempt_at=lease_until).order_by(
+            "next_attempt_at", "id"
+        )
+    )
+
+
+def _is_permanent(exc):
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in exc.recipients.values()]
+        return bool(codes) and all(code >= 500 for code in codes)
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+def _is_connection_error(exc):
+    # SMTPException subclasses OSError; only a reply about one message
+    # leaves the connection usable
+    return isinstance(exc, OSError) and not isinstance(
+        exc, smtplib.SMTPResponseException | smtplib.SMTPRecipientsRefused
+    )
+
+
+class DeliveryResult:
+    def __init__(self):
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def __iadd__(self, other):
+        self.sent += other.sent
+        self.retried += other.retried
+        self.failed += other.failed
+        return self
+
+
+def record_failure(row, exc, result, permanent=False):
+    """Schedules a retry of `row` after backoff, or fails it for good."""
+    row.attempts += 1
+    row.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+    if permanent or row.attempts >= _setting("OUTBOX_MAX_ATTEMPTS", 8):
+        row.status = OutboxStatus.FAILED
+        result.failed += 1
+    else:
+        row.next_attempt_at = timezone.now() + timedelta(
+            seconds=backoff_delay(row.attempts)
+        )
+        result.retried += 1
+    row.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def mark_sent(model, ids, result):
+    model.objects.filter(pk__in=ids).update(
+        status=OutboxStatus.SENT, sent_at=timezone.now(), last_error=""
+    )
+    result.sent += len(ids)
+
+
+def deliver(rows, connection=None):
+    """
+    Sends `rows` over a single connection, one send_messages() call per
+    message so each result is known. Returns a DeliveryResult.
+    """
+    result = DeliveryResult()
+    if not rows:
+        return result
+    connection = connection or get_connection(
+        _setting(
+            "OUTBOX_DELIVERY_BACKEND", "django.core.mail.backends.smtp.EmailBackend"
+        )
+    )
+    sent_ids = []
+    try:
+        connection.open()
+    except Exception as exc:
+        for row in rows:
+            record_failure(row, exc, result)
+        return result
+
+    try:
+        for index, row in enumerate(rows):
+            try:
+                connection.send_messages([StoredEmailMessage(row)])
+            except Exception as exc:
+                record_failure(row, exc, result, permanent=_is_permanent(exc))
+                if _is_connection_error(exc):
+                    # The rest would fail the same way; try them again later
+                    for pending in rows[index + 1 :]:
+                        record_failure(pending, exc, result)
+                    break
+            else:
+                sent_ids.append(row.pk)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+        mark_sent(EmailOutbox, sent_ids, result)
+    return result
+
+
+def drain(batch_size=100, max_batches=None, on_batch=None):
+    """
+    Delivers due messages batch by batch until none are left (or after
+    `max_batches`). Returns the combined DeliveryResult.
+    """
+    total = DeliveryResult()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        rows = claim_batch(batch_size)
+        if not rows:
+            break
+        result = deliver(rows)
+        total += result
+        batches += 1
+        if on_batch is not None:
+            on_batch(result)
+    return total
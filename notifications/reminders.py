@@ -0,0 +1,148 @@
+"""
+Due-date reminders (see send_reminders).
+
+Each run reminds owners of open tasks that have entered the reminder
+window, i.e. that are due within REMINDER_WINDOW_MINUTES. It does not
+rescan the table. A ReminderWatermark stores the (due_date, id) of the
+last task reminded, so the main scan is a range walk of
+task_due_status_idx past that point.
+
+Each reminded task records the due date it was reminded of in
+Task.reminded_due_date. Tasks can still land behind the watermark: a
+task created due in ten minutes, or one whose due date was edited,
+including after its reminder went out. A catch-up scan walks the short
+range from now to the watermark for tasks not yet reminded of their
+current due date.
+
+Every batch queues its email and Telegram messages, marks its tasks and
+moves the watermark in one transaction, so a task is reminded at most
+once per due date, even if the run dies part-way.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from tasks.models import Task, TaskStatus
+
+from .models import ReminderWatermark, TelegramOutbox
+
+WATERMARK_NAME = "task_due"
+OPEN_STATUSES = [
+    TaskStatus.INIT.value,
+    TaskStatus.TODO.value,
+    TaskStatus.IN_PROGRESS.value,
+]
+REMINDER_FIELDS = ("id", "title", "due_date", "user__email", "user__telegram_chat_id")
+
+
+class ReminderResult:
+    def __init__(self):
+        self.tasks = 0
+        self.emails = 0
+        self.telegram = 0
+
+
+def _format_task(task):
+    due = timezone.localtime(task.due_date).strftime("%Y-%m-%d %H:%M")
+    return f"- {task.title} (due {due})"
+
+
+def queue_reminders(tasks, result):
+    """Queues one email, and one Telegram message if set up, per owner."""
+    by_user = defaultdict(list)
+    for task in tasks:
+        by_user[task.user].append(task)
+
+    emails = []
+    messages = []
+    for user, user_tasks in by_user.items():
+        count = len(user_tasks)
+        subject = f"{count} task{'s' if count != 1 else ''} due soon"
+        body = "\n".join(_format_task(task) for task in user_tasks)
+        emails.append(
+            EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [user.email])
+        )
+        if user.telegram_chat_id:
+            messages.append(
+                TelegramOutbox(
+                    chat_id=user.telegram_chat_id, text=f"{subject}:\n{body}"
+                )
+            )
+
+    # With the outbox backend this is a single insert in our transaction
+    result.emails += get_connection().send_messages(emails) or 0
+    TelegramOutbox.objects.bulk_create(messages)
+    result.telegram += len(messages)
+    result.tasks += len(tasks)
+
+
+def _open_tasks():
+    """Open tasks not yet reminded of their current due date."""
+    return (
+        Task.objects.filter(status__in=OPEN_STATUSES)
+        .exclude(reminded_due_date=F("due_date"))
+        .select_related("user")
+        .only(*REMINDER_FIELDS)
+    )
+
+
+def _mark_reminded(tasks):
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+        reminded_due_date=F("due_date")
+    )
+
+
+def send_reminders(window=None, batch_size=500, now=None):
+    """Reminds every task that entered the window since the last run."""
+    now = now or timezone.now()
+    if window is None:
+        window = timedelta(minutes=getattr(settings, "REMINDER_WINDOW_MINUTES", 60))
+    horizon = now + window
+    watermark, _ = ReminderWatermark.objects.get_or_create(
+        name=WATERMARK_NAME, defaults={"due_date": now}
+    )
+    result = ReminderResult()
+
+    # Catch-up: tasks behind the watermark that are not overdue yet. The
+    # range is at most one window wide, and every batch marks its tasks
+    # reminded, so the next one starts over from the front.
+    behind = Q(due_date__lt=watermark.due_date) | Q(
+        due_date=watermark.due_date, id__lte=watermark.task_id
+    )
+    while True:
+        with transaction.atomic():
+            tasks = list(
+                _open_tasks()
+                .filter(behind, due_date__gt=now)
+                .order_by("due_date", "id")[:batch_size]
+            )
+            if not tasks:
+                break
+            queue_reminders(tasks, result)
+            _mark_reminded(tasks)
+
+    # Main scan: walk task_due_status_idx from the watermark to the horizon
+    while True:
+        ahead = Q(due_date__gt=watermark.due_date) | Q(
+            due_date=watermark.due_date, id__gt=watermark.task_id
+        )
+        with transaction.atomic():
+            tasks = list(
+                _open_tasks()
+                .filter(ahead, due_date__lte=horizon)
+                .order_by("due_date", "id")[:batch_size]
+            )
+            if not tasks:
+                break
+            queue_reminders(tasks, result)
+            _mark_reminded(tasks)
+            watermark.due_date = tasks[-1].due_date
+            watermark.task_id = tasks[-1].id
+            watermark.save(update_fields=["due_date", "task_id", "updated_at"])
+    return result
@@ -0,0 +1,202 @@
+"""
+Sends queued TelegramOutbox rows (see dispatch_telegram).
+
+One telegram.Bot, and so one pooled HTTP client, serves the whole run.
+Up to TELEGRAM_CONCURRENCY requests are in flight, paced to Telegram's
+limits: one message per chat per TELEGRAM_CHAT_INTERVAL seconds and
+TELEGRAM_GLOBAL_RATE messages per second overall. A 429 (RetryAfter)
+pauses all sending for the time Telegram asks, then the message is tried
+again.
+
+Each outcome is saved as soon as its send finishes. A row whose lease
+(OUTBOX_LEASE) has run out before its turn comes is left alone, since
+another worker may have claimed it by then; it is sent with a later
+batch.
+
+Settings:
+    TELEGRAM_BOT_TOKEN
+    TELEGRAM_API_BASE_URL    Bot API URL the token is appended to
+    TELEGRAM_CONCURRENCY     requests in flight at once (8)
+    TELEGRAM_GLOBAL_RATE     messages per second over all chats (30)
+    TELEGRAM_CHAT_INTERVAL   seconds between messages to one chat (1.0)
+"""
+
+import asyncio
+from datetime import timedelta
+
+import telegram
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from telegram.error import BadRequest, ChatMigrated, Forbidden, RetryAfter
+from telegram.request import HTTPXRequest
+
+from .models import TelegramOutbox
+from .outbox import DeliveryResult, claim_batch, mark_sent, record_failure
+
+# Times one message may be put back after a RetryAfter within a run
+MAX_RETRY_AFTER = 3
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def queue_telegram(chat_id, text):
+    """Queues a message for the dispatcher; returns the TelegramOutbox row."""
+    return TelegramOutbox.objects.create(chat_id=str(chat_id), text=text)
+
+
+class RateLimiter:
+    """
+    Paces sends per chat and globally. Slots are reserved in call order,
+    so messages to one chat go out in the order they were queued.
+    """
+
+    def __init__(self, global_rate, chat_interval):
+        self.global_interval = 1 / global_rate if global_rate else 0.0
+        self.chat_interval = chat_interval
+        self._global_next = 0.0
+        self._chat_next = {}
+        self._paused_until = 0.0
+
+    async def wait_for_chat(self, chat_id):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        at = max(now, self._chat_next.get(chat_id, 0.0))
+        self._chat_next[chat_id] = at + self.chat_interval
+        await asyncio.sleep(at - now)
+
+    async def wait_for_slot(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            at = max(now, self._global_next)
+            self._global_next = at + self.global_interval
+            await asyncio.sleep(at - now)
+            # A RetryAfter may have arrived while we slept
+            if loop.time() >= self._paused_until:
+                return
+
+    def pause(self, seconds):
+        until = asyncio.get_running_loop().time() + seconds
+        self._paused_until = max(self._paused_until, until)
+
+
+class LeaseExpired(Exception):
+    pass
+
+
+def _retry_after_seconds(exc):
+    value = exc.retry_after
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+class DispatchResult(DeliveryResult):
+    def __init__(self):
+        super().__init__()
+        self.rate_limited = 0
+
+    def __iadd__(self, other):
+        super().__iadd__(other)
+        self.rate_limited += other.rate_limited
+        return self
+
+
+def make_bot(concurrency=None):
+    concurrency = concurrency or _setting("TELEGRAM_CONCURRENCY", 8)
+    return telegram.Bot(
+        token=settings.TELEGRAM_BOT_TOKEN,
+        base_url=_setting("TELEGRAM_API_BASE_URL", "https://api.telegram.org/bot"),
+        request=HTTPXRequest(connection_pool_size=concurrency),
+    )
+
+
+class TelegramDispatcher:
+    """
+    Sends claimed rows through an initialized `bot`. Use dispatch() for a
+    batch, or run() to drain everything that is due.
+    """
+
+    def __init__(self, bot, concurrency=None, limiter=None):
+        self.bot = bot
+        self.concurrency = concurrency or _setting("TELEGRAM_CONCURRENCY", 8)
+        self.limiter = limiter or RateLimiter(
+            _setting("TELEGRAM_GLOBAL_RATE", 30),
+            _setting("TELEGRAM_CHAT_INTERVAL", 1.0),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def send(self, row, result):
+        """
+        Returns None when sent, else (exception, permanent). Raises
+        LeaseExpired if the row's lease ran out before it could be sent.
+        """
+        # Waiting for the chat doesn't hold a concurrency slot
+        await self.limiter.wait_for_chat(row.chat_id)
+        for _ in range(MAX_RETRY_AFTER + 1):
+            async with self._semaphore:
+                await self.limiter.wait_for_slot()
+                # claim_batch() leased the row until next_attempt_at
+                if timezone.now() >= row.next_attempt_at:
+                    raise LeaseExpired
+                try:
+                    await self.bot.send_message(chat_id=row.chat_id, text=row.text)
+                except RetryAfter as exc:
+                    result.rate_limited += 1
+                    self.limiter.pause(_retry_after_seconds(exc))
+                    error = (exc, False)
+                except (BadRequest, ChatMigrated, Forbidden) as exc:
+                    return exc, True
+                except telegram.error.TelegramError as exc:
+                    return exc, False
+                else:
+                    return None
+        return error
+
+    async def dispatch(self, rows):
+        result = DispatchResult()
+        await asyncio.gather(*(self.deliver(row, result) for row in rows))
+        return result
+
+    async def deliver(self, row, result):
+        try:
+            outcome = await self.send(row, result)
+        except LeaseExpired:
+            return
+        await sync_to_async(self._record)(row, outcome, result)
+
+    def _record(self, row, outcome, result):
+        if outcome is None:
+            mark_sent(TelegramOutbox, [row.pk], result)
+        else:
+            exc, permanent = outcome
+            record_failure(row, exc, result, permanent=permanent)
+
+    async def run(self, batch_size=500, max_batches=None, on_batch=None):
+        total = DispatchResult()
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            rows = await sync_to_async(claim_batch)(batch_size, TelegramOutbox)
+            if not rows:
+                break
+            result = await self.dispatch(rows)
+            total += result
+            batches += 1
+            if on_batch is not None:
+                on_batch(result)
+        return total
+
+
+async def dispatch_due(
+    batch_size=500, max_batches=None, concurrency=None, on_batch=None
+):
+    """Sends everything due with one Bot; returns the DispatchResult."""
+    async with make_bot(concurrency) as bot:
+        dispatcher = TelegramDispatcher(bot, concurrency=concurrency)
+        return await dispatcher.run(batch_size, max_batches, on_batch)
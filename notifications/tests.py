@@ -0,0 +1,529 @@
+import asyncio
+import json
+import socketserver
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Category, Task, TaskStatus
+
+from .models import EmailOutbox, OutboxStatus, ReminderWatermark, TelegramOutbox
+from .outbox import backoff_delay, claim_batch, drain
+from .reminders import _open_tasks, send_reminders
+from .telegram_dispatch import RateLimiter, TelegramDispatcher, make_bot, queue_telegram
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """
+    A minimal SMTP server on localhost. Records connections and delivered
+    messages; recipients listed in `reject` get a 550.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, reject=()):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.reject = set(reject)
+        self.connections = 0
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 stub ESMTP")
+        recipients = []
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb == "EHLO":
+                self.reply("250-stub")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 stub")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                if address in server.reject:
+                    self.reply("550 No such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(chunk)
+                with server.lock:
+                    server.messages.append((recipients, b"".join(data)))
+                self.reply("250 Queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+
+def smtp_settings(port):
+    return override_settings(
+        OUTBOX_DELIVERY_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+        EMAIL_HOST="127.0.0.1",
+        EMAIL_PORT=port,
+        EMAIL_USE_TLS=False,
+        EMAIL_HOST_USER="",
+        EMAIL_HOST_PASSWORD="",
+        EMAIL_TIMEOUT=5,
+    )
+
+
+@override_settings(EMAIL_BACKEND="notifications.backends.OutboxEmailBackend")
+class EmailOutboxTests(TestCase):
+    def queue(self, count, to="user{}@example.com"):
+        for i in range(count):
+            mail.send_mail(
+                f"Subject {i}", "Body", "noreply@example.com", [to.format(i)]
+            )
+
+    def test_backend_queues_instead_of_sending(self):
+        self.queue(3)
+        self.assertEqual(len(mail.outbox), 0)
+        rows = list(EmailOutbox.objects.order_by("id"))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0].recipients, ["user0@example.com"])
+        self.assertEqual(rows[0].status, OutboxStatus.PENDING)
+        self.assertIn(b"Subject: Subject 0\r\n", bytes(rows[0].message))
+
+    def test_rolled_back_mail_is_not_queued(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.queue(1)
+                raise RuntimeError
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_batch_is_sent_over_one_connection(self):
+        self.queue(5)
+        with SMTPStub() as stub, smtp_settings(stub.port):
+            result = drain(batch_size=10)
+        self.assertEqual((result.sent, result.retried, result.failed), (5, 0, 0))
+        self.assertEqual(stub.connections, 1)
+        self.assertEqual(len(stub.messages), 5)
+        self.assertEqual(stub.messages[0][0], ["user0@example.com"])
+        self.assertIn(b"Subject: Subject 0", stub.messages[0][1])
+        self.assertEqual(
+            EmailOutbox.objects.filter(status=OutboxStatus.SENT).count(), 5
+        )
+
+    def test_one_connection_per_batch(self):
+        self.queue(5)
+        with SMTPStub() as stub, smtp_settings(stub.port):
+            result = drain(batch_size=2)
+        self.assertEqual(result.sent, 5)
+        self.assertEqual(stub.connections, 3)
+
+    def test_rejected_recipient_fails_without_blocking_the_batch(self):
+        self.queue(3)
+        with SMTPStub(reject={"user1@example.com"}) as stub, smtp_settings(stub.port):
+            result = drain()
+        self.assertEqual((result.sent, result.failed), (2, 1))
+        failed = EmailOutbox.objects.get(status=OutboxStatus.FAILED)
+        self.assertEqual(failed.recipients, ["user1@example.com"])
+        self.assertIn("550", failed.last_error)
+
+    @override_settings(OUTBOX_BACKOFF_BASE=60, OUTBOX_MAX_ATTEMPTS=2)
+    def test_unreachable_server_is_retried_with_backoff(self):
+        self.queue(2)
+        with SMTPStub() as stub:
+            port = stub.port
+        # Nothing listens on the port any more
+        with smtp_settings(port):
+            before = timezone.now()
+            result = drain()
+            self.assertEqual((result.sent, result.retried), (0, 2))
+            row = EmailOutbox.objects.first()
+            self.assertEqual(row.attempts, 1)
+            self.assertEqual(row.status, OutboxStatus.PENDING)
+            self.assertGreaterEqual(row.next_attempt_at, before + timedelta(seconds=60))
+            self.assertTrue(row.last_error)
+
+            # Not due yet, so a second run does nothing
+            self.assertEqual(drain().retried, 0)
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            result = drain()
+        self.assertEqual(result.failed, 2)
+        self.assertEqual(
+            EmailOutbox.objects.filter(status=OutboxStatus.FAILED).count(), 2
+        )
+
+    @override_settings(OUTBOX_BACKOFF_BASE=30, OUTBOX_BACKOFF_MAX=300)
+    def test_backoff_doubles_up_to_the_cap(self):
+        self.assertEqual(
+            [backoff_delay(n) for n in range(1, 7)], [30, 60, 120, 240, 300, 300]
+        )
+
+    def test_claimed_rows_are_leased(self):
+        self.queue(3)
+        self.assertEqual(len(claim_batch(2)), 2)
+        # Another worker only sees what is left
+        self.assertEqual(len(claim_batch(10)), 1)
+        self.assertEqual(claim_batch(10), [])
+
+    def test_drain_outbox_command(self):
+        self.queue(2)
+        out = StringIO()
+        with SMTPStub() as stub, smtp_settings(stub.port):
+            call_command("drain_outbox", "--batch-size", "10", stdout=out)
+        self.assertIn("Sent 2, 0 to retry, 0 failed", out.getvalue())
+        self.assertEqual(len(stub.messages), 2)
+
+
+class BotAPIStub(ThreadingHTTPServer):
+    """
+    A local stand-in for the Telegram Bot API. Records (chat_id, time) of
+    every delivered message. The first `flood` sendMessage calls get a 429
+    with retry_after=1; chats in `blocked` get a 403 and chats in `dropped`
+    have the connection closed without a reply.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, flood=0, blocked=(), dropped=()):
+        super().__init__(("127.0.0.1", 0), BotAPIHandler)
+        self.flood = flood
+        self.blocked = set(blocked)
+        self.dropped = set(dropped)
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/bot"
+
+
+class BotAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            params = json.loads(body or b"{}")
+        else:
+            params = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        method = self.path.rsplit("/", 1)[-1]
+        if method == "getMe":
+            return self.respond(
+                200,
+                {
+                    "ok": True,
+                    "result": {"id": 1, "is_bot": True, "first_name": "Stub"},
+                },
+            )
+        chat_id = str(params.get("chat_id"))
+        if chat_id in server.dropped:
+            self.close_connection = True
+            return
+        with server.lock:
+            if server.flood > 0:
+                server.flood -= 1
+                return self.respond(
+                    429,
+                    {
+                        "ok": False,
+                        "error_code": 429,
+                        "description": "Too Many Requests: retry after 1",
+                        "parameters": {"retry_after": 1},
+                    },
+                )
+            if chat_id in server.blocked:
+                return self.respond(
+                    403,
+                    {
+                        "ok": False,
+                        "error_code": 403,
+                        "description": "Forbidden: bot was blocked by the user",
+                    },
+                )
+            server.sent.append((chat_id, time.monotonic()))
+        self.respond(
+            200,
+            {
+                "ok": True,
+                "result": {
+                    "message_id": len(server.sent),
+                    "date": int(time.time()),
+                    "chat": {"id": int(chat_id), "type": "private"},
+                    "text": params.get("text", ""),
+                },
+            },
+        )
+
+
+@override_settings(TELEGRAM_BOT_TOKEN="123:stub")
+class TelegramDispatcherTests(TestCase):
+    def run_dispatcher(self, stub, global_rate=1000, chat_interval=0.0, **kwargs):
+        async def run():
+            with override_settings(TELEGRAM_API_BASE_URL=stub.base_url):
+                bot = make_bot(concurrency=4)
+            async with bot:
+                limiter = RateLimiter(global_rate, chat_interval)
+                dispatcher = TelegramDispatcher(bot, concurrency=4, limiter=limiter)
+                return await dispatcher.run(**kwargs)
+
+        return run()
+
+    async def test_sends_queued_messages(self):
+        for i in range(10):
+            await sync_to_async(queue_telegram)(100 + i, f"Message {i}")
+        with BotAPIStub() as stub:
+            result = await self.run_dispatcher(stub)
+        self.assertEqual((result.sent, result.retried, result.failed), (10, 0, 0))
+        self.assertEqual(len(stub.sent), 10)
+        self.assertEqual(
+            await TelegramOutbox.objects.filter(status=OutboxStatus.SENT).acount(), 10
+        )
+
+    async def test_per_chat_and_global_rate_limits(self):
+        for i in range(3):
+            await sync_to_async(queue_telegram)(1, f"Message {i}")
+        for i in range(4):
+            await sync_to_async(queue_telegram)(2 + i, f"Message {i}")
+        with BotAPIStub() as stub:
+            result = await self.run_dispatcher(stub, global_rate=20, chat_interval=0.3)
+        self.assertEqual(result.sent, 7)
+        same_chat = [at for chat, at in stub.sent if chat == "1"]
+        gaps = [b - a for a, b in zip(same_chat, same_chat[1:])]
+        self.assertTrue(all(gap >= 0.25 for gap in gaps), gaps)
+        times = sorted(at for _, at in stub.sent)
+        # 20 per second: seven sends span at least six 50 ms slots
+        self.assertGreaterEqual(times[-1] - times[0], 0.25)
+
+    async def test_retry_after_pauses_and_resends(self):
+        await sync_to_async(queue_telegram)(1, "Hello")
+        await sync_to_async(queue_telegram)(2, "World")
+        with BotAPIStub(flood=1) as stub:
+            started = time.monotonic()
+            result = await self.run_dispatcher(stub)
+        self.assertEqual((result.sent, result.rate_limited), (2, 1))
+        self.assertGreaterEqual(max(at for _, at in stub.sent) - started, 0.9)
+
+    async def test_blocked_chat_fails_permanently(self):
+        await sync_to_async(queue_telegram)(1, "Hello")
+        await sync_to_async(queue_telegram)(2, "World")
+        with BotAPIStub(blocked={"2"}) as stub:
+            result = await self.run_dispatcher(stub)
+        self.assertEqual((result.sent, result.failed), (1, 1))
+        row = await TelegramOutbox.objects.aget(chat_id="2")
+        self.assertEqual(row.status, OutboxStatus.FAILED)
+        self.assertIn("blocked", row.last_error)
+
+    @override_settings(OUTBOX_BACKOFF_BASE=60)
+    async def test_network_error_is_retried_with_backoff(self):
+        await sync_to_async(queue_telegram)(1, "Hello")
+        await sync_to_async(queue_telegram)(2, "World")
+        with BotAPIStub(dropped={"1"}) as stub:
+            result = await self.run_dispatcher(stub)
+        self.assertEqual((result.sent, result.retried), (1, 1))
+        row = await TelegramOutbox.objects.aget(chat_id="1")
+        self.assertEqual((row.status, row.attempts), (OutboxStatus.PENDING, 1))
+        self.assertGreater(row.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+    async def test_outcomes_are_saved_as_each_send_finishes(self):
+        await sync_to_async(queue_telegram)(1, "Hello")
+        await sync_to_async(queue_telegram)(1, "World")
+        with BotAPIStub() as stub:
+            # Interrupted between the two sends to the chat
+            with self.assertRaises(TimeoutError):
+                await asyncio.wait_for(
+                    self.run_dispatcher(stub, chat_interval=1.0), 0.5
+                )
+        self.assertEqual(len(stub.sent), 1)
+        statuses = [row.status async for row in TelegramOutbox.objects.order_by("pk")]
+        self.assertEqual(statuses, [OutboxStatus.SENT, OutboxStatus.PENDING])
+
+    @override_settings(OUTBOX_LEASE=0.5)
+    async def test_rows_whose_lease_ran_out_are_not_sent(self):
+        await sync_to_async(queue_telegram)(1, "Hello")
+        await sync_to_async(queue_telegram)(1, "World")
+        with BotAPIStub() as stub:
+            result = await self.run_dispatcher(stub, chat_interval=1.0, max_batches=1)
+        self.assertEqual((result.sent, len(stub.sent)), (1, 1))
+        row = await TelegramOutbox.objects.order_by("pk").alast()
+        self.assertEqual((row.status, row.attempts), (OutboxStatus.PENDING, 0))
+        # Due again for whichever worker claims it next
+        self.assertLessEqual(row.next_attempt_at, timezone.now())
+
+
+class ReminderTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(email="owner@example.com", password="pw")
+        self.other = User.objects.create_user(
+            email="other@example.com", password="pw", telegram_chat_id="42"
+        )
+        self.category = Category.objects.create(name="Work")
+        self.now = timezone.now()
+
+    def task(self, minutes, user=None, status=TaskStatus.TODO):
+        return Task.objects.create(
+            title=f"Due in {minutes}",
+            user=user or self.user,
+            category=self.category,
+            status=status.value,
+            due_date=self.now + timedelta(minutes=minutes),
+        )
+
+    def remind(self, minutes_later=0, **kwargs):
+        now = self.now + timedelta(minutes=minutes_later)
+        return send_reminders(window=timedelta(minutes=60), now=now, **kwargs)
+
+    def test_reminds_tasks_entering_the_window_once(self):
+        self.task(30)
+        self.task(50, user=self.other)
+        self.task(40, status=TaskStatus.DONE)
+        self.task(90)
+        self.task(-10)
+
+        result = self.remind()
+        self.assertEqual((result.tasks, result.emails, result.telegram), (2, 2, 1))
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["other@example.com", "owner@example.com"],
+        )
+        self.assertIn("Due in 30", mail.outbox[0].body + mail.outbox[1].body)
+        self.assertEqual(TelegramOutbox.objects.get().chat_id, "42")
+
+        # Nothing new; then the 90 minute task enters the window
+        self.assertEqual(self.remind(minutes_later=10).tasks, 0)
+        result = self.remind(minutes_later=40)
+        self.assertEqual(result.tasks, 1)
+        self.assertIn("Due in 90", mail.outbox[-1].body)
+        self.assertEqual(self.remind(minutes_later=41).tasks, 0)
+
+    def test_catches_tasks_created_behind_the_watermark(self):
+        self.task(50)
+        self.assertEqual(self.remind().tasks, 1)
+        # Due before the watermark (50 minutes), created after the run
+        late = self.task(10)
+        self.task(-5)
+        result = self.remind(minutes_later=1)
+        self.assertEqual(result.tasks, 1)
+        self.assertIn(late.title, mail.outbox[-1].body)
+        self.assertEqual(self.remind(minutes_later=2).tasks, 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def edit(self, task, **changes):
+        # As a request would: load, change, save
+        task = Task.objects.get(pk=task.pk)
+        for name, value in changes.items():
+            setattr(task, name, value)
+        task.save()
+
+    def test_reminds_again_after_the_due_date_moves(self):
+        task = self.task(50)
+        self.assertEqual(self.remind().tasks, 1)
+        # Moved behind the watermark, then forward again
+        self.edit(task, due_date=self.now + timedelta(minutes=20))
+        self.assertEqual(self.remind(minutes_later=1).tasks, 1)
+        self.assertEqual(self.remind(minutes_later=2).tasks, 0)
+        self.edit(task, due_date=self.now + timedelta(minutes=100))
+        self.assertEqual(self.remind(minutes_later=3).tasks, 0)
+        self.assertEqual(self.remind(minutes_later=45).tasks, 1)
+        # Other edits don't count as a new due date
+        self.edit(task, title="Renamed")
+        self.assertEqual(self.remind(minutes_later=46).tasks, 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_saving_a_stale_task_does_not_remind_it_again(self):
+        task = self.task(50)
+        stale = Task.objects.get(pk=task.pk)
+        self.assertEqual(self.remind().tasks, 1)
+        stale.title = "Edited meanwhile"
+        stale.save()
+        # The task sits at the watermark, where only the catch-up scan looks
+        self.assertEqual(self.remind(minutes_later=1).tasks, 0)
+        self.assertEqual(len(mail.outbox), 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.title, "Edited meanwhile")
+
+    def test_batches_group_messages_per_user(self):
+        for minutes in (5, 10, 15, 20):
+            self.task(minutes)
+        self.task(25, user=self.other)
+        result = self.remind(batch_size=2)
+        self.assertEqual((result.tasks, result.emails), (5, 3))
+        self.assertEqual(mail.outbox[0].subject, "2 tasks due soon")
+        watermark = ReminderWatermark.objects.get()
+        self.assertEqual(watermark.due_date, self.now + timedelta(minutes=25))
+        self.assertEqual(self.remind(minutes_later=1, batch_size=2).tasks, 0)
+
+    @override_settings(EMAIL_BACKEND="notifications.backends.OutboxEmailBackend")
+    def test_reminders_queue_through_the_outbox(self):
+        self.task(30)
+        self.remind()
+        self.assertEqual(EmailOutbox.objects.get().recipients, ["owner@example.com"])
+
+    def test_scan_uses_the_due_date_index(self):
+        plan = (
+            _open_tasks()
+            .filter(
+                Q(due_date__gt=self.now) | Q(due_date=self.now, id__gt=1),
+                due_date__lte=self.now + timedelta(hours=1),
+            )
+            .order_by("due_date", "id")
+            .explain()
+        )
+        self.assertIn("task_due_status_idx", plan)
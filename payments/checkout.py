@@ -0,0 +1,105 @@
+"""
+Opening Stripe Checkout sessions.
+
+If a user already has an open session for the same amount, they are sent
+back to it rather than to a new one. Two things make that happen:
+
+- The ledger: a pending Payment whose session is still open for a while
+  is reused without calling Stripe at all.
+- An idempotency key per (user, amount, currency, time window). Requests
+  that race past the ledger lookup, such as a double-clicked pay button,
+  get the same session back from Stripe. The idempotent request has to
+  be byte-for-byte the same, so the session's expiry is derived from the
+  window rather than from the clock.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Payment, PaymentStatus
+from .stripe_client import get_client
+
+# Stripe allows an expiry 30 minutes to 24 hours after creation
+MIN_TTL_MINUTES = 30
+MAX_TTL_MINUTES = 12 * 60
+# Don't send a user to a session that is about to expire
+REUSE_MARGIN = timedelta(minutes=5)
+
+
+def _ttl_seconds():
+    minutes = getattr(settings, "STRIPE_CHECKOUT_TTL_MINUTES", MIN_TTL_MINUTES)
+    return max(MIN_TTL_MINUTES, min(minutes, MAX_TTL_MINUTES)) * 60
+
+
+def reusable_payment(user, amount, currency):
+    """The user's pending Payment for this amount that can still be paid."""
+    return (
+        Payment.objects.filter(
+            user=user,
+            amount=amount,
+            currency=currency,
+            status=PaymentStatus.PENDING,
+            expires_at__gt=timezone.now() + REUSE_MARGIN,
+        )
+        .exclude(checkout_url="")
+        .order_by("-expires_at")
+        .first()
+    )
+
+
+def open_checkout_session(user, amount, currency, name, success_url, cancel_url):
+    """
+    Returns the Payment of an open Checkout session for `amount` (in the
+    smallest currency unit), reusing the user's one if there is one.
+    Anonymous users always get a new session. Raises stripe.StripeError.
+    """
+    if user is not None:
+        payment = reusable_payment(user, amount, currency)
+        if payment is not None:
+            return payment
+
+    params = {
+        "line_items": [
+            {
+                "price_data": {
+                    "currency": currency,
+                    "product_data": {"name": name},
+                    "unit_amount": amount,
+                },
+                "quantity": 1,
+            },
+        ],
+        "mode": "payment",
+        "success_url": success_url,
+        "cancel_url": cancel_url,
+    }
+    options = {}
+    if user is not None:
+        ttl = _ttl_seconds()
+        now = int(time.time())
+        window = now - now % ttl
+        params["client_reference_id"] = str(user.pk)
+        # At least one full TTL from now, and the same for the whole window
+        params["expires_at"] = window + 2 * ttl
+        options["idempotency_key"] = f"checkout:{user.pk}:{currency}:{amount}:{window}"
+
+    sessions = get_client().v1.checkout.sessions
+    session = sessions.create(params=params, options=options)
+    if session.status != "open":
+        # The key's session was already paid for or expired; start anew
+        session = sessions.create(params=params)
+
+    payment, _ = Payment.objects.get_or_create(
+        checkout_session_id=session.id,
+        defaults={
+            "user": user,
+            "amount": amount,
+            "currency": currency,
+            "checkout_url": session.url or "",
+            "expires_at": datetime.fromtimestamp(session.expires_at, dt_timezone.utc),
+        },
+    )
+    return payment
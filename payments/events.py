@@ -0,0 +1,165 @@
+"""
+Applying stored Stripe webhook events to the Payment ledger (see
+process_stripe_events).
+
+Each event is applied in its own transaction. That transaction also flips
+the event from pending to processed with a conditional UPDATE. Two
+workers, or a redelivered event, therefore can never apply the same
+event twice. An event whose handler raises stays pending and is retried
+until STRIPE_EVENT_MAX_ATTEMPTS.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Payment, PaymentStatus, StripeEvent, StripeEventStatus
+
+# A payment never moves back from these (e.g. a late "expired" after "paid")
+FINAL_STATUSES = {
+    PaymentStatus.PAID: {PaymentStatus.REFUNDED},
+    PaymentStatus.REFUNDED: set(),
+    PaymentStatus.FAILED: {PaymentStatus.PAID},
+    PaymentStatus.EXPIRED: set(),
+}
+
+
+def store_event(event):
+    """Stores a verified webhook event; returns False for a redelivery."""
+    _, created = StripeEvent.objects.get_or_create(
+        event_id=event["id"], defaults={"type": event["type"], "payload": event}
+    )
+    return created
+
+
+def _set_status(payment, status):
+    allowed = FINAL_STATUSES.get(payment.status)
+    if allowed is not None and status not in allowed:
+        return
+    payment.status = status
+    payment.save(update_fields=["status", "payment_intent_id", "updated_at"])
+
+
+def _session_payment(session):
+    """The Payment for a Checkout session, created if we never saw it open."""
+    payment = (
+        Payment.objects.select_for_update()
+        .filter(checkout_session_id=session["id"])
+        .first()
+    )
+    if payment is None:
+        user_id = session.get("client_reference_id")
+        User = get_user_model()
+        payment = Payment.objects.create(
+            checkout_session_id=session["id"],
+            amount=session.get("amount_total") or 0,
+            currency=session.get("currency") or "usd",
+            user=User.objects.filter(pk=user_id).first() if user_id else None,
+        )
+    if session.get("payment_intent"):
+        payment.payment_intent_id = session["payment_intent"]
+    return payment
+
+
+def checkout_completed(data):
+    payment = _session_payment(data)
+    # Delayed methods (bank debits) complete unpaid and settle later
+    if data.get("payment_status") in ("paid", "no_payment_required"):
+        _set_status(payment, PaymentStatus.PAID)
+    else:
+        payment.save(update_fields=["payment_intent_id", "updated_at"])
+
+
+def async_payment_succeeded(data):
+    _set_status(_session_payment(data), PaymentStatus.PAID)
+
+
+def async_payment_failed(data):
+    _set_status(_session_payment(data), PaymentStatus.FAILED)
+
+
+def checkout_expired(data):
+    _set_status(_session_payment(data), PaymentStatus.EXPIRED)
+
+
+def charge_refunded(data):
+    if not data.get("refunded") or not data.get("payment_intent"):
+        return
+    for payment in Payment.objects.select_for_update().filter(
+        payment_intent_id=data["payment_intent"]
+    ):
+        _set_status(payment, PaymentStatus.REFUNDED)
+
+
+HANDLERS = {
+    "checkout.session.completed": checkout_completed,
+    "checkout.session.async_payment_succeeded": async_payment_succeeded,
+    "checkout.session.async_payment_failed": async_payment_failed,
+    "checkout.session.expired": checkout_expired,
+    "charge.refunded": charge_refunded,
+}
+
+
+class ProcessResult:
+    def __init__(self):
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+
+
+def process_event(event, result):
+    handler = HANDLERS.get(event.type)
+    try:
+        with transaction.atomic():
+            claimed = StripeEvent.objects.filter(
+                pk=event.pk, status=StripeEventStatus.PENDING
+            ).update(
+                status=StripeEventStatus.PROCESSED,
+                processed_at=timezone.now(),
+                attempts=F("attempts") + 1,
+            )
+            if not claimed:
+                # Another worker got there first
+                return
+            if handler is not None:
+                handler(event.payload["data"]["object"])
+    except Exception as exc:
+        attempts = event.attempts + 1
+        failed = attempts >= getattr(settings, "STRIPE_EVENT_MAX_ATTEMPTS", 5)
+        StripeEvent.objects.filter(pk=event.pk).update(
+            attempts=attempts,
+            last_error=f"{type(exc).__name__}: {exc}"[:2000],
+            status=StripeEventStatus.FAILED if failed else StripeEventStatus.PENDING,
+        )
+        if failed:
+            result.failed += 1
+        else:
+            result.retried += 1
+    else:
+        result.processed += 1
+
+
+def process_events(batch_size=100, max_batches=None):
+    """
+    Applies pending events oldest first, `batch_size` per read, until none
+    are left (or after `max_batches`). Events that failed during this run
+    wait for the next one.
+    """
+    result = ProcessResult()
+    batches = 0
+    last_pk = 0
+    while max_batches is None or batches < max_batches:
+        events = list(
+            StripeEvent.objects.filter(
+                status=StripeEventStatus.PENDING, pk__gt=last_pk
+            ).order_by("pk")[:batch_size]
+        )
+        if not events:
+            break
+        for event in events:
+            process_event(event, result)
+        last_pk = events[-1].pk
+        batches += 1
+    return result
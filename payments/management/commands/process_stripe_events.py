@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.events import process_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Applies the Stripe webhook events stored by the webhook endpoint to"
+        " the Payment ledger, in batches. Each event is applied exactly once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Events read per query.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling for new events every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds between polls with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            result = process_events(max(1, options["batch_size"]))
+            elapsed = time.perf_counter() - started
+            if (
+                result.processed
+                or result.retried
+                or result.failed
+                or not options["loop"]
+            ):
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Processed {result.processed}, {result.retried} to retry,"
+                        f" {result.failed} failed in {elapsed:.2f}s."
+                    )
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
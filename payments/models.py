@@ -1,3 +1,87 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class PaymentStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    PAID = "paid", "Paid"
+    FAILED = "failed", "Failed"
+    EXPIRED = "expired", "Expired"
+    REFUNDED = "refunded", "Refunded"
+
+
+class Payment(models.Model):
+    """
+    One Stripe Checkout session and what became of it. Created as pending
+    when the session is opened; the webhook events move it on (see
+    payments/events.py).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="payments",
+    )
+    checkout_session_id = models.CharField(max_length=255, unique=True)
+    payment_intent_id = models.CharField(max_length=255, blank=True, db_index=True)
+    amount = models.PositiveIntegerField(
+        help_text="In the smallest currency unit, e.g. cents."
+    )
+    currency = models.CharField(max_length=3, default="usd")
+    status = models.CharField(
+        max_length=10, choices=PaymentStatus.choices, default=PaymentStatus.PENDING
+    )
+    # Where to send the user while the session is open (see checkout.py)
+    checkout_url = models.TextField(blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The lookup for a user's open session to reuse
+            models.Index(fields=["user", "status", "amount"], name="payment_reuse_idx"),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.checkout_session_id} {self.amount} {self.currency} ({self.status})"
+        )
+
+
+class StripeEventStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    PROCESSED = "processed", "Processed"
+    FAILED = "failed", "Failed"
+
+
+class StripeEvent(models.Model):
+    """
+    A webhook event exactly as Stripe sent it. The webhook only stores it;
+    process_stripe_events applies it. The unique event id makes redelivered
+    events no-ops.
+    """
+
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=10,
+        choices=StripeEventStatus.choices,
+        default=StripeEventStatus.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's scan for pending events, oldest first
+            models.Index(fields=["status", "id"], name="stripe_event_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} {self.type} ({self.status})"
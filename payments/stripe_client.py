@@ -0,0 +1,117 @@
+"""
+The process-wide StripeClient.
+
+The module-level `stripe` API builds a default HTTP client with an
+80-second timeout. Each call can also end up on a fresh TLS connection.
+Instead, every call here goes through one client with these properties:
+
+- a pooled requests.Session, so connections to Stripe are kept alive
+  and shared between threads;
+- bounded connect and read timeouts (STRIPE_CONNECT_TIMEOUT and
+  STRIPE_READ_TIMEOUT);
+- STRIPE_MAX_NETWORK_RETRIES. The library sends an idempotency key with
+  each POST, so a retried POST can't create a second object.
+
+Each HTTP attempt is logged to "payments.stripe" together with its
+latency.
+"""
+
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+import stripe
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger("payments.stripe")
+
+_client = None
+_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class TimedRequestsClient(stripe.RequestsClient):
+    """A RequestsClient that logs the latency of every request it makes."""
+
+    def request(self, method, url, headers, post_data=None):
+        path = urlsplit(url).path
+        start = time.perf_counter()
+        try:
+            content, status, response_headers = super().request(
+                method, url, headers, post_data
+            )
+        except Exception as exc:
+            logger.warning(
+                "stripe %s %s failed after %.1fms: %s",
+                method.upper(),
+                path,
+                (time.perf_counter() - start) * 1000,
+                exc,
+                extra={"stripe_path": path, "stripe_status": None},
+            )
+            raise
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(
+            "stripe %s %s %s %.1fms",
+            method.upper(),
+            path,
+            status,
+            elapsed,
+            extra={
+                "stripe_path": path,
+                "stripe_status": status,
+                "stripe_ms": elapsed,
+                "stripe_request_id": response_headers.get("Request-Id", ""),
+            },
+        )
+        return content, status, response_headers
+
+
+def make_client():
+    pool_size = _setting("STRIPE_POOL_SIZE", 10)
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    http_client = TimedRequestsClient(
+        timeout=(
+            _setting("STRIPE_CONNECT_TIMEOUT", 3.0),
+            _setting("STRIPE_READ_TIMEOUT", 15.0),
+        ),
+        session=session,
+    )
+    return stripe.StripeClient(
+        settings.STRIPE_SECRET_KEY,
+        base_addresses={"api": _setting("STRIPE_API_BASE", "https://api.stripe.com")},
+        max_network_retries=_setting("STRIPE_MAX_NETWORK_RETRIES", 2),
+        http_client=http_client,
+    )
+
+
+def get_client():
+    """The shared StripeClient, built on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = make_client()
+    return _client
+
+
+def reset_client():
+    global _client
+    with _lock:
+        _client = None
+
+
+@receiver(setting_changed)
+def _stripe_setting_changed(setting, **kwargs):
+    if setting.startswith("STRIPE_"):
+        reset_client()
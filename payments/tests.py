@@ -1,3 +1,374 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import sys
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from urllib.parse import parse_qs
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .events import ProcessResult, process_event, process_events
+from .models import Payment, PaymentStatus, StripeEvent, StripeEventStatus
+
+User = get_user_model()
+
+WEBHOOK_SECRET = "whsec_test"
+
+
+class StripeStub(ThreadingHTTPServer):
+    """
+    A local stand-in for the Stripe API's Checkout session endpoint.
+    Records the form parameters of every request and, like Stripe, answers
+    a repeated idempotency key with the session it created the first time.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay=0):
+        super().__init__(("127.0.0.1", 0), StripeStubHandler)
+        self.delay = delay
+        self.requests = []
+        self.ports = set()
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # The client hanging up on a slow response is expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StripeStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        params = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        time.sleep(self.server.delay)
+        key = self.headers.get("Idempotency-Key")
+        with self.server.lock:
+            self.server.requests.append((self.path, dict(self.headers), params))
+            self.server.ports.add(self.client_address[1])
+            session = self.server.sessions.get(key)
+            if session is None:
+                number = len(self.server.sessions) + 1
+                session = {
+                    "id": f"cs_test_{number}",
+                    "object": "checkout.session",
+                    "url": f"https://checkout.stripe.test/cs_test_{number}",
+                    "amount_total": int(
+                        params["line_items[0][price_data][unit_amount]"]
+                    ),
+                    "currency": "usd",
+                    "status": "open",
+                    "expires_at": int(params.get("expires_at") or time.time() + 86400),
+                }
+                self.server.sessions[key] = session
+        payload = json.dumps(session).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def sign(payload, secret=WEBHOOK_SECRET, timestamp=None):
+    timestamp = int(timestamp or time.time())
+    signature = hmac.new(
+        secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def make_event(event_id, event_type, obj):
+    return {
+        "id": event_id,
+        "object": "event",
+        "type": event_type,
+        "created": int(time.time()),
+        "data": {"object": obj},
+    }
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="payer@example.com", password="pw")
+        self.client.force_login(self.user)
+
+    def checkout(self, amount):
+        return self.client.post("/payment/checkout/", {"amount": amount})
+
+    def test_checkout_records_a_pending_payment(self):
+        with StripeStub() as stub, self.settings(STRIPE_API_BASE=stub.url):
+            with self.assertLogs("payments.stripe", "INFO") as logs:
+                response = self.checkout("12.50")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], "https://checkout.stripe.test/cs_test_1")
+        self.assertRegex(
+            logs.output[0], r"stripe POST /v1/checkout/sessions 200 [\d.]+ms"
+        )
+
+        path, headers, params = stub.requests[0]
+        self.assertEqual(path, "/v1/checkout/sessions")
+        self.assertEqual(params["line_items[0][price_data][unit_amount]"], "1250")
+        self.assertEqual(params["client_reference_id"], str(self.user.pk))
+        self.assertTrue(headers["Idempotency-Key"].startswith("checkout:"))
+        # Always open for more than the TTL
+        self.assertGreater(int(params["expires_at"]), time.time() + 30 * 60)
+
+        payment = Payment.objects.get()
+        self.assertEqual(
+            (payment.checkout_session_id, payment.amount, payment.status, payment.user),
+            ("cs_test_1", 1250, PaymentStatus.PENDING, self.user),
+        )
+        self.assertEqual(payment.checkout_url, response["Location"])
+
+    def test_reuses_an_open_session(self):
+        with StripeStub() as stub, self.settings(STRIPE_API_BASE=stub.url):
+            first = self.checkout("12.50")
+            # Straight from the ledger
+            with self.assertNumQueries(3):
+                second = self.checkout("12.50")
+            self.assertEqual(len(stub.requests), 1)
+
+            # A request that missed the ledger gets the same session back
+            # through the idempotency key
+            Payment.objects.all().delete()
+            third = self.checkout("12.50")
+            self.assertEqual(len(stub.requests), 2)
+
+            other = self.checkout("20")
+        self.assertEqual(first["Location"], second["Location"])
+        self.assertEqual(first["Location"], third["Location"])
+        self.assertNotEqual(first["Location"], other["Location"])
+        self.assertEqual(Payment.objects.count(), 2)
+        # All requests went over one kept-alive connection
+        self.assertEqual(len(stub.ports), 1)
+
+    def test_closed_or_expiring_sessions_are_not_reused(self):
+        with StripeStub() as stub, self.settings(STRIPE_API_BASE=stub.url):
+            self.checkout("12.50")
+            Payment.objects.update(status=PaymentStatus.PAID)
+            self.checkout("12.50")
+            Payment.objects.update(expires_at=timezone.now() + timedelta(minutes=2))
+            self.checkout("12.50")
+        self.assertEqual(len(stub.requests), 3)
+
+    def test_anonymous_checkouts_always_get_a_new_session(self):
+        self.client.logout()
+        with StripeStub() as stub, self.settings(STRIPE_API_BASE=stub.url):
+            self.checkout("12.50")
+            self.checkout("12.50")
+        self.assertEqual(Payment.objects.filter(user=None).count(), 2)
+        self.assertNotEqual(
+            stub.requests[0][1]["Idempotency-Key"],
+            stub.requests[1][1]["Idempotency-Key"],
+        )
+
+    def test_slow_stripe_fails_fast(self):
+        with StripeStub(delay=1) as stub, self.settings(
+            STRIPE_API_BASE=stub.url,
+            STRIPE_READ_TIMEOUT=0.2,
+            STRIPE_MAX_NETWORK_RETRIES=1,
+        ):
+            start = time.monotonic()
+            with self.assertLogs("payments.stripe", "WARNING") as logs:
+                response = self.checkout("12.50")
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual(response.status_code, 502)
+        # The first attempt and its retry
+        self.assertEqual(len(logs.output), 2)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_rejects_bad_amounts(self):
+        for amount in ("abc", "Infinity", "-Infinity", "NaN", "sNaN"):
+            self.assertEqual(
+                self.client.post("/payment/checkout/", {"amount": amount}).status_code,
+                400,
+            )
+        self.assertEqual(
+            self.client.post("/payment/checkout/", {"amount": "0.25"}).status_code, 400
+        )
+        self.assertFalse(Payment.objects.exists())
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class WebhookTests(TestCase):
+    def post_event(self, event, signature=None):
+        payload = json.dumps(event)
+        return self.client.post(
+            "/payment/webhook/",
+            payload,
+            content_type="application/json",
+            headers={"Stripe-Signature": signature or sign(payload)},
+        )
+
+    def test_stores_verified_events_once(self):
+        event = make_event("evt_1", "checkout.session.completed", {"id": "cs_1"})
+        with self.assertNumQueries(4):
+            response = self.post_event(event)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"received": True, "duplicate": False})
+        # Stripe redelivers; nothing new is stored
+        self.assertTrue(self.post_event(event).json()["duplicate"])
+        stored = StripeEvent.objects.get()
+        self.assertEqual(
+            (stored.event_id, stored.type, stored.status),
+            ("evt_1", "checkout.session.completed", StripeEventStatus.PENDING),
+        )
+        self.assertEqual(stored.payload, event)
+
+    @override_settings(STRIPE_WEBHOOK_SECRET="")
+    def test_rejects_everything_without_a_secret(self):
+        event = make_event("evt_forged", "checkout.session.completed", {"id": "cs_1"})
+        payload = json.dumps(event)
+        with self.assertLogs("payments.views", "ERROR"):
+            response = self.post_event(event, signature=sign(payload, secret=""))
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_rejects_bad_signatures(self):
+        event = make_event("evt_1", "checkout.session.completed", {"id": "cs_1"})
+        payload = json.dumps(event)
+        for signature in (
+            sign(payload, secret="whsec_other"),
+            sign(payload, timestamp=time.time() - 3600),
+            "garbage",
+        ):
+            response = self.post_event(event, signature=signature)
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+
+class EventProcessingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="payer@example.com", password="pw")
+        self.payment = Payment.objects.create(
+            user=self.user, checkout_session_id="cs_1", amount=1250
+        )
+
+    def store(self, event_id, event_type, obj):
+        return StripeEvent.objects.create(
+            event_id=event_id,
+            type=event_type,
+            payload=make_event(event_id, event_type, obj),
+        )
+
+    def test_completed_session_marks_the_payment_paid(self):
+        self.store(
+            "evt_1",
+            "checkout.session.completed",
+            {"id": "cs_1", "payment_status": "paid", "payment_intent": "pi_1"},
+        )
+        self.store("evt_2", "customer.created", {"id": "cus_1"})
+        result = process_events(batch_size=1)
+        self.assertEqual((result.processed, result.failed), (2, 0))
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, PaymentStatus.PAID)
+        self.assertEqual(self.payment.payment_intent_id, "pi_1")
+        self.assertFalse(
+            StripeEvent.objects.exclude(status=StripeEventStatus.PROCESSED).exists()
+        )
+
+    def test_late_expiry_does_not_undo_a_payment_but_a_refund_does(self):
+        self.store(
+            "evt_1",
+            "checkout.session.completed",
+            {"id": "cs_1", "payment_status": "paid", "payment_intent": "pi_1"},
+        )
+        self.store("evt_2", "checkout.session.expired", {"id": "cs_1"})
+        process_events()
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, PaymentStatus.PAID)
+
+        self.store(
+            "evt_3",
+            "charge.refunded",
+            {"id": "ch_1", "refunded": True, "payment_intent": "pi_1"},
+        )
+        process_events()
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, PaymentStatus.REFUNDED)
+
+    def test_unknown_session_is_added_to_the_ledger(self):
+        self.store(
+            "evt_1",
+            "checkout.session.completed",
+            {
+                "id": "cs_2",
+                "payment_status": "paid",
+                "amount_total": 990,
+                "currency": "eur",
+                "client_reference_id": str(self.user.pk),
+            },
+        )
+        process_events()
+        payment = Payment.objects.get(checkout_session_id="cs_2")
+        self.assertEqual(
+            (payment.amount, payment.currency, payment.user, payment.status),
+            (990, "eur", self.user, PaymentStatus.PAID),
+        )
+
+    def test_an_event_is_applied_once(self):
+        event = self.store(
+            "evt_1",
+            "checkout.session.completed",
+            {"id": "cs_1", "payment_status": "paid"},
+        )
+        result = ProcessResult()
+        process_event(event, result)
+        # A second worker holding the same (stale) row
+        process_event(event, result)
+        self.assertEqual(result.processed, 1)
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, 1)
+
+    @override_settings(STRIPE_EVENT_MAX_ATTEMPTS=2)
+    def test_failing_events_are_retried_then_failed(self):
+        # No "id" on the session: the handler raises
+        self.store("evt_1", "checkout.session.completed", {"payment_status": "paid"})
+        self.assertEqual(process_events().retried, 1)
+        event = StripeEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), (StripeEventStatus.PENDING, 1))
+        self.assertIn("KeyError", event.last_error)
+
+        self.assertEqual(process_events().failed, 1)
+        event.refresh_from_db()
+        self.assertEqual(event.status, StripeEventStatus.FAILED)
+
+    def test_command_and_success_page(self):
+        self.store(
+            "evt_1",
+            "checkout.session.completed",
+            {"id": "cs_1", "payment_status": "paid"},
+        )
+        response = self.client.get("/payment/success/?session_id=cs_1")
+        self.assertContains(response, "Payment Received")
+
+        out = StringIO()
+        call_command("process_stripe_events", stdout=out)
+        self.assertIn("Processed 1, 0 to retry, 0 failed", out.getvalue())
+        response = self.client.get("/payment/success/?session_id=cs_1")
+        self.assertContains(response, "Payment Successful!")
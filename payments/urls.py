@@ -1,9 +1,11 @@
 from django.urls import path
+
 from . import views
 
 urlpatterns = [
-    path('', views.set_amount_view, name='set_amount'), 
-    path('checkout/', views.create_checkout_session, name='checkout'),
-    path('success/', views.payment_success_view, name='success'),
-    path('cancel/', views.payment_cancel_view, name='cancel'),
-]
\ No newline at end of file
+    path("", views.set_amount_view, name="set_amount"),
+    path("checkout/", views.create_checkout_session, name="checkout"),
+    path("success/", views.payment_success_view, name="success"),
+    path("cancel/", views.payment_cancel_view, name="cancel"),
+    path("webhook/", views.stripe_webhook, name="stripe_webhook"),
+]
@@ -1,64 +1,105 @@
 # payments/views.py
+import json
+import logging
+from decimal import Decimal, InvalidOperation
+
 import stripe
-from django.shortcuts import render, redirect
 from django.conf import settings
-from django.views.decorators.csrf import csrf_exempt # Use csrf_exempt just for the webhook for testing, but better to use proper Webhook handling
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import redirect, render
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .checkout import open_checkout_session
+from .events import store_event
+from .models import Payment
+
+logger = logging.getLogger(__name__)
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
 
 def set_amount_view(request):
-    return render(request, 'payments/amount_form.html')
+    return render(request, "payments/amount_form.html")
+
 
 # 2. Modified View: Reads the amount from the form submission
 def create_checkout_session(request):
-    if request.method != 'POST':
+    if request.method != "POST":
         # Safety check: should only be accessed via POST from the form
-        return HttpResponse('Invalid request method. Please set the amount first.', status=405)
+        return HttpResponse(
+            "Invalid request method. Please set the amount first.", status=405
+        )
 
     try:
-        # Get the amount from the form submission and convert to float
-        amount_usd = float(request.POST.get('amount'))
-        
         # Stripe requires the amount in CENTS (or the smallest currency unit)
         # 10.00 USD * 100 = 1000 Cents
-        unit_amount_cents = int(amount_usd * 100)
-        
-        if unit_amount_cents <= 50: # Enforce a minimum amount (Stripe minimum is often 50 cents)
-             return HttpResponse('Amount must be greater than $0.50.', status=400)
-
-
-        YOUR_DOMAIN = "http://127.0.0.1:8000"
-        
-        checkout_session = stripe.checkout.Session.create(
-            line_items=[
-                {
-                    'price_data': {
-                        'currency': 'usd',
-                        'product_data': {
-                            'name': f'Assignment Fee for ${amount_usd:.2f}', # Dynamic Product Name
-                        },
-                        'unit_amount': unit_amount_cents, 
-                    },
-                    'quantity': 1,
-                },
-            ],
-            mode='payment',
-            success_url=YOUR_DOMAIN + '/payment/success/',
-            cancel_url=YOUR_DOMAIN + '/payment/cancel/',
-            # Note: Success/Cancel URLs must be fully qualified (including /payment/ if you used it in the main urls.py)
+        amount_usd = Decimal(request.POST.get("amount", ""))
+    except InvalidOperation:
+        amount_usd = None
+    # Decimal also parses "Infinity" and "NaN"
+    if amount_usd is None or not amount_usd.is_finite():
+        return HttpResponse("Invalid amount entered.", status=400)
+    unit_amount_cents = int(amount_usd * 100)
+
+    if unit_amount_cents <= 50:
+        # Enforce a minimum amount (Stripe minimum is often 50 cents)
+        return HttpResponse("Amount must be greater than $0.50.", status=400)
+
+    user = request.user if request.user.is_authenticated else None
+    YOUR_DOMAIN = "http://127.0.0.1:8000"
+    try:
+        payment = open_checkout_session(
+            user,
+            unit_amount_cents,
+            "usd",
+            name=f"Assignment Fee for ${amount_usd:.2f}",
+            # Stripe fills in the session id, so the success page can look
+            # the payment up
+            success_url=YOUR_DOMAIN
+            + "/payment/success/?session_id={CHECKOUT_SESSION_ID}",
+            cancel_url=YOUR_DOMAIN + "/payment/cancel/",
         )
-        return redirect(checkout_session.url, code=303)
-        
-    except ValueError:
-        return HttpResponse('Invalid amount entered.', status=400)
-    except Exception as e:
-        # Catch any Stripe/other errors
-        return render(request, 'payments/error.html', {'error': str(e)}) 
+    except stripe.StripeError as e:
+        return render(request, "payments/error.html", {"error": str(e)}, status=502)
+
+    return redirect(payment.checkout_url, code=303)
+
+
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    """
+    Receives Stripe webhook events. The signature is checked against
+    STRIPE_WEBHOOK_SECRET and the raw event stored; process_stripe_events
+    applies it later, so Stripe gets its 200 without waiting on our
+    processing.
+    """
+    if not settings.STRIPE_WEBHOOK_SECRET:
+        # An empty key would make every signature forgeable
+        logger.error("STRIPE_WEBHOOK_SECRET is not set; rejecting the webhook.")
+        return HttpResponse("Webhook not configured.", status=503)
+    try:
+        stripe.Webhook.construct_event(
+            request.body,
+            request.headers.get("Stripe-Signature", ""),
+            settings.STRIPE_WEBHOOK_SECRET,
+        )
+    except (ValueError, stripe.SignatureVerificationError):
+        return HttpResponse("Invalid payload or signature.", status=400)
+
+    event = json.loads(request.body)
+    created = store_event(event)
+    return JsonResponse({"received": True, "duplicate": not created})
+
 
 def payment_success_view(request):
-    # Your logic to mark the task/order as paid goes here
-    return render(request, 'payments/success.html')
+    # Stripe redirects here before the webhook may have arrived, so the
+    # payment can still be pending
+    payment = Payment.objects.filter(
+        checkout_session_id=request.GET.get("session_id", "")
+    ).first()
+    return render(request, "payments/success.html", {"payment": payment})
+
 
 def payment_cancel_view(request):
     # Your logic for a cancelled payment
-    return render(request, 'payments/cancel.html')
\ No newline at end of file
+    return render(request, "payments/cancel.html")
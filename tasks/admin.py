@@ -2,6 +2,7 @@ from django.contrib import admin
 
 # Import your models from your models.py file
 from .models import Category, Tag, Task
+from .search import matching_ids_subquery
 
 
 @admin.register(Category)  # This decorator is a concise way to register
@@ -9,6 +10,7 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = (
         "name",
         "hex_color",
+        "task_count",
     )  # Fields to display in the list view
     search_fields = ("name",)  # Enable search by name
     list_filter = ("hex_color",)  # Enable filtering by hex_color if desired
@@ -17,7 +19,7 @@ class CategoryAdmin(admin.ModelAdmin):
 # --- Register Tag Model ---
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ("label",)  # Fields to display in the list view
+    list_display = ("label", "task_count")  # Fields to display in the list view
     search_fields = ("label",)  # Enable search by label
 
 
@@ -72,3 +74,10 @@ class TaskAdmin(admin.ModelAdmin):
 
     is_completed.boolean = True  # Displays a checkmark/X icon
     is_completed.short_description = "Completed?"
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the FTS5 index instead of LIKE scans over title/description
+        subquery = matching_ids_subquery(search_term)
+        if subquery is None:
+            return queryset, False
+        return queryset.filter(pk__in=subquery), False
@@ -0,0 +1,154 @@
+"""
+Async-native read endpoints for the ASGI deployment (DjangoY4/asgi.py).
+
+DRF views are synchronous, so under an ASGI server every API request is
+run through sync_to_async. These plain Django async views serve the same
+list/retrieve output as TaskViewSet, CategoryViewSet and TagViewSet
+(same JSON bytes, filters, ?fields=/?expand= and cursor pagination) with
+the async ORM: aiterator() for rows, aprefetch_related_objects() for tags
+and aget()/acount() for single lookups and counts. Authentication is by
+token only (CachedTokenAuthentication.aauthenticate).
+
+Django's async ORM still runs each query in its thread executor; what
+goes away is running the whole view, DRF machinery included, in a thread.
+"""
+
+import functools
+
+from django.db.models import aprefetch_related_objects
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from accounts.authentication import CachedTokenAuthentication
+from DjangoY4.middleware import timed
+
+from .fast_serializers import serialize_tasks
+from .fieldsets import apply_fieldset, parse_fieldset
+from .filters import TaskFilterBackend
+from .models import Category, Tag, Task
+from .pagination import TaskCursorPagination
+from .serializers import CategorySerializer, TagSerializer
+
+_renderer = JSONRenderer()
+
+
+@timed("render")
+def _json(data, status=200):
+    # Rendered like DRF's JSONRenderer so the bytes match the sync API
+    return HttpResponse(
+        _renderer.render(data), status=status, content_type="application/json"
+    )
+
+
+def _error(exc):
+    # Same body as DRF's exception handler
+    data = exc.detail if isinstance(exc.detail, list | dict) else {"detail": exc.detail}
+    response = _json(data, status=exc.status_code)
+    if isinstance(exc, exceptions.NotAuthenticated | exceptions.AuthenticationFailed):
+        response["WWW-Authenticate"] = CachedTokenAuthentication.keyword
+    return response
+
+
+def api_view(view):
+    """
+    Wraps an async view(request, user, *args): authenticates the token,
+    allows GET only and turns DRF APIExceptions into JSON error responses.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            if request.method != "GET":
+                raise exceptions.MethodNotAllowed(request.method)
+            auth = await CachedTokenAuthentication().aauthenticate(request)
+            if auth is None:
+                raise exceptions.NotAuthenticated()
+            return await view(request, auth[0], *args, **kwargs)
+        except exceptions.APIException as exc:
+            return _error(exc)
+
+    return wrapper
+
+
+async def _fetch(queryset):
+    """
+    Evaluates `queryset` with aiterator(), then runs its prefetch lookups
+    with aprefetch_related_objects() over the whole result at once.
+    """
+    lookups = queryset._prefetch_related_lookups
+    rows = [obj async for obj in queryset.prefetch_related(None).aiterator()]
+    if lookups:
+        await aprefetch_related_objects(rows, *lookups)
+    return rows
+
+
+def _task_queryset(user, fieldset):
+    return apply_fieldset(
+        Task.objects.filter(user=user).order_by("-created_at"),
+        fieldset,
+        always=TaskCursorPagination.ordering_fields,
+    )
+
+
+@api_view
+async def task_list(request, user):
+    """
+    GET like /api/tasks/. ?count=true adds an X-Total-Count header with
+    the number of tasks matching the filters.
+    """
+    drf_request = Request(request)
+    fieldset = parse_fieldset(drf_request.query_params)
+    queryset = TaskFilterBackend().filter_queryset(
+        drf_request, _task_queryset(user, fieldset), None
+    )
+
+    paginator = TaskCursorPagination()
+    page_queryset = paginator.page_queryset(queryset, drf_request)
+    if page_queryset is None:
+        data = serialize_tasks(await _fetch(queryset), fieldset)
+    else:
+        page = paginator.set_page(await _fetch(page_queryset))
+        data = {
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": serialize_tasks(page, fieldset),
+        }
+    response = _json(data)
+    if drf_request.query_params.get("count") in ("1", "true"):
+        response["X-Total-Count"] = await queryset.acount()
+    return response
+
+
+@api_view
+async def task_detail(request, user, pk):
+    """GET like /api/tasks/<pk>/."""
+    fieldset = parse_fieldset(Request(request).query_params)
+    tasks = await _fetch(_task_queryset(user, fieldset).filter(pk=pk))
+    if not tasks:
+        raise exceptions.NotFound("No Task matches the given query.")
+    return _json(serialize_tasks(tasks, fieldset)[0])
+
+
+def _model_views(model, serializer_class):
+    @api_view
+    async def list_view(request, user):
+        objects = [obj async for obj in model.objects.all().aiterator()]
+        return _json(serializer_class(objects, many=True).data)
+
+    @api_view
+    async def detail_view(request, user, pk):
+        try:
+            obj = await model.objects.aget(pk=pk)
+        except model.DoesNotExist:
+            raise exceptions.NotFound(
+                f"No {model._meta.object_name} matches the given query."
+            )
+        return _json(serializer_class(obj).data)
+
+    return list_view, detail_view
+
+
+category_list, category_detail = _model_views(Category, CategorySerializer)
+tag_list, tag_detail = _model_views(Tag, TagSerializer)
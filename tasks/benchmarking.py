@@ -0,0 +1,211 @@
+"""
+Helpers shared by the bench_* management commands.
+
+Benchmarks run against a scratch copy of the schema (the same throwaway
+database the test runner creates), never against the configured data.
+"""
+
+import asyncio
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from .bulk import create_tasks
+from .fake_data import generate_task_rows
+from .models import Category, Tag, Task, TaskStatus
+
+
+@contextmanager
+def scratch_database(verbosity=0):
+    """
+    Creates a migrated test database for the duration of the block, with
+    the test environment (ALLOWED_HOSTS for the test clients, in-memory
+    email) set up as under the test runner.
+
+    For SQLite the database is a file in a temporary directory, not the
+    test runner's shared in-memory database. Connections then get the
+    configured OPTIONS (WAL, busy timeout), so concurrent benchmark threads
+    wait for each other's locks as they would in production.
+    """
+    old_name = connection.settings_dict["NAME"]
+    test_settings = connection.settings_dict["TEST"]
+    old_test_name = test_settings.get("NAME")
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            test_settings["NAME"] = str(Path(directory) / "scratch.sqlite3")
+        setup_test_environment()
+        try:
+            connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+            try:
+                yield
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        finally:
+            test_settings["NAME"] = old_test_name
+            teardown_test_environment()
+
+
+def seed_tasks(
+    num_tasks, num_users=1, num_categories=10, num_tags=20, seed=0, batch_size=1000
+):
+    """
+    Creates users, categories, tags and `num_tasks` tasks (with up to three
+    tags each) through the bulk paths. Returns the users.
+    """
+    User = get_user_model()
+    password = make_password("password123")
+    users = User.objects.bulk_create(
+        [
+            User(email=f"bench{i}@example.com", password=password)
+            for i in range(num_users)
+        ]
+    )
+    categories = Category.objects.bulk_create(
+        [
+            Category(name=f"Category {i}", hex_color="#336699")
+            for i in range(num_categories)
+        ]
+    )
+    tags = Tag.objects.bulk_create([Tag(label=f"tag{i}") for i in range(num_tags)])
+
+    statuses = [status.value for status in TaskStatus]
+    now = timezone.now()
+    for number, start in enumerate(range(0, num_tasks, batch_size)):
+        rows = generate_task_rows(
+            (
+                number,
+                min(batch_size, num_tasks - start),
+                seed,
+                statuses,
+                num_users,
+                num_categories,
+                num_tags,
+            )
+        )
+        create_tasks(
+            [
+                Task(
+                    title=title,
+                    description=description,
+                    status=status,
+                    due_date=None if due is None else now + timedelta(days=due),
+                    user=users[user_index],
+                    category=categories[category_index],
+                )
+                for title, description, status, due, user_index, category_index, _ in rows
+            ],
+            [[tags[i].pk for i in row[6]] for row in rows],
+            batch_size=batch_size,
+        )
+    return users
+
+
+def time_call(func, repeat):
+    """Calls func() `repeat` times; returns the durations in seconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile, e.g. percentile(samples, 0.95)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Returns min/p50/p95/mean of `samples` in milliseconds."""
+    return {
+        "min_ms": min(samples) * 1000,
+        "p50_ms": statistics.median(samples) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+    }
+
+
+def run_threaded(func, total, concurrency):
+    """
+    Calls func() `total` times from `concurrency` threads. Returns the
+    per-call durations and the wall time, in seconds.
+    """
+
+    def timed(_):
+        started = time.perf_counter()
+        func()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(timed, range(total)))
+    return samples, time.perf_counter() - started
+
+
+async def run_concurrently(coroutine_func, total, concurrency):
+    """
+    Awaits coroutine_func() `total` times with at most `concurrency` in
+    flight. Returns the per-call durations and the wall time, in seconds.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed():
+        async with semaphore:
+            started = time.perf_counter()
+            await coroutine_func()
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    samples = await asyncio.gather(*(timed() for _ in range(total)))
+    return list(samples), time.perf_counter() - started
+
+
+# Metrics compared by compare_to_baseline(), and whether higher is better
+BASELINE_METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "requests_per_second": True,
+}
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Compares {scenario: stats} `results` with a baseline of the same shape.
+    Returns (scenario, metric, baseline value, current value, relative
+    change, regressed) rows. A metric regresses when it is worse than the
+    baseline by more than `threshold` (0.2 = 20%). Scenarios missing from
+    either side are skipped.
+    """
+    rows = []
+    for scenario, stats in results.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        for metric, higher_is_better in BASELINE_METRICS.items():
+            if not base.get(metric) or metric not in stats:
+                continue
+            change = stats[metric] / base[metric] - 1
+            worse = -change if higher_is_better else change
+            rows.append(
+                (
+                    scenario,
+                    metric,
+                    base[metric],
+                    stats[metric],
+                    change,
+                    worse > threshold,
+                )
+            )
+    return rows
@@ -0,0 +1,140 @@
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import adjust_task_counts, counter_signals_suspended
+from .models import SUMMARY_FIELDS, Task
+from .summary import adjust_task_summary, summary_deltas
+
+TaskTags = Task.tags.through
+
+# Rows per INSERT/UPDATE statement; keeps SQLite under its variable limit
+BATCH_SIZE = 500
+
+
+def create_tasks(tasks, tag_ids=None, batch_size=BATCH_SIZE):
+    """
+    Inserts unsaved Task instances with bulk_create and links their tags
+    with bulk inserts into the through table, all in one transaction.
+    `tag_ids` is a parallel list of tag id iterables (or None).
+
+    bulk_create skips save() and the counter signals, so the completed_at
+    rule, the Category/Tag counters and the daily summary are applied here.
+    """
+    tag_ids = tag_ids or [()] * len(tasks)
+    with transaction.atomic():
+        for task in tasks:
+            task.sync_completed_at()
+        Task.objects.bulk_create(tasks, batch_size=batch_size)
+
+        links = [
+            TaskTags(task_id=task.pk, tag_id=tag_id)
+            for task, ids in zip(tasks, tag_ids)
+            for tag_id in set(ids or ())
+        ]
+        TaskTags.objects.bulk_create(links, batch_size=batch_size)
+
+        adjust_task_counts(
+            category_deltas=Counter(task.category_id for task in tasks),
+            tag_deltas=Counter(link.tag_id for link in links),
+        )
+        current = [task.summary_values() for task in tasks]
+        adjust_task_summary(summary_deltas([None] * len(tasks), current))
+    for task, values in zip(tasks, current):
+        task._loaded_category_id = task.category_id
+        task._loaded_summary_values = values
+    return tasks
+
+
+def update_tasks(tasks, fields, tag_ids=None, batch_size=BATCH_SIZE):
+    """
+    Writes `fields` of already loaded Task instances with bulk_update and,
+    for tasks present in `tag_ids` ({task pk: tag ids}), replaces their
+    tags with the given set. Runs in one transaction.
+    """
+    tag_ids = tag_ids or {}
+    now = timezone.now()
+    category_deltas = Counter()
+    previous_values = []
+    with transaction.atomic():
+        for task in tasks:
+            previous_values.append(
+                getattr(task, "_loaded_summary_values", None) or task.summary_values()
+            )
+            task.sync_completed_at()
+            # bulk_update doesn't apply auto_now
+            task.updated_at = now
+            previous = getattr(task, "_loaded_category_id", task.category_id)
+            if previous != task.category_id:
+                category_deltas[previous] -= 1
+                category_deltas[task.category_id] += 1
+        Task.objects.bulk_update(
+            tasks,
+            sorted(set(fields) | {"completed_at", "updated_at"}),
+            batch_size=batch_size,
+        )
+
+        tag_deltas = _replace_tags(tag_ids, batch_size) if tag_ids else Counter()
+        adjust_task_counts(category_deltas=category_deltas, tag_deltas=tag_deltas)
+        current = [task.summary_values() for task in tasks]
+        adjust_task_summary(summary_deltas(previous_values, current))
+    for task, values in zip(tasks, current):
+        task._loaded_category_id = task.category_id
+        task._loaded_summary_values = values
+    return tasks
+
+
+def _replace_tags(tag_ids, batch_size):
+    wanted = {task_pk: set(ids) for task_pk, ids in tag_ids.items()}
+    existing = {}
+    stale_links = []
+    for link_pk, task_pk, tag_pk in TaskTags.objects.filter(
+        task_id__in=wanted
+    ).values_list("pk", "task_id", "tag_id"):
+        existing.setdefault(task_pk, set()).add(tag_pk)
+        if tag_pk not in wanted[task_pk]:
+            stale_links.append((link_pk, tag_pk))
+
+    new_links = [
+        TaskTags(task_id=task_pk, tag_id=tag_pk)
+        for task_pk, ids in wanted.items()
+        for tag_pk in ids - existing.get(task_pk, set())
+    ]
+    if stale_links:
+        TaskTags.objects.filter(pk__in=[pk for pk, _ in stale_links]).delete()
+    TaskTags.objects.bulk_create(new_links, batch_size=batch_size)
+
+    deltas = Counter(link.tag_id for link in new_links)
+    deltas.subtract(tag_pk for _, tag_pk in stale_links)
+    return deltas
+
+
+def delete_tasks(queryset):
+    """
+    Deletes the tasks in `queryset` and releases their category and tag
+    counts with one UPDATE per distinct delta, and their daily summary
+    counts with one UPDATE per row, instead of the per-task queries the
+    delete signals would run. Returns the number deleted.
+    """
+    with transaction.atomic():
+        rows = list(queryset.values_list("pk", *SUMMARY_FIELDS))
+        if not rows:
+            return 0
+        task_ids = [row[0] for row in rows]
+        tag_counts = Counter(
+            TaskTags.objects.filter(task_id__in=task_ids).values_list(
+                "tag_id", flat=True
+            )
+        )
+        with counter_signals_suspended():
+            Task.objects.filter(pk__in=task_ids).delete()
+        category_counts = Counter(row[2] for row in rows)
+        adjust_task_counts(
+            category_deltas={pk: -n for pk, n in category_counts.items()},
+            tag_deltas={pk: -n for pk, n in tag_counts.items()},
+        )
+        adjust_task_summary(
+            summary_deltas([row[1:] for row in rows], [None] * len(rows))
+        )
+    return len(rows)
@@ -0,0 +1,141 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+# Prefix for every key written by the response cache
+KEY_PREFIX = "tasks:responses"
+
+
+class VersionedResponseCache:
+    """
+    Read-through cache for serialized API responses.
+
+    Entries live under keys that embed a per-namespace version number, so
+    invalidating a namespace is a single increment: old entries are never
+    read again and simply expire. Only get/set/add/incr are used, which
+    every Django cache backend (local-memory, file-based, ...) provides.
+
+    Settings:
+        RESPONSE_CACHE_ALIAS    cache alias to use (default "default")
+        RESPONSE_CACHE_TIMEOUT  seconds an entry lives (default 600)
+    """
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+    @property
+    def timeout(self):
+        return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 600)
+
+    def version(self, namespace):
+        key = f"{KEY_PREFIX}:{namespace}:version"
+        version = self.cache.get(key)
+        if version is None:
+            # Start from the clock rather than 1: if the version key is ever
+            # evicted, the new number can't collide with older entries
+            self.cache.add(key, int(time.time() * 1000), timeout=None)
+            version = self.cache.get(key)
+        return version
+
+    def invalidate(self, namespace):
+        key = f"{KEY_PREFIX}:{namespace}:version"
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, int(time.time() * 1000), timeout=None)
+
+    def invalidate_after_write(self, *namespaces):
+        """
+        Invalidates now and, inside a transaction, again once it commits:
+        a reader between the two could otherwise cache pre-commit data
+        under the new version.
+        """
+        for namespace in namespaces:
+            self.invalidate(namespace)
+            if transaction.get_connection().in_atomic_block:
+                transaction.on_commit(lambda ns=namespace: self.invalidate(ns))
+
+    def key(self, namespace, *parts):
+        return ":".join(
+            [KEY_PREFIX, namespace, f"v{self.version(namespace)}", *map(str, parts)]
+        )
+
+    def get(self, namespace, key):
+        data = self.cache.get(key)
+        self._count(namespace, "misses" if data is None else "hits")
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, self.timeout)
+
+    def _count(self, namespace, outcome):
+        key = f"{KEY_PREFIX}:{namespace}:{outcome}"
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            if not self.cache.add(key, 1, timeout=None):
+                self.cache.incr(key)
+
+    def stats(self, *namespaces):
+        """Returns {namespace: {"hits": n, "misses": n}}."""
+        return {
+            namespace: {
+                outcome: self.cache.get(f"{KEY_PREFIX}:{namespace}:{outcome}", 0)
+                for outcome in ("hits", "misses")
+            }
+            for namespace in namespaces
+        }
+
+
+response_cache = VersionedResponseCache()
+
+# Namespaces of the cached viewsets, by model
+CATEGORY_NAMESPACE = "categories"
+TAG_NAMESPACE = "tags"
+
+
+class CachedResponseMixin:
+    """
+    Serves list and retrieve from response_cache. The data doesn't depend
+    on the requesting user, so one entry is shared by everyone. Sets an
+    X-Cache: HIT/MISS header.
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            "list",
+            lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            "detail",
+            lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+    def cached_response(self, request, kind, compute):
+        key = response_cache.key(
+            self.cache_namespace,
+            kind,
+            request.accepted_renderer.format,
+            request.get_full_path(),
+        )
+        data = response_cache.get(self.cache_namespace, key)
+        if data is not None:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = compute()
+        if response.status_code == 200:
+            response_cache.set(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
@@ -0,0 +1,60 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import CATEGORY_NAMESPACE, TAG_NAMESPACE, response_cache
+from .models import Category, Tag
+
+_signals_suspended = ContextVar("task_counter_signals_suspended", default=False)
+
+
+@contextmanager
+def counter_signals_suspended():
+    """
+    Turns the per-instance counter signals into no-ops. Bulk writers use it
+    when they compute and apply the counter deltas for a whole batch
+    themselves, e.g. around QuerySet.delete().
+    """
+    token = _signals_suspended.set(True)
+    try:
+        yield
+    finally:
+        _signals_suspended.reset(token)
+
+
+def counter_signals_enabled():
+    return not _signals_suspended.get()
+
+
+def _apply(model, deltas):
+    """Returns whether any counter changed."""
+    # Group ids by delta so each distinct delta costs a single UPDATE
+    ids_by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if pk is not None and delta:
+            ids_by_delta[delta].append(pk)
+    # .update() skips auto_now; bump updated_at so list validators change too
+    now = timezone.now()
+    for delta, ids in ids_by_delta.items():
+        model.objects.filter(pk__in=ids).update(
+            task_count=F("task_count") + delta, updated_at=now
+        )
+    return bool(ids_by_delta)
+
+
+def adjust_task_counts(category_deltas=None, tag_deltas=None):
+    """
+    Applies {pk: delta} changes to the Category and Tag task counters.
+    The UPDATEs use F() expressions so concurrent writers never lose an
+    increment, and they run in one transaction. Cached category/tag
+    responses are invalidated along with them.
+    """
+    with transaction.atomic():
+        if _apply(Category, category_deltas or {}):
+            response_cache.invalidate_after_write(CATEGORY_NAMESPACE)
+        if _apply(Tag, tag_deltas or {}):
+            response_cache.invalidate_after_write(TAG_NAMESPACE)
@@ -0,0 +1,98 @@
+"""
+Streaming export of a user's tasks as NDJSON or CSV.
+
+Rows are produced from a chunked iterator() with the tags prefetched per
+chunk, and written out line by line, so memory use doesn't grow with the
+number of tasks exported.
+"""
+
+import csv
+import json
+
+from django.db.models import Prefetch
+
+from .fast_serializers import datetime_formatter
+from .models import Tag, Task
+
+# Tasks fetched (and tags prefetched) per round trip
+CHUNK_SIZE = 1000
+
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "created_at",
+    "updated_at",
+    "due_date",
+    "completed_at",
+    "category",
+    "tags",
+)
+
+# Separates tag labels inside a CSV cell
+CSV_TAG_SEPARATOR = "|"
+
+
+def export_queryset(user):
+    """The user's tasks, loading only what EXPORT_FIELDS need."""
+    return (
+        Task.objects.filter(user=user)
+        .select_related("category")
+        .only(*EXPORT_FIELDS[:-2], "category__name")
+        .prefetch_related(Prefetch("tags", queryset=Tag.objects.only("label")))
+        .order_by("pk")
+    )
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Yields one dict per task, with the category name and tag labels."""
+    format_datetime = datetime_formatter()
+    for task in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            "id": task.pk,
+            "title": task.title,
+            "description": task.description,
+            "status": task.status,
+            "created_at": format_datetime(task.created_at),
+            "updated_at": format_datetime(task.updated_at),
+            "due_date": format_datetime(task.due_date),
+            "completed_at": format_datetime(task.completed_at),
+            "category": task.category.name,
+            "tags": [tag.label for tag in task.tags.all()],
+        }
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row["tags"] = CSV_TAG_SEPARATOR.join(row["tags"])
+        yield writer.writerow(
+            ["" if row[name] is None else row[name] for name in EXPORT_FIELDS]
+        )
+
+
+# format -> (content type, line generator, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ndjson_lines, "ndjson"),
+    "csv": ("text/csv", csv_lines, "csv"),
+}
+
+
+def export_lines(queryset, export_format, chunk_size=CHUNK_SIZE):
+    """Yields the lines of the export of `queryset` in `export_format`."""
+    _, lines, _ = EXPORT_FORMATS[export_format]
+    return lines(iter_rows(queryset, chunk_size))
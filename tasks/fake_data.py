@@ -0,0 +1,51 @@
+"""
+Fake task rows for seed_data.
+
+Kept free of Django imports so the generator can run in worker processes
+(including with the "spawn" start method) without setting Django up.
+"""
+
+import random
+
+from faker import Faker
+
+
+def generate_task_rows(chunk):
+    """
+    Generates one chunk of task rows as plain tuples:
+        (title, description, status, due_in_days, user_index, category_index, tag_indexes)
+
+    `chunk` is (chunk_number, size, seed, statuses, num_users, num_categories,
+    num_tags). Each chunk seeds its own Faker and Random from (seed,
+    chunk_number), so the output doesn't depend on how chunks are spread
+    across processes.
+    """
+    chunk_number, size, seed, statuses, num_users, num_categories, num_tags = chunk
+    chunk_seed = None if seed is None else seed * 1_000_003 + chunk_number
+    rng = random.Random(chunk_seed)
+    fake = Faker()
+    fake.seed_instance(chunk_seed)
+
+    rows = []
+    for _ in range(size):
+        title = fake.sentence(nb_words=6).replace(".", "")
+        description = (
+            fake.paragraph(nb_sentences=3, variable_nb_sentences=True)
+            if rng.random() > 0.3
+            else None
+        )
+        # 80% chance of having a due date, in the past or future
+        due_in_days = rng.randint(-10, 30) if rng.random() > 0.2 else None
+        tag_indexes = rng.sample(range(num_tags), rng.randint(0, min(3, num_tags)))
+        rows.append(
+            (
+                title,
+                description,
+                rng.choice(statuses),
+                due_in_days,
+                rng.randrange(num_users),
+                rng.randrange(num_categories),
+                tag_indexes,
+            )
+        )
+    return rows
@@ -0,0 +1,319 @@
+"""
+Read-only Task serialization without the DRF field machinery.
+
+Produces exactly what TaskSerializer(many=True).data renders, from either
+loaded Task instances (with user/category selected and tags prefetched)
+or straight from .values() rows. tests.FastSerializerTests compares the
+rendered bytes; any change to TaskSerializer's read fields must be
+mirrored here.
+"""
+
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from DjangoY4.middleware import timed
+
+from .models import Task, TaskStatus
+
+TaskTags = Task.tags.through
+
+STATUS_LABELS = {status.value: status.label for status in TaskStatus}
+
+_datetime_field = serializers.DateTimeField()
+
+
+def datetime_formatter():
+    """
+    Returns a function with the same output as
+    serializers.DateTimeField().to_representation(). Settings and the
+    current time zone are looked up once, not per value.
+    """
+    output_format = api_settings.DATETIME_FORMAT
+    if output_format is None:
+        return lambda value: value or None
+    if output_format.lower() != ISO_8601:
+        return _datetime_field.to_representation
+    field_timezone = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        if not value:
+            return None
+        if timezone.is_naive(value):
+            return _datetime_field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return format_datetime
+
+
+def count_status(count):
+    """Category/Tag.get_task_count_status() for a given count."""
+    if count == 0:
+        return "none"
+    elif 0 < count <= 3:
+        return "few"
+    elif count > 3:
+        return "too many"
+    return "unknown"
+
+
+def _category(pk, name, hex_color, count):
+    return {
+        "id": pk,
+        "name": name,
+        "hex_color": hex_color,
+        "total_tasks": count,
+        "task_count_status": count_status(count),
+    }
+
+
+def _tag(pk, label, count):
+    return {
+        "id": pk,
+        "label": label,
+        "total_tasks": count,
+        "task_count_status": count_status(count),
+    }
+
+
+def _task(
+    pk,
+    title,
+    description,
+    status,
+    created_at,
+    updated_at,
+    due_date,
+    completed_at,
+    user,
+    category,
+    tags,
+    format_datetime,
+):
+    return {
+        "id": pk,
+        "title": title,
+        "description": description,
+        "status": status,
+        "status_label": STATUS_LABELS.get(status, status),
+        "created_at": format_datetime(created_at),
+        "updated_at": format_datetime(updated_at),
+        "due_date": format_datetime(due_date),
+        "completed_at": format_datetime(completed_at),
+        "is_completed": status == TaskStatus.DONE.value,
+        "user": user,
+        "category": category,
+        "tags": tags,
+    }
+
+
+def _prefetched_tags(task):
+    # The prefetched list itself; building a related manager per task
+    # costs more than serializing the task
+    prefetched = getattr(task, "_prefetched_objects_cache", {}).get("tags")
+    return task.tags.all() if prefetched is None else prefetched
+
+
+class _RelatedCache:
+    """Builds each shared category and tag dict once per call."""
+
+    def __init__(self):
+        self.categories = {}
+        self.tags = {}
+
+    def category(self, task):
+        category = self.categories.get(task.category_id)
+        if category is None:
+            c = task.category
+            category = self.categories[c.pk] = _category(
+                c.pk, c.name, c.hex_color, c.total_count()
+            )
+        return category
+
+    def tags_of(self, task):
+        task_tags = []
+        for t in _prefetched_tags(task):
+            tag = self.tags.get(t.pk)
+            if tag is None:
+                tag = self.tags[t.pk] = _tag(t.pk, t.label, t.total_count())
+            task_tags.append(tag)
+        return task_tags
+
+
+@timed("serialize")
+def serialize_tasks(tasks, fieldset=None):
+    """
+    Serializes Task instances loaded with select_related("user",
+    "category") and prefetch_related("tags"); without them every task
+    costs extra queries, as with TaskSerializer. With a fieldset (see
+    tasks.fieldsets) only its fields are read, matching TaskSerializer
+    given the same fieldset in its context.
+    """
+    if fieldset is not None:
+        return _serialize_sparse(tasks, fieldset)
+
+    format_datetime = datetime_formatter()
+    related = _RelatedCache()
+    return [
+        _task(
+            task.pk,
+            task.title,
+            task.description,
+            task.status,
+            task.created_at,
+            task.updated_at,
+            task.due_date,
+            task.completed_at,
+            str(task.user),
+            related.category(task),
+            related.tags_of(task),
+            format_datetime,
+        )
+        for task in tasks
+    ]
+
+
+def _serialize_sparse(tasks, fieldset):
+    format_datetime = datetime_formatter()
+    related = _RelatedCache()
+
+    def datetime_getter(name):
+        return lambda task: format_datetime(getattr(task, name))
+
+    getters = {
+        "id": lambda task: task.pk,
+        "title": lambda task: task.title,
+        "description": lambda task: task.description,
+        "status": lambda task: task.status,
+        "status_label": lambda task: STATUS_LABELS.get(task.status, task.status),
+        "created_at": datetime_getter("created_at"),
+        "updated_at": datetime_getter("updated_at"),
+        "due_date": datetime_getter("due_date"),
+        "completed_at": datetime_getter("completed_at"),
+        "is_completed": lambda task: task.status == TaskStatus.DONE.value,
+        "user": lambda task: str(task.user),
+        "category": (
+            related.category
+            if "category" in fieldset.expand
+            else lambda task: task.category_id
+        ),
+        "tags": (
+            related.tags_of
+            if "tags" in fieldset.expand
+            else lambda task: [tag.pk for tag in _prefetched_tags(task)]
+        ),
+    }
+    selected = [(name, getters[name]) for name in fieldset.fields]
+    return [{name: get(task) for name, get in selected} for task in tasks]
+
+
+# User.__str__ returns the email
+TASK_VALUES = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "created_at",
+    "updated_at",
+    "due_date",
+    "completed_at",
+    "user__email",
+    "category_id",
+    "category__name",
+    "category__hex_color",
+    "category__task_count",
+)
+
+
+def serialize_task_values(queryset):
+    """
+    Serializes the tasks in `queryset` from .values_list() rows, skipping
+    model instances altogether: one query for the tasks (joined with user
+    and category) and one for their tags.
+    """
+    rows = list(queryset.values_list(*TASK_VALUES))
+    return serialize_task_rows(rows, _tags_by_task([row[0] for row in rows]))
+
+
+@timed("serialize")
+def serialize_task_rows(rows, tags_by_task):
+    """
+    Builds the dicts for TASK_VALUES rows; `tags_by_task` maps task ids to
+    lists of serialized tags (see _tags_by_task).
+    """
+    format_datetime = datetime_formatter()
+    categories = {}
+    results = []
+    for (
+        pk,
+        title,
+        description,
+        status,
+        created_at,
+        updated_at,
+        due_date,
+        completed_at,
+        email,
+        category_id,
+        category_name,
+        hex_color,
+        category_count,
+    ) in rows:
+        category = categories.get(category_id)
+        if category is None:
+            category = categories[category_id] = _category(
+                category_id, category_name, hex_color, category_count
+            )
+        results.append(
+            _task(
+                pk,
+                title,
+                description,
+                status,
+                created_at,
+                updated_at,
+                due_date,
+                completed_at,
+                email,
+                category,
+                tags_by_task.get(pk, []),
+                format_datetime,
+            )
+        )
+    return results
+
+
+def _tags_by_task(task_ids):
+    tags = {}
+    by_task = {}
+    if not task_ids:
+        return by_task
+    # Same join as prefetch_related("tags"), so tags come back in the same order
+    for task_id, tag_id, label, count in TaskTags.objects.filter(
+        task_id__in=task_ids
+    ).values_list("task_id", "tag_id", "tag__label", "tag__task_count"):
+        tag = tags.get(tag_id)
+        if tag is None:
+            tag = tags[tag_id] = _tag(tag_id, label, count)
+        by_task.setdefault(task_id, []).append(tag)
+    return by_task
+
+
+class FastTaskListMixin:
+    """
+    list() through serialize_tasks() instead of the serializer. Place it
+    after ConditionalListMixin so 304s still skip serialization entirely.
+    The viewset provides get_fieldset() (None for the full representation).
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        fieldset = self.get_fieldset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize_tasks(page, fieldset))
+        return Response(serialize_tasks(queryset, fieldset))
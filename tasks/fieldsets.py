@@ -0,0 +1,128 @@
+"""
+Sparse fieldsets for task reads: ?fields=id,title,status&expand=category,tags
+
+Without ?fields= every field is returned with category and tags nested,
+as before. With it only the listed fields are returned; category and tags
+come back as ids unless they are also named in ?expand=, which nests them
+(and includes them even when ?fields= doesn't list them).
+
+The queryset loads only the columns, joins and prefetches the requested
+fields need.
+"""
+
+from collections import namedtuple
+
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+
+from .models import Tag
+
+# TaskSerializer's read fields, in output order
+TASK_READ_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "status_label",
+    "created_at",
+    "updated_at",
+    "due_date",
+    "completed_at",
+    "is_completed",
+    "user",
+    "category",
+    "tags",
+)
+EXPANDABLE_FIELDS = ("category", "tags")
+
+# Task columns each read field needs (relations are handled separately)
+_COLUMNS = {
+    "id": ("id",),
+    "title": ("title",),
+    "description": ("description",),
+    "status": ("status",),
+    "status_label": ("status",),
+    "created_at": ("created_at",),
+    "updated_at": ("updated_at",),
+    "due_date": ("due_date",),
+    "completed_at": ("completed_at",),
+    "is_completed": ("status",),
+    # User.__str__ returns the email
+    "user": ("user__email",),
+    "category": ("category_id",),
+    "tags": (),
+}
+
+Fieldset = namedtuple("Fieldset", ["fields", "expand"])
+
+
+def _names(query_params, param):
+    return [
+        name.strip()
+        for value in query_params.getlist(param)
+        for name in value.split(",")
+        if name.strip()
+    ]
+
+
+def parse_fieldset(query_params):
+    """
+    Returns a Fieldset, or None when ?fields= isn't given (the full
+    representation). Unknown names raise a ValidationError (400).
+    """
+    fields = _names(query_params, "fields")
+    expand = _names(query_params, "expand")
+
+    errors = {}
+    unknown = [name for name in fields if name not in TASK_READ_FIELDS]
+    if unknown:
+        errors["fields"] = [f"Unknown field(s): {', '.join(unknown)}."]
+    unknown = [name for name in expand if name not in EXPANDABLE_FIELDS]
+    if unknown:
+        errors["expand"] = [
+            f"Cannot expand: {', '.join(unknown)}."
+            f" Choices are: {', '.join(EXPANDABLE_FIELDS)}."
+        ]
+    if errors:
+        raise ValidationError(errors)
+
+    if not fields:
+        return None
+    requested = set(fields) | set(expand)
+    return Fieldset(
+        fields=tuple(name for name in TASK_READ_FIELDS if name in requested),
+        expand=frozenset(expand),
+    )
+
+
+def apply_fieldset(queryset, fieldset, always=()):
+    """
+    Restricts `queryset` to what `fieldset` renders: .only() the needed
+    columns (plus `always`, e.g. the pagination keys), select_related()
+    only for user/expanded category, and prefetch tags only when asked for.
+    """
+    if fieldset is None:
+        return queryset.select_related("user", "category").prefetch_related("tags")
+
+    columns = {"id", *always}
+    for name in fieldset.fields:
+        columns.update(_COLUMNS[name])
+
+    related = []
+    if "user" in fieldset.fields:
+        related.append("user")
+    if "category" in fieldset.expand:
+        related.append("category")
+        columns.update(
+            f"category__{name}" for name in ("id", "name", "hex_color", "task_count")
+        )
+    queryset = queryset.select_related(*related) if related else queryset
+    queryset = queryset.only(*columns)
+
+    if "tags" in fieldset.expand:
+        queryset = queryset.prefetch_related("tags")
+    elif "tags" in fieldset.fields:
+        queryset = queryset.prefetch_related(
+            Prefetch("tags", queryset=Tag.objects.only("id"))
+        )
+    return queryset
@@ -0,0 +1,88 @@
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import TaskStatus
+
+# Statuses that can no longer become overdue
+CLOSED_STATUSES = (TaskStatus.DONE.value, TaskStatus.CANCELLED.value)
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Server-side filtering for the task list. Every filter is combined with
+    the user restriction from TaskViewSet.get_queryset() so it can use one
+    of the (user, ...) composite indexes on Task.
+
+    Query parameters:
+        status          one or more statuses (?status=todo&status=done or ?status=todo,done)
+        category        one or more category ids
+        due_after       due_date >= value (ISO 8601)
+        due_before      due_date < value
+        overdue         true: due_date in the past and status not done/cancelled
+        completed_after completed_at >= value
+        completed_before completed_at < value
+    """
+
+    datetime_field = serializers.DateTimeField()
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        errors = {}
+
+        statuses = self.get_list(params, "status")
+        if statuses:
+            valid = {status.value for status in TaskStatus}
+            unknown = [status for status in statuses if status not in valid]
+            if unknown:
+                errors["status"] = [f"Unknown status: {', '.join(unknown)}."]
+            else:
+                queryset = queryset.filter(status__in=statuses)
+
+        categories = self.get_list(params, "category")
+        if categories:
+            try:
+                queryset = queryset.filter(
+                    category_id__in=[int(pk) for pk in categories]
+                )
+            except ValueError:
+                errors["category"] = ["Expected category ids."]
+
+        for param, lookup in (
+            ("due_after", "due_date__gte"),
+            ("due_before", "due_date__lt"),
+            ("completed_after", "completed_at__gte"),
+            ("completed_before", "completed_at__lt"),
+        ):
+            if param in params:
+                try:
+                    value = self.datetime_field.to_internal_value(params[param])
+                except serializers.ValidationError as exc:
+                    errors[param] = exc.detail
+                else:
+                    queryset = queryset.filter(**{lookup: value})
+
+        if self.depends_on_time(params):
+            queryset = queryset.filter(due_date__lt=timezone.now()).exclude(
+                status__in=CLOSED_STATUSES
+            )
+
+        if errors:
+            raise ValidationError(errors)
+        return queryset
+
+    @staticmethod
+    def depends_on_time(params):
+        """True if the filters in `params` compare against the current time."""
+        return params.get("overdue", "").lower() in TRUE_VALUES
+
+    @staticmethod
+    def get_list(params, name):
+        # Accept both repeated parameters and comma separated values
+        values = []
+        for raw in params.getlist(name):
+            values.extend(value.strip() for value in raw.split(",") if value.strip())
+        return values
@@ -0,0 +1,229 @@
+"""
+Bulk import of tasks from NDJSON or CSV, in the layout tasks/export.py
+writes: title, description, status, due_date, category (a name) and tags
+(a list of labels, or CSV_TAG_SEPARATOR-joined in CSV). Other columns,
+such as id or created_at, are ignored.
+
+Input is read as a stream; rows are validated one at a time and inserted
+in batches, one transaction each. A bad row is reported and skipped
+without aborting the run. After every batch the importer knows the
+offset (rows consumed) to resume from.
+"""
+
+import csv
+import json
+from collections import namedtuple
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .bulk import create_tasks
+from .cache import CATEGORY_NAMESPACE, TAG_NAMESPACE, response_cache
+from .export import CSV_TAG_SEPARATOR
+from .models import Category, Tag, Task, TaskStatus
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# Rows inserted per transaction
+BATCH_SIZE = 1000
+
+# Row errors kept in the result; all of them are counted
+MAX_REPORTED_ERRORS = 1000
+
+RowError = namedtuple("RowError", ["row", "message"])
+
+
+class ImportResult:
+    def __init__(self, offset):
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+        # Rows consumed, counting from the start of the input
+        self.offset = offset
+
+    def add_error(self, row, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(row, message))
+
+    def as_dict(self):
+        return {
+            "imported": self.imported,
+            "error_count": self.error_count,
+            "errors": [error._asdict() for error in self.errors],
+            "offset": self.offset,
+        }
+
+
+def read_rows(lines, import_format, start=0):
+    """
+    Yields (row number, dict or None) for the data rows of `lines` (an
+    iterable of text lines, e.g. an open file), skipping the first
+    `start`. Row numbers count data rows from 0, so the number after the
+    last consumed row is the resume offset. None marks an unparsable row.
+    """
+    if import_format == "csv":
+        for number, row in enumerate(csv.DictReader(lines)):
+            if number >= start:
+                yield number, row
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        if number >= start:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else None
+        number += 1
+
+
+_title_field = serializers.CharField(max_length=500)
+_description_field = serializers.CharField(allow_blank=True, allow_null=True)
+_status_field = serializers.ChoiceField(choices=TaskStatus.choices())
+_due_date_field = serializers.DateTimeField(allow_null=True)
+_name_field = serializers.CharField(max_length=100)
+
+
+def clean_row(row):
+    """
+    Returns (task values, category name, tag labels) for one input row, or
+    raises serializers.ValidationError.
+    """
+    errors = {}
+
+    def clean(name, field, value):
+        try:
+            return field.run_validation(value)
+        except serializers.ValidationError as exc:
+            errors[name] = exc.detail
+            return None
+
+    values = {
+        "title": clean("title", _title_field, row.get("title", serializers.empty)),
+        "description": clean(
+            "description", _description_field, row.get("description") or None
+        ),
+        "status": clean(
+            "status",
+            _status_field,
+            row.get("status") or TaskStatus.INIT.value,
+        ),
+        "due_date": clean("due_date", _due_date_field, row.get("due_date") or None),
+    }
+    category = clean("category", _name_field, row.get("category", serializers.empty))
+
+    tags = row.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split(CSV_TAG_SEPARATOR)
+    if not isinstance(tags, list):
+        errors["tags"] = ["Expected a list of labels."]
+        tags = []
+    tags = {clean("tags", _name_field, label) for label in tags if label != ""}
+
+    if errors:
+        raise serializers.ValidationError(errors)
+    return values, category, tags
+
+
+class NameCache:
+    """
+    Maps category names and tag labels to primary keys, resolving the
+    names a batch hasn't seen yet with one query per model and creating
+    the missing rows with one bulk insert. Existing duplicates resolve to
+    the oldest row.
+    """
+
+    def __init__(self):
+        self.categories = {}
+        self.tags = {}
+        self.created = False
+
+    def resolve(self, category_names, tag_labels):
+        self._resolve(Category, "name", self.categories, category_names)
+        self._resolve(Tag, "label", self.tags, tag_labels)
+
+    def _resolve(self, model, field, known, names):
+        missing = set(names) - known.keys()
+        if not missing:
+            return
+        for pk, name in (
+            model.objects.filter(**{f"{field}__in": missing})
+            .order_by("-pk")
+            .values_list("pk", field)
+        ):
+            known[name] = pk
+        new = [model(**{field: name}) for name in sorted(missing - known.keys())]
+        if new:
+            model.objects.bulk_create(new)
+            known.update((getattr(obj, field), obj.pk) for obj in new)
+            self.created = True
+
+
+class TaskImporter:
+    def __init__(self, user, batch_size=BATCH_SIZE, on_batch=None):
+        self.user = user
+        self.batch_size = max(1, batch_size)
+        # Called with the ImportResult after every committed batch
+        self.on_batch = on_batch
+        self.names = NameCache()
+
+    def run(self, lines, import_format, start=0):
+        """Imports the rows of `lines` from offset `start`; returns an ImportResult."""
+        result = ImportResult(offset=start)
+        batch = []
+        end = start
+        for number, row in read_rows(lines, import_format, start):
+            end = number + 1
+            if row is None:
+                result.add_error(number, "Could not parse row.")
+            else:
+                try:
+                    batch.append(clean_row(row))
+                except serializers.ValidationError as exc:
+                    result.add_error(number, exc.detail)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, result, offset=end)
+                batch = []
+            elif not batch:
+                # Nothing pending, so resuming can start after this row
+                result.offset = end
+        self._flush(batch, result, offset=end)
+        return result
+
+    def _flush(self, batch, result, offset):
+        # The offset only moves past rows once they are committed
+        if batch:
+            with transaction.atomic():
+                self.names.resolve(
+                    {category for _, category, _ in batch},
+                    {label for _, _, tags in batch for label in tags},
+                )
+                create_tasks(
+                    [
+                        Task(
+                            user=self.user,
+                            category_id=self.names.categories[category],
+                            **values,
+                        )
+                        for values, category, _ in batch
+                    ],
+                    [
+                        [self.names.tags[label] for label in tags]
+                        for _, _, tags in batch
+                    ],
+                    batch_size=self.batch_size,
+                )
+                if self.names.created:
+                    # bulk_create sends no post_save for the cache signals
+                    response_cache.invalidate_after_write(
+                        CATEGORY_NAMESPACE, TAG_NAMESPACE
+                    )
+                    self.names.created = False
+            result.imported += len(batch)
+        result.offset = offset
+        if self.on_batch is not None:
+            self.on_batch(result)
@@ -0,0 +1,281 @@
+import json
+import platform
+import threading
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from tasks.benchmarking import (
+    compare_to_baseline,
+    run_threaded,
+    scratch_database,
+    seed_tasks,
+    summarize,
+)
+from tasks.models import Category, Tag, Task, TaskStatus
+
+# seed_tasks() gives every user this password
+PASSWORD = "password123"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures p50/p95 latency and throughput of list, retrieve, create and"
+        " update on the task, category and tag endpoints, and of djoser token"
+        " login, on a scratch database seeded with --users/--categories/--tags/"
+        "--tasks. Writes the results as JSON with --output and compares them"
+        " with an earlier --output file given as --baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--tags", type=int, default=50)
+        parser.add_argument(
+            "--tasks", type=int, default=20_000, help="Tasks, spread over the users."
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Timed requests per scenario."
+        )
+        parser.add_argument(
+            "--login-requests",
+            type=int,
+            default=20,
+            help="Timed logins (each one hashes the password).",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=5, help="Untimed requests per scenario."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=1, help="Requests in flight at once."
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            help="Only run this scenario (repeatable), e.g. task-list.",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--baseline", help="Compare with the results in this JSON file."
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed regression against the baseline (0.2 = 20%%).",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            try:
+                baseline = json.loads(Path(options["baseline"]).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Can't read the baseline: {exc}")
+
+        config = {
+            name: options[name]
+            for name in (
+                "users",
+                "categories",
+                "tags",
+                "tasks",
+                "requests",
+                "login_requests",
+                "concurrency",
+            )
+        }
+        with scratch_database():
+            self.stdout.write(
+                f"Seeding {options['tasks']} tasks for {options['users']} users..."
+            )
+            user = seed_tasks(
+                options["tasks"],
+                num_users=max(1, options["users"]),
+                num_categories=max(1, options["categories"]),
+                num_tags=max(1, options["tags"]),
+            )[0]
+            key = Token.objects.create(user=user).key
+            scenarios = self.scenarios(user)
+            unknown = set(options["scenarios"] or ()) - set(scenarios)
+            if unknown:
+                raise CommandError(
+                    f"Unknown scenarios: {', '.join(sorted(unknown))}."
+                    f" Choices are: {', '.join(scenarios)}."
+                )
+            results = {}
+            for name, scenario in scenarios.items():
+                if options["scenarios"] and name not in options["scenarios"]:
+                    continue
+                total = options["login_requests" if name == "login" else "requests"]
+                results[name] = self.run(
+                    scenario,
+                    key,
+                    max(1, total),
+                    max(0, options["warmup"]),
+                    max(1, options["concurrency"]),
+                )
+                self.stdout.write(
+                    f"  {name:<18} {results[name]['requests_per_second']:8.0f} req/s"
+                    f"  p50 {results[name]['p50_ms']:7.1f} ms"
+                    f"  p95 {results[name]['p95_ms']:7.1f} ms"
+                )
+            # Connections opened by the benchmark threads
+            connections.close_all()
+
+        report = {
+            "config": config,
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "results": results,
+        }
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(f"Wrote {options['output']}.")
+        if baseline is not None:
+            self.compare(report, baseline, options["threshold"])
+
+    def scenarios(self, user):
+        """{name: (method, path(i), payload(i) or None, expected status)}"""
+        task_ids = list(
+            Task.objects.filter(user=user).order_by("pk").values_list("pk", flat=True)
+        )
+        category_ids = list(
+            Category.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        tag_ids = list(Tag.objects.order_by("pk").values_list("pk", flat=True))
+        if not task_ids:
+            raise CommandError("The benchmark user has no tasks; seed more --tasks.")
+        statuses = [status.value for status in TaskStatus]
+
+        def pick(ids):
+            return lambda i: ids[i % len(ids)]
+
+        task, category, tag = pick(task_ids), pick(category_ids), pick(tag_ids)
+        return {
+            "task-list": ("get", lambda i: "/api/tasks/?page_size=50", None, 200),
+            "task-retrieve": ("get", lambda i: f"/api/tasks/{task(i)}/", None, 200),
+            "task-create": (
+                "post",
+                lambda i: "/api/tasks/",
+                lambda i: {
+                    "title": f"Bench task {i}",
+                    "category_id": category(i),
+                    "tag_ids": [tag(i), tag(i + 1)],
+                },
+                201,
+            ),
+            "task-update": (
+                "patch",
+                lambda i: f"/api/tasks/{task(i)}/",
+                lambda i: {"status": statuses[i % len(statuses)]},
+                200,
+            ),
+            "category-list": ("get", lambda i: "/api/categories/", None, 200),
+            "category-retrieve": (
+                "get",
+                lambda i: f"/api/categories/{category(i)}/",
+                None,
+                200,
+            ),
+            "category-create": (
+                "post",
+                lambda i: "/api/categories/",
+                lambda i: {"name": f"Bench category {i}", "hex_color": "#336699"},
+                201,
+            ),
+            "category-update": (
+                "patch",
+                lambda i: f"/api/categories/{category(i)}/",
+                lambda i: {"name": f"Category {i}"},
+                200,
+            ),
+            "tag-list": ("get", lambda i: "/api/tags/", None, 200),
+            "tag-retrieve": ("get", lambda i: f"/api/tags/{tag(i)}/", None, 200),
+            "tag-create": (
+                "post",
+                lambda i: "/api/tags/",
+                lambda i: {"label": f"bench{i}"},
+                201,
+            ),
+            "tag-update": (
+                "patch",
+                lambda i: f"/api/tags/{tag(i)}/",
+                lambda i: {"label": f"tag{i}"},
+                200,
+            ),
+            "login": (
+                "post",
+                lambda i: "/api/auth/token/login/",
+                lambda i: {"email": user.email, "password": PASSWORD},
+                200,
+            ),
+        }
+
+    def run(self, scenario, key, total, warmup, concurrency):
+        method, path, payload, expected = scenario
+        local = threading.local()
+        counter = iter(range(10**9))
+        lock = threading.Lock()
+
+        def call():
+            # One Client per thread: clients aren't meant to be shared
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = Client(
+                    headers={"Authorization": f"Token {key}"}
+                )
+            with lock:
+                i = next(counter)
+            kwargs = {}
+            if payload is not None:
+                kwargs = {
+                    "data": json.dumps(payload(i)),
+                    "content_type": "application/json",
+                }
+            response = getattr(client, method)(path(i), **kwargs)
+            if response.status_code != expected:
+                raise CommandError(
+                    f"{method.upper()} {path(i)} returned {response.status_code}:"
+                    f" {response.content[:200]!r}"
+                )
+
+        for _ in range(warmup):
+            call()
+        samples, elapsed = run_threaded(call, total, concurrency)
+        return {
+            "requests": total,
+            "requests_per_second": total / elapsed,
+            **summarize(samples),
+        }
+
+    def compare(self, report, baseline, threshold):
+        if baseline.get("config") != report["config"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    "The baseline was recorded with different settings:"
+                    f" {baseline.get('config')}"
+                )
+            )
+        rows = compare_to_baseline(
+            report["results"], baseline.get("results", {}), threshold
+        )
+        self.stdout.write(f"Against the baseline (threshold {threshold:.0%}):")
+        for scenario, metric, before, after, change, regressed in rows:
+            line = (
+                f"  {scenario:<18} {metric:<20} {before:10.1f} -> {after:10.1f}"
+                f"  {change:+7.1%}"
+            )
+            self.stdout.write(self.style.ERROR(line) if regressed else line)
+        regressions = sorted({row[0] for row in rows if row[5]})
+        if regressions:
+            raise CommandError(f"Regressed: {', '.join(regressions)}.")
+        self.stdout.write(self.style.SUCCESS("No regressions."))
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+from rest_framework.authtoken.models import Token
+
+from tasks.benchmarking import (
+    run_concurrently,
+    run_threaded,
+    scratch_database,
+    seed_tasks,
+    summarize,
+)
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares concurrent throughput of the read endpoints served by the"
+        " WSGI handler (sync views, one thread per in-flight request) and the"
+        " ASGI handler (the same sync views, and the async views under"
+        " /api/async/), on a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tasks", type=int, default=2000, help="Tasks to seed for the user."
+        )
+        parser.add_argument(
+            "--requests", type=int, default=400, help="Requests per endpoint and mode."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=16, help="Requests in flight at once."
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the results as JSON."
+        )
+
+    def handle(self, *args, **options):
+        total = max(1, options["requests"])
+        concurrency = max(1, options["concurrency"])
+        results = []
+
+        with scratch_database():
+            user = seed_tasks(options["tasks"])[0]
+            key = Token.objects.create(user=user).key
+            task_pk = Task.objects.filter(user=user).values_list("pk", flat=True)[0]
+            endpoints = {
+                "task list": "tasks/?page_size=50",
+                "task detail": f"tasks/{task_pk}/",
+                "category list": "categories/",
+                "tag list": "tags/",
+            }
+
+            for name, path in endpoints.items():
+                for mode, run in (
+                    ("wsgi sync", self.bench_wsgi),
+                    ("asgi sync", self.bench_asgi),
+                    ("asgi async", self.bench_asgi),
+                ):
+                    prefix = "/api/async/" if mode == "asgi async" else "/api/"
+                    samples, elapsed = run(prefix + path, key, total, concurrency)
+                    results.append(
+                        {
+                            "endpoint": name,
+                            "mode": mode,
+                            "requests_per_second": total / elapsed,
+                            **summarize(samples),
+                        }
+                    )
+            # Connections opened by the benchmark threads
+            connections.close_all()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{total} requests per row, {concurrency} concurrent,"
+            f" {options['tasks']} tasks:"
+        )
+        for row in results:
+            self.stdout.write(
+                f"  {row['endpoint']:<14} {row['mode']:<11}"
+                f" {row['requests_per_second']:8.0f} req/s"
+                f"  p50 {row['p50_ms']:7.1f} ms  p95 {row['p95_ms']:7.1f} ms"
+            )
+
+    def bench_wsgi(self, url, key, total, concurrency):
+        headers = {"Authorization": f"Token {key}"}
+
+        def get():
+            # One Client per call: clients aren't meant to be shared by threads
+            response = Client().get(url, headers=headers)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} returned {response.status_code}.")
+
+        return run_threaded(get, total, concurrency)
+
+    def bench_asgi(self, url, key, total, concurrency):
+        client = AsyncClient()
+        headers = {"Authorization": f"Token {key}"}
+
+        async def get():
+            response = await client.get(url, headers=headers)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} returned {response.status_code}.")
+
+        return asyncio.run(run_concurrently(get, total, concurrency))
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from tasks.benchmarking import scratch_database, seed_tasks, summarize, time_call
+from tasks.fast_serializers import serialize_task_values, serialize_tasks
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares TaskSerializer with the fast serialization paths on a"
+        " scratch database seeded with --tasks tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tasks", type=int, default=10_000, help="Number of tasks to serialize."
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timed runs per serializer."
+        )
+
+    def handle(self, *args, **options):
+        num_tasks = options["tasks"]
+        repeat = max(1, options["repeat"])
+
+        with scratch_database():
+            self.stdout.write(f"Seeding {num_tasks} tasks...")
+            seed_tasks(num_tasks)
+
+            queryset = Task.objects.select_related("user", "category").prefetch_related(
+                "tags"
+            )
+            # Instances are loaded once, so the first two rows time serialization only
+            tasks = list(queryset)
+            renderer = JSONRenderer()
+            outputs = {}
+
+            def run(name, produce):
+                def once():
+                    outputs[name] = renderer.render(produce())
+
+                samples = time_call(once, repeat)
+                stats = summarize(samples)
+                self.stdout.write(
+                    f"  {name:<32} p50 {stats['p50_ms']:8.1f} ms"
+                    f"  ({num_tasks / (stats['p50_ms'] / 1000):,.0f} tasks/s)"
+                )
+                return stats
+
+            self.stdout.write(f"Serializing + rendering {num_tasks} tasks:")
+            baseline = run(
+                "TaskSerializer (loaded)",
+                lambda: TaskSerializer(tasks, many=True).data,
+            )
+            fast = run("serialize_tasks (loaded)", lambda: serialize_tasks(tasks))
+            values = run(
+                "serialize_task_values (queries)",
+                lambda: serialize_task_values(queryset),
+            )
+
+        if len(set(outputs.values())) != 1:
+            raise CommandError("Serializer outputs differ.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Outputs identical. serialize_tasks is"
+                f" {baseline['p50_ms'] / fast['p50_ms']:.1f}x, serialize_task_values"
+                f" {baseline['p50_ms'] / values['p50_ms']:.1f}x the serializer."
+            )
+        )
@@ -0,0 +1,149 @@
+import json
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+
+from tasks.benchmarking import scratch_database, seed_tasks, summarize
+from tasks.models import Task, TaskStatus
+
+# The sqlite3 module's defaults: rollback journal, synchronous=FULL, 2 MiB
+# cache, no mmap, 5 second busy timeout
+PROFILES = {
+    "defaults": ("DELETE", {"timeout": 5}),
+    "tuned": ("WAL", settings.SQLITE_OPTIONS),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs concurrent readers (a page of a user's tasks) and writers"
+        " (single-task updates) against a scratch SQLite file, first with"
+        " SQLite's default connection settings and then with SQLITE_OPTIONS,"
+        " and compares throughput, latency and lock errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=10_000)
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument(
+            "--seconds", type=float, default=5, help="Run time per profile."
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the results as JSON."
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        with scratch_database():
+            self.stdout.write(f"Seeding {options['tasks']} tasks...")
+            users = seed_tasks(options["tasks"], num_users=options["users"])
+            user_ids = [user.pk for user in users]
+            task_ids = list(Task.objects.values_list("pk", flat=True))
+            path = connection.settings_dict["NAME"]
+            connections.close_all()
+            for name, (journal_mode, profile_options) in PROFILES.items():
+                results[name] = self.run_profile(
+                    name,
+                    path,
+                    journal_mode,
+                    profile_options,
+                    user_ids,
+                    task_ids,
+                    options,
+                )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{options['readers']} readers, {options['writers']} writers,"
+            f" {options['seconds']:g}s per profile:"
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f"  {name:<9} reads {row['reads_per_second']:8.0f}/s"
+                f" (p95 {row['read'].get('p95_ms', 0):6.1f} ms)"
+                f"  writes {row['writes_per_second']:7.0f}/s"
+                f" (p95 {row['write'].get('p95_ms', 0):6.1f} ms)"
+                f"  lock errors {row['lock_errors']}"
+            )
+
+    def run_profile(
+        self, name, path, journal_mode, profile_options, user_ids, task_ids, options
+    ):
+        # The journal mode is stored in the file; switch it with no other
+        # connection open
+        with sqlite3.connect(path) as db:
+            db.execute(f"PRAGMA journal_mode={journal_mode}")
+        alias = f"bench_{name}"
+        connections.settings[alias] = {
+            **connection.settings_dict,
+            "NAME": path,
+            "OPTIONS": profile_options,
+            "CONN_MAX_AGE": 0,
+        }
+        deadline = time.perf_counter() + options["seconds"]
+        reads, writes = [], []
+        lock_errors = [0]
+        lock = threading.Lock()
+        statuses = [status.value for status in TaskStatus]
+
+        def worker(number, is_writer):
+            samples = []
+            i = number
+            try:
+                while time.perf_counter() < deadline:
+                    i += 1
+                    started = time.perf_counter()
+                    try:
+                        if is_writer:
+                            with transaction.atomic(using=alias):
+                                Task.objects.using(alias).filter(
+                                    pk=task_ids[(i * 7919) % len(task_ids)]
+                                ).update(status=statuses[i % len(statuses)])
+                        else:
+                            list(
+                                Task.objects.using(alias)
+                                .filter(user_id=user_ids[i % len(user_ids)])
+                                .select_related("category")
+                                .order_by("-created_at")[:50]
+                            )
+                    except OperationalError:
+                        # "database is locked" after the busy timeout
+                        with lock:
+                            lock_errors[0] += 1
+                        continue
+                    samples.append(time.perf_counter() - started)
+            finally:
+                connections[alias].close()
+            with lock:
+                (writes if is_writer else reads).extend(samples)
+
+        threads = [
+            threading.Thread(target=worker, args=(n, False))
+            for n in range(options["readers"])
+        ] + [
+            threading.Thread(target=worker, args=(n, True))
+            for n in range(options["writers"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        del connections.settings[alias]
+
+        return {
+            "reads_per_second": len(reads) / elapsed,
+            "writes_per_second": len(writes) / elapsed,
+            "read": summarize(reads) if reads else {},
+            "write": summarize(writes) if writes else {},
+            "lock_errors": lock_errors[0],
+        }
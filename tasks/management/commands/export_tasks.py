@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.export import CHUNK_SIZE, EXPORT_FORMATS, export_lines, export_queryset
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Streams a user's tasks as NDJSON or CSV to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user whose tasks to export.")
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=list(EXPORT_FORMATS),
+            default="ndjson",
+            help="Output format.",
+        )
+        parser.add_argument(
+            "--output", help="File to write to (default: standard output)."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Tasks fetched (and tags prefetched) per query.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options["email"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']!r}.")
+
+        lines = export_lines(
+            export_queryset(user),
+            options["export_format"],
+            chunk_size=max(1, options["chunk_size"]),
+        )
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        count = -1 if options["export_format"] == "csv" else 0
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            for line in lines:
+                output.write(line)
+                count += 1
+        self.stderr.write(
+            self.style.SUCCESS(f"Exported {count} tasks to {options['output']}.")
+        )
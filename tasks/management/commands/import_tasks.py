@@ -0,0 +1,107 @@
+import os
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import BATCH_SIZE, IMPORT_FORMATS, TaskImporter
+
+User = get_user_model()
+
+
+def format_error(detail):
+    """Flattens a row error (a ValidationError detail) into one line."""
+    if isinstance(detail, dict):
+        return "; ".join(
+            f"{field}: {format_error(value)}" for field, value in detail.items()
+        )
+    if isinstance(detail, list):
+        return " ".join(format_error(value) for value in detail)
+    return str(detail)
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports tasks for a user from an NDJSON or CSV file (as written by"
+        " export_tasks), streaming it in batches. Bad rows are reported and"
+        " skipped; --checkpoint makes an interrupted run resumable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for standard input.")
+        parser.add_argument(
+            "--user", required=True, help="Email of the user who will own the tasks."
+        )
+        parser.add_argument(
+            "--format",
+            dest="import_format",
+            choices=IMPORT_FORMATS,
+            help="Input format (default: from the file extension, else ndjson).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows inserted per transaction.",
+        )
+        parser.add_argument(
+            "--start",
+            type=int,
+            default=0,
+            help="Number of data rows to skip (the offset a previous run reached).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help=(
+                "File holding the offset reached. Read on start when it exists"
+                " (overriding --start) and rewritten after every batch."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['user']!r}.")
+
+        path = options["path"]
+        import_format = options["import_format"] or (
+            "csv" if path.lower().endswith(".csv") else "ndjson"
+        )
+        start = max(0, options["start"])
+        checkpoint = options["checkpoint"]
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint, encoding="utf-8") as saved:
+                start = int(saved.read().strip() or 0)
+            self.stdout.write(f"Resuming from row {start} ({checkpoint}).")
+
+        def on_batch(result):
+            if checkpoint:
+                with open(checkpoint, "w", encoding="utf-8") as saved:
+                    saved.write(str(result.offset))
+            self.stdout.write(
+                f"  {result.imported} imported, {result.error_count} errors,"
+                f" offset {result.offset}"
+            )
+
+        importer = TaskImporter(
+            user, batch_size=options["batch_size"], on_batch=on_batch
+        )
+        if path == "-":
+            result = importer.run(sys.stdin, import_format, start=start)
+        else:
+            with open(path, encoding="utf-8", newline="") as lines:
+                result = importer.run(lines, import_format, start=start)
+
+        for error in result.errors:
+            self.stderr.write(f"row {error.row}: {format_error(error.message)}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(
+                f"... and {result.error_count - len(result.errors)} more errors."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.imported} tasks with {result.error_count}"
+                f" errors; offset {result.offset}."
+            )
+        )
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.summary import rebuild_summary
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the TaskDailySummary rows behind /api/tasks/stats/ from"
+        " Task, a batch of users per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of users rebuilt per transaction.",
+        )
+        parser.add_argument("--user", help="Only rebuild the user with this email.")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("pk")
+        if options["user"]:
+            users = users.filter(email=options["user"])
+            if not users.exists():
+                raise CommandError(f"No user with email {options['user']!r}.")
+        batch_size = max(1, options["batch_size"])
+
+        rebuilt = rows = 0
+        last_pk = 0
+        while True:
+            # Keyset over the primary key keeps every batch equally cheap
+            user_ids = list(
+                users.filter(pk__gt=last_pk).values_list("pk", flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            rows += rebuild_summary(user_ids)
+            rebuilt += len(user_ids)
+            last_pk = user_ids[-1]
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {rebuilt} users, {rows} rows")
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} summary rows for {rebuilt} users.")
+        )
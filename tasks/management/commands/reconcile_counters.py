@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.cache import CATEGORY_NAMESPACE, TAG_NAMESPACE, response_cache
+from tasks.models import Category, Tag
+
+NAMESPACES = {Category: CATEGORY_NAMESPACE, Tag: TAG_NAMESPACE}
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the denormalized task_count columns on Category and Tag "
+        "in batches and repairs any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of categories/tags recomputed per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing any changes.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+
+        for model in (Category, Tag):
+            checked, fixed = self.reconcile(model, batch_size, dry_run)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model._meta.verbose_name_plural.capitalize()}: checked {checked}, "
+                    f"{'would fix' if dry_run else 'fixed'} {fixed}."
+                )
+            )
+
+    def reconcile(self, model, batch_size, dry_run):
+        checked = fixed = 0
+        last_pk = 0
+        while True:
+            # Keyset over the primary key keeps every batch equally cheap
+            with transaction.atomic():
+                batch = list(
+                    model.objects.filter(pk__gt=last_pk)
+                    .order_by("pk")
+                    .with_task_counts()[:batch_size]
+                )
+                if not batch:
+                    break
+                stale = [obj for obj in batch if obj.task_count != obj.task_total]
+                # bulk_update() skips auto_now; bump updated_at so list
+                # validators change too
+                now = timezone.now()
+                for obj in stale:
+                    obj.task_count = obj.task_total
+                    obj.updated_at = now
+                if stale and not dry_run:
+                    model.objects.bulk_update(stale, ["task_count", "updated_at"])
+                    response_cache.invalidate_after_write(NAMESPACES[model])
+            checked += len(batch)
+            fixed += len(stale)
+            last_pk = batch[-1].pk
+        return checked, fixed
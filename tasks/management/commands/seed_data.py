@@ -1,13 +1,19 @@
-import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timedelta
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from faker import Faker
 
 # Adjust 'mainapp' to your actual app name
-from tasks.models import Category, Tag, Task, TaskStatus
+from tasks.bulk import create_tasks
+from tasks.counters import counter_signals_suspended
+from tasks.fake_data import generate_task_rows
+from tasks.models import Category, Tag, Task, TaskDailySummary, TaskStatus
 
 User = get_user_model()
 
@@ -37,37 +43,58 @@ class Command(BaseCommand):
         parser.add_argument(
             "--clear", action="store_true", help="Clear existing data before seeding."
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per bulk INSERT (and per transaction) when creating tasks.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Seed for Faker and random, for reproducible data.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes generating Faker data in parallel (1 = in-process).",
+        )
 
     def handle(self, *args, **options):
-        fake = Faker()
         num_categories = options["num_categories"]
         num_tags = options["num_tags"]
         num_tasks = options["num_tasks"]
         num_users = options["num_users"]
         clear_data = options["clear"]
+        batch_size = max(1, options["batch_size"])
+        seed = options["seed"]
+        workers = max(1, options["workers"])
+
+        fake = Faker()
+        if seed is not None:
+            fake.seed_instance(seed)
 
         self.stdout.write(self.style.NOTICE("Starting data seeding..."))
 
         if clear_data:
             self.stdout.write(self.style.WARNING("Clearing existing data..."))
-            Task.objects.all().delete()
-            Category.objects.all().delete()
-            Tag.objects.all().delete()
+            self.clear_data()
             # Be cautious with deleting users, especially if you have a superuser you want to keep
             # User.objects.filter(is_superuser=False).delete() # Example to delete non-superusers
 
         # --- Create Users if none exist ---
-        users = list(User.objects.all())
+        users = list(User.objects.order_by("pk"))
         if not users:
             self.stdout.write(self.style.SUCCESS(f"Creating {num_users} users..."))
-            for i in range(num_users):
-                username = fake.user_name() + str(i)  # Ensure unique username
-                email = fake.email()
-                password = "password123"  # A simple password for seeding
-                user = User.objects.create_user(
-                    username=username, email=email, password=password
-                )
-                users.append(user)
+            # Hash once: hashing per user dominates the cost of creating them
+            password = make_password("password123")  # A simple password for seeding
+            emails = self.unique_values(fake.email, num_users, existing=set())
+            users = User.objects.bulk_create(
+                [User(email=email, password=password) for email in emails],
+                batch_size=batch_size,
+            )
             if not users:
                 self.stdout.write(
                     self.style.ERROR(
@@ -80,18 +107,17 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.SUCCESS(f"Creating {num_categories} categories...")
         )
-        categories = []
-        for _ in range(num_categories):
-            name = fake.unique.word().capitalize()
-            while Category.objects.filter(name=name).exists():
-                name = fake.unique.word().capitalize()
-            category = Category.objects.create(
-                name=name,
-                # Use 'hex_color' here, matching the model field name
-                # Slicing to [:7] ensures it fits if max_length=7 in your model
-                hex_color=fake.hex_color()[:7],
-            )
-            categories.append(category)
+        # One query for the names already taken instead of an .exists() per name
+        names = self.unique_values(
+            lambda: fake.word().capitalize(),
+            num_categories,
+            existing=set(Category.objects.values_list("name", flat=True)),
+        )
+        categories = Category.objects.bulk_create(
+            # Slicing to [:7] ensures hex_color fits max_length=7
+            [Category(name=name, hex_color=fake.hex_color()[:7]) for name in names],
+            batch_size=batch_size,
+        )
         if not categories:
             self.stdout.write(
                 self.style.ERROR("No categories created. Cannot create tasks.")
@@ -100,60 +126,118 @@ class Command(BaseCommand):
 
         # --- Create Tags ---
         self.stdout.write(self.style.SUCCESS(f"Creating {num_tags} tags..."))
-        tags = []
-        for _ in range(num_tags):
-            label = fake.unique.word().lower()
-            # Ensure unique tag labels
-            while Tag.objects.filter(label=label).exists():
-                label = fake.unique.word().lower()
-            tag = Tag.objects.create(label=label)
-            tags.append(tag)
+        labels = self.unique_values(
+            lambda: fake.word().lower(),
+            num_tags,
+            existing=set(Tag.objects.values_list("label", flat=True)),
+        )
+        tags = Tag.objects.bulk_create(
+            [Tag(label=label) for label in labels], batch_size=batch_size
+        )
         if not tags:
             self.stdout.write(self.style.ERROR("No tags created."))
 
         # --- Create Tasks ---
-        self.stdout.write(self.style.SUCCESS(f"Creating {num_tasks} tasks..."))
-        for i in range(num_tasks):
-            title = fake.sentence(nb_words=6).replace(".", "")
-            # Corrected typo 'decription' to 'description'
-            description = (
-                fake.paragraph(nb_sentences=3, variable_nb_sentences=True)
-                if random.random() > 0.3
-                else None
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Creating {num_tasks} tasks in batches of {batch_size}"
+                f" ({workers} generator process{'es' if workers > 1 else ''})..."
+            )
+        )
+        statuses = [status.value for status in TaskStatus]
+        chunks = [
+            (
+                number,
+                min(batch_size, num_tasks - start),
+                seed,
+                statuses,
+                len(users),
+                len(categories),
+                len(tags),
             )
+            for number, start in enumerate(range(0, num_tasks, batch_size))
+        ]
+        now = timezone.now()
+        started = time.monotonic()
+        created = links = 0
+
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            batches = executor.map(generate_task_rows, chunks)
+        else:
+            executor = None
+            batches = map(generate_task_rows, chunks)
+
+        try:
+            for rows in batches:
+                batch = [
+                    Task(
+                        title=title,
+                        description=description,
+                        status=status,
+                        due_date=None if due is None else now + timedelta(days=due),
+                        user=users[user_index],
+                        category=categories[category_index],
+                    )
+                    for title, description, status, due, user_index, category_index, _ in rows
+                ]
+                tag_ids = [[tags[i].pk for i in row[6]] for row in rows]
+                # One transaction per batch: tasks, through rows and counters
+                create_tasks(batch, tag_ids, batch_size=batch_size)
+
+                created += len(batch)
+                links += sum(len(ids) for ids in tag_ids)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"  {created}/{num_tasks} tasks, {links} tag links"
+                    f" ({(created + links) / max(elapsed, 1e-9):,.0f} rows/s)"
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
-            # Random status
-            status_enum_member = random.choice(list(TaskStatus))
-            status_value = status_enum_member.value
-
-            # Random due date
-            due_date = None
-            if random.random() > 0.2:  # 80% chance of having a due date
-                due_date = timezone.now() + timedelta(
-                    days=random.randint(-10, 30)
-                )  # Due in past or future
-
-            # Assign random user and category
-            user = random.choice(users)
-            category = random.choice(
-                categories
-            )  # Category is mandatory if on_delete=CASCADE
-
-            task = Task.objects.create(
-                title=title,
-                description=description,  # Corrected field name
-                status=status_value,
-                due_date=due_date,
-                user=user,
-                category=category,
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Database seeding complete! {created} tasks and {links} tag links"
+                f" in {elapsed:.1f}s ({(created + links) / max(elapsed, 1e-9):,.0f} rows/s)."
             )
+        )
 
-            # Add random tags (0 to 3 tags per task)
-            if tags:  # Only try to add tags if some were created
-                num_random_tags = random.randint(0, min(3, len(tags)))
-                selected_tags = random.sample(tags, num_random_tags)
-                # Use .set() to add multiple tags efficiently
-                # IMPORTANT: The ManyToManyField is named 'tags' now
-                task.tags.set(selected_tags)
+    @staticmethod
+    def clear_data():
+        """
+        Deletes every task, category and tag in a fixed number of queries.
+        Task has delete signals, so QuerySet.delete() would load every task
+        and adjust the counters and the summary row by row; everything they
+        maintain goes too, so the tables are emptied directly instead.
+        """
+        with transaction.atomic(), counter_signals_suspended():
+            Task.tags.through.objects.all().delete()
+            TaskDailySummary.objects.all().delete()
+            # The DELETE that QuerySet.delete() runs when it needn't
+            # collect anything: no instances, no signals
+            Task.objects.all()._raw_delete(Task.objects.db)
+            Category.objects.all().delete()
+            Tag.objects.all().delete()
 
-        self.stdout.write(self.style.SUCCESS("Database seeding complete!"))
+    @staticmethod
+    def unique_values(generate, count, existing):
+        """
+        Draws `count` values that aren't in `existing`. Faker's word list is
+        finite, so once collisions pile up a numeric suffix is added.
+        """
+        values = []
+        attempts = 0
+        while len(values) < count:
+            value = generate()
+            attempts += 1
+            if value in existing:
+                if attempts < count * 3:
+                    continue
+                value = f"{value}{attempts}"
+                if value in existing:
+                    continue
+            existing.add(value)
+            values.append(value)
+        return values
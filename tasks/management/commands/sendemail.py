@@ -47,7 +47,14 @@ class Command(BaseCommand):
                 [recipient],
                 fail_silently=False,
             )
-            self.stdout.write(self.style.SUCCESS("Test email sent successfully!"))
+            if settings.EMAIL_BACKEND == "notifications.backends.OutboxEmailBackend":
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        "Test email queued; run drain_outbox to deliver it."
+                    )
+                )
+            else:
+                self.stdout.write(self.style.SUCCESS("Test email sent successfully!"))
             self.stdout.write(self.style.SUCCESS(f"Check the inbox for {recipient}."))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"An error occurred: {e}"))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_task_counts(apps, schema_editor):
+    Category = apps.get_model('tasks', 'Category')
+    Tag = apps.get_model('tasks', 'Tag')
+    Task = apps.get_model('tasks', 'Task')
+    TaskTags = Task.tags.through
+
+    per_category = (
+        Task.objects.filter(category_id=OuterRef('pk'))
+        .order_by().values('category_id').annotate(n=Count('id')).values('n')
+    )
+    Category.objects.update(task_count=Coalesce(Subquery(per_category), 0))
+
+    per_tag = (
+        TaskTags.objects.filter(tag_id=OuterRef('pk'))
+        .order_by().values('tag_id').annotate(n=Count('id')).values('n')
+    )
+    Tag.objects.update(task_count=Coalesce(Subquery(per_tag), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_alter_task_category_alter_task_tags_alter_task_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of tasks in this category.'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of tasks with this tag.'),
+        ),
+        migrations.RunPython(populate_task_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_category_updated_at_tag_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["due_date", "status"], name="task_due_status_idx"
+            ),
+        ),
+    ]
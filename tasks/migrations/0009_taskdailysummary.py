@@ -0,0 +1,102 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Count, DateField, When
+from django.db.models.functions import TruncDate
+
+
+def populate_summary(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskDailySummary = apps.get_model("tasks", "TaskDailySummary")
+    # Same day rule as Task.summary_key / tasks.summary.summary_day
+    day = Case(
+        When(status="done", completed_at__isnull=False, then=TruncDate("completed_at")),
+        default=TruncDate("created_at"),
+        output_field=DateField(),
+    )
+    rows = (
+        Task.objects.annotate(day=day)
+        .order_by()
+        .values("user_id", "category_id", "status", "day")
+        .annotate(total=Count("id"))
+    )
+    TaskDailySummary.objects.bulk_create(
+        [
+            TaskDailySummary(
+                user_id=row["user_id"],
+                category_id=row["category_id"],
+                status=row["status"],
+                day=row["day"],
+                count=row["total"],
+            )
+            for row in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_task_task_due_status_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskDailySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("init", "Initialized"),
+                            ("todo", "To Do"),
+                            ("in_progress", "In Progress"),
+                            ("done", "Done"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        max_length=15,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_summaries",
+                        to="tasks.category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_summaries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "category", "status", "day"),
+                        name="task_summary_key",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
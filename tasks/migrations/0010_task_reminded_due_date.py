@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_taskdailysummary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="reminded_due_date",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -3,14 +3,41 @@
 from enum import Enum
 
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count
 from django.utils import timezone
 
 
+class CategoryQuerySet(models.QuerySet):
+    def with_task_counts(self):
+        """
+        Annotates each category with its live number of tasks using a single
+        GROUP BY query. Used to reconcile the task_count counter.
+        """
+        return self.annotate(task_total=Count("tasks_in_category"))
+
+
+class TagQuerySet(models.QuerySet):
+    def with_task_counts(self):
+        """
+        Annotates each tag with its live number of tasks using a single
+        GROUP BY query. Used to reconcile the task_count counter.
+        """
+        return self.annotate(task_total=Count("tasks_with_tag"))
+
+
 # Create your models here.
 class Category(models.Model):
     name = models.CharField(max_length=100)
     hex_color = models.CharField(max_length=7, null=True, blank=True)
+    # Denormalized, kept in sync by tasks/signals.py (see reconcile_counters)
+    task_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Number of tasks in this category."
+    )
+    # Also bumped by counter updates; drives the list's ETag/Last-Modified
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CategoryQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "Categories"
@@ -19,8 +46,11 @@ class Category(models.Model):
         return self.name
 
     def total_count(self):
-        # FIX: Use the correct related_name 'tasks_in_category'
-        return self.tasks_in_category.count()
+        # Prefer the live value annotated by with_task_counts() when present,
+        # otherwise read the denormalized counter (no query needed)
+        if hasattr(self, "task_total"):
+            return self.task_total
+        return self.task_count
 
     def get_task_count_status(self):
         """
@@ -43,6 +73,14 @@ class Category(models.Model):
 
 class Tag(models.Model):
     label = models.CharField(max_length=100)
+    # Denormalized, kept in sync by tasks/signals.py (see reconcile_counters)
+    task_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Number of tasks with this tag."
+    )
+    # Also bumped by counter updates; drives the list's ETag/Last-Modified
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = TagQuerySet.as_manager()
 
     def __str__(self):
         return self.label
@@ -50,8 +88,12 @@ class Tag(models.Model):
     def total_count(self):
         """
         Returns the total number of tasks associated with this tag.
+        Uses the value annotated by with_task_counts() when it is present,
+        otherwise the denormalized counter.
         """
-        return self.tasks_with_tag.count()  # Using the related_name 'tasks_with_tag'
+        if hasattr(self, "task_total"):
+            return self.task_total
+        return self.task_count
 
     def get_task_count_status(self):
         """
@@ -96,6 +138,10 @@ class TaskStatus(Enum):
         return [(key.value, key.label) for key in cls]
 
 
+# Task columns that decide its TaskDailySummary row
+SUMMARY_FIELDS = ("user_id", "category_id", "status", "created_at", "completed_at")
+
+
 class Task(models.Model):
     title = models.CharField(max_length=500)
     description = models.TextField(null=True, blank=True)
@@ -118,6 +164,8 @@ class Task(models.Model):
     )
     due_date = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # The due_date the owner was last reminded of (notifications.reminders)
+    reminded_due_date = models.DateTimeField(null=True, blank=True, editable=False)
 
     # Use distinct related_names
     user = models.ForeignKey(
@@ -134,17 +182,139 @@ class Task(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Serves the keyset pagination of a user's task list
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="task_user_created_id_idx"
+            ),
+            # Back the TaskFilterBackend filters and the ?ordering= options.
+            # Equality filters carry the default ordering so a single status
+            # or category is both a seek and an ordered walk.
+            models.Index(
+                fields=["user", "status", "-created_at", "-id"],
+                name="task_user_status_idx",
+            ),
+            models.Index(fields=["user", "due_date"], name="task_user_due_date_idx"),
+            models.Index(fields=["user", "updated_at"], name="task_user_updated_idx"),
+            models.Index(
+                fields=["user", "completed_at"], name="task_user_completed_idx"
+            ),
+            models.Index(
+                fields=["user", "category", "-created_at", "-id"],
+                name="task_user_category_idx",
+            ),
+            # The reminder scheduler's due-window scan, across all users
+            models.Index(fields=["due_date", "status"], name="task_due_status_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_stored_values()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_stored_values()
+
+    def _remember_stored_values(self):
+        # Remember the stored category so the counter signals can tell when
+        # it changes without re-reading the row
+        self._loaded_category_id = self.__dict__.get("category_id")
+        # Likewise for the daily summary row it is counted in, unless a
+        # column was deferred (the pre_save signal then reads them)
+        values = self.__dict__
+        if all(name in values for name in SUMMARY_FIELDS):
+            self._loaded_summary_values = tuple(values[name] for name in SUMMARY_FIELDS)
+        else:
+            self.__dict__.pop("_loaded_summary_values", None)
+
+    def summary_values(self):
+        return tuple(getattr(self, name) for name in SUMMARY_FIELDS)
+
+    @staticmethod
+    def summary_key(values):
+        """
+        The (user, category, status, day) TaskDailySummary row a task with
+        these SUMMARY_FIELDS values is counted in.
+        """
+        user_id, category_id, status, created_at, completed_at = values
+        moment = completed_at if status == TaskStatus.DONE.value else None
+        return (
+            user_id,
+            category_id,
+            status,
+            timezone.localdate(moment or created_at),
+        )
+
+    def sync_completed_at(self):
+        """
+        Stamps completed_at when the task becomes done and clears it
+        otherwise. Bulk writes, which skip save(), call this directly.
+        """
         if self.status == TaskStatus.DONE.value and not self.completed_at:
             self.completed_at = timezone.now()
         elif self.status != TaskStatus.DONE.value and self.completed_at:
             self.completed_at = None
-        super().save(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        self.sync_completed_at()
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            # reminded_due_date belongs to the reminder scan, which sets it
+            # with update(); a stale instance must not write it back
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name != "reminded_due_date"
+            ]
+        # post_save runs inside this block, so the row and the category
+        # counters are committed (or rolled back) together
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     @property
     def is_completed(self):
         return self.status == TaskStatus.DONE.value
+
+
+class TaskDailySummary(models.Model):
+    """
+    Number of a user's tasks per category, status and day, kept up to date
+    by tasks/summary.py so the stats endpoint never scans Task. The day is
+    the completion day for done tasks and the creation day otherwise, in
+    TIME_ZONE.
+    """
+
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="task_summaries"
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="task_summaries"
+    )
+    status = models.CharField(max_length=15, choices=TaskStatus.choices())
+    day = models.DateField()
+    # Signed so concurrent decrements can never trip a CHECK constraint
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "category", "status", "day"],
+                name="task_summary_key",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.user_id}/{self.category_id}/{self.status}/{self.day}: {self.count}"
+        )
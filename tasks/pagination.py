@@ -0,0 +1,196 @@
+from base64 import b64decode, b64encode
+from collections import namedtuple
+from urllib import parse
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+# value/pk of the row the page starts after; reverse is set on "previous" links
+Position = namedtuple("Position", ["value", "pk", "reverse"])
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination keyed on (ordering field, id).
+
+    DRF's CursorPagination keys on the ordering field alone and uses an
+    offset to step over rows sharing a value. Here the cursor carries the id
+    of the last row as well, so each page is a single index range seek:
+
+        WHERE field <= :value AND NOT (field = :value AND id >= :id)
+        ORDER BY field DESC, id DESC LIMIT :page_size + 1
+
+    and costs the same on page 1 and page 10,000. NULL values of a nullable
+    ordering field sort last in both directions.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = "-created_at"
+    # Fields a client may order by with ?ordering=field or ?ordering=-field
+    ordering_param = "ordering"
+    ordering_fields = ()
+
+    def get_ordering(self, request, queryset, view):
+        requested = request.query_params.get(self.ordering_param)
+        if not requested:
+            return self.ordering
+        if requested.lstrip("-") not in self.ordering_fields:
+            raise ValidationError(
+                {
+                    self.ordering_param: [
+                        f"Ordering must be one of: {', '.join(self.ordering_fields)}"
+                        " (prefix with '-' for descending)."
+                    ]
+                }
+            )
+        return requested
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    def page_queryset(self, queryset, request, view=None):
+        """
+        Returns the unevaluated queryset for the requested page (or None
+        when pagination is off); evaluate it and pass the rows to
+        set_page(). Split in two so async views can fetch the rows.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        ordering = self.get_ordering(request, queryset, view)
+        self.field_name = ordering.lstrip("-")
+        self.descending = ordering.startswith("-")
+        self.field = queryset.model._meta.get_field(self.field_name)
+
+        self.cursor = self.decode_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor.reverse)
+
+        if self.cursor is not None:
+            if self.reverse:
+                queryset = queryset.filter(self._before(self.cursor))
+            else:
+                queryset = queryset.filter(self._after(self.cursor))
+        queryset = queryset.order_by(*self._order_by(self.reverse))
+
+        # One extra row tells us whether there is another page beyond this one
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    # --- Query building ---
+
+    def _order_by(self, reverse):
+        descending = self.descending != reverse
+        pk_order = "-pk" if descending else "pk"
+        if not self.field.null:
+            # Plain column ordering lets the database walk the index
+            return [f"-{self.field_name}" if descending else self.field_name, pk_order]
+        # Keep NULLs after every value in forward order (so before them in reverse)
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        expression = F(self.field_name)
+        expression = expression.desc(**nulls) if descending else expression.asc(**nulls)
+        return [expression, pk_order]
+
+    def _after(self, position):
+        """Rows strictly after `position` in forward order."""
+        field = self.field_name
+        beyond, inclusive = ("lt", "lte") if self.descending else ("gt", "gte")
+        stop = "gte" if self.descending else "lte"
+        if position.value is None:
+            # Inside the trailing block of NULLs: only the id moves on
+            return Q(**{f"{field}__isnull": True, f"pk__{beyond}": position.pk})
+        # The range condition comes first so it can bound the index scan
+        condition = Q(**{f"{field}__{inclusive}": position.value}) & ~Q(
+            **{field: position.value, f"pk__{stop}": position.pk}
+        )
+        if self.field.null:
+            condition |= Q(**{f"{field}__isnull": True})
+        return condition
+
+    def _before(self, position):
+        """Rows strictly before `position` in forward order."""
+        field = self.field_name
+        behind, inclusive = ("gt", "gte") if self.descending else ("lt", "lte")
+        stop = "lte" if self.descending else "gte"
+        if position.value is None:
+            return Q(**{f"{field}__isnull": False}) | Q(
+                **{f"{field}__isnull": True, f"pk__{behind}": position.pk}
+            )
+        return Q(**{f"{field}__{inclusive}": position.value}) & ~Q(
+            **{field: position.value, f"pk__{stop}": position.pk}
+        )
+
+    # --- Links ---
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1], reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[0], reverse=True))
+
+    def _position(self, instance, reverse):
+        return Position(getattr(instance, self.field_name), instance.pk, reverse)
+
+    def encode_cursor(self, position):
+        tokens = {"i": str(position.pk)}
+        if position.value is not None:
+            tokens["p"] = _to_string(position.value)
+        if position.reverse:
+            tokens["r"] = "1"
+        querystring = parse.urlencode(tokens)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            pk = int(tokens["i"][0])
+            value = tokens.get("p", [None])[0]
+            if value is not None:
+                value = self.field.to_python(value)
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return Position(value, pk, reverse)
+
+
+def _to_string(value):
+    # Datetimes keep their microseconds and offset so the seek is exact
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class TaskCursorPagination(KeysetCursorPagination):
+    """
+    Pages a user's tasks newest first, matching Task.Meta.ordering. Each
+    ordering field is backed by a (user, field) index on Task.
+    """
+
+    ordering = "-created_at"
+    ordering_fields = ("created_at", "due_date", "updated_at")
@@ -0,0 +1,82 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+# External-content FTS5 table over tasks_task(title, description), created
+# and kept in sync by triggers in migration 0006_task_search_index.
+FTS_TABLE = "tasks_task_fts"
+
+# bm25() column weights: a hit in the title counts more than one in the body
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def build_match_query(text):
+    """
+    Turns free text into a safe FTS5 MATCH expression. Every word must
+    match; the last one also matches as a prefix so partially typed words
+    still find results. Quoting each word keeps FTS5 operators and
+    punctuation in user input from being interpreted.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def matching_ids_subquery(text):
+    """
+    Returns a subquery of matching task ids for use in pk__in filters, or
+    None when `text` has nothing to search for. Unranked.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return None
+    return RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+
+
+def search_task_ids(text, user=None, limit=20, offset=0):
+    """
+    Returns the ids of tasks matching `text`, best match first (bm25).
+    Pass `user` to only search that user's tasks.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+
+    sql = (
+        f"SELECT t.id FROM {FTS_TABLE} JOIN tasks_task t ON t.id = {FTS_TABLE}.rowid"
+        f" WHERE {FTS_TABLE} MATCH %s"
+    )
+    params = [match]
+    if user is not None:
+        sql += " AND t.user_id = %s"
+        params.append(user.pk)
+    sql += f" ORDER BY bm25({FTS_TABLE}, %s, %s), t.id LIMIT %s OFFSET %s"
+    params += [TITLE_WEIGHT, DESCRIPTION_WEIGHT, limit, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def rebuild_index():
+    """
+    Re-populates the FTS table from tasks_task and merges the index
+    segments. Returns the number of tasks indexed.
+
+    FTS5's 'rebuild' reads the content table itself. It runs in one
+    transaction, so searches see the old index until it commits and a
+    failure leaves that index in place.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute("SELECT COUNT(*) FROM tasks_task")
+        indexed = cursor.fetchone()[0]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return indexed
@@ -2,10 +2,30 @@ from django.contrib.auth import get_user_model
 from djoser.serializers import UserCreateSerializer
 from rest_framework import serializers
 
+from DjangoY4.middleware import timed
+
+from . import bulk
+from .fieldsets import TASK_READ_FIELDS
 from .models import Category, Tag, Task, TaskStatus
 
 User = get_user_model()
 
+# Largest payload accepted by the bulk task endpoints
+BULK_MAX_ITEMS = 1000
+
+
+class TimedDataMixin:
+    """Counts building .data in the request's "serialize" Server-Timing span."""
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
 
 class CustomUserCreateSerializer(UserCreateSerializer):
     class Meta(UserCreateSerializer.Meta):
@@ -22,7 +42,7 @@ class CustomUserCreateSerializer(UserCreateSerializer):
         return user
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedDataMixin, serializers.ModelSerializer):
     """Serializer for the Category model."""
 
     # If you want to show total tasks count in Category detail, keep this:
@@ -32,6 +52,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Category
+        list_serializer_class = TimedListSerializer
         # Add 'task_count_status' to the fields list
         fields = ["id", "name", "hex_color", "total_tasks", "task_count_status"]
 
@@ -46,7 +67,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return obj.get_task_count_status()
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedDataMixin, serializers.ModelSerializer):
     """Serializer for the Tag model."""
 
     # New: Add a field for the total tasks count
@@ -56,6 +77,7 @@ class TagSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Tag
+        list_serializer_class = TimedListSerializer
         # Add 'total_tasks' and 'task_count_status' to the fields list
         fields = ["id", "label", "total_tasks", "task_count_status"]
 
@@ -74,7 +96,107 @@ class TagSerializer(serializers.ModelSerializer):
         return obj.get_task_count_status()
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    A PrimaryKeyRelatedField that, inside a TaskListSerializer, resolves ids
+    from objects the list serializer loaded in one query for the whole
+    payload instead of running a query per item.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = getattr(self.root, "preloaded", None)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            obj = preloaded[self.get_queryset().model].get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+
+class TaskListSerializer(TimedDataMixin, serializers.ListSerializer):
+    """
+    Validates a list of tasks in one pass and writes it with bulk queries.
+
+    For updates, `instance` is a {pk: Task} dict of the caller's tasks and
+    every item must carry the "id" of one of them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", BULK_MAX_ITEMS)
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preloaded = self.preload_related(data)
+        return super().to_internal_value(data)
+
+    def preload_related(self, data):
+        # Every id referenced anywhere in the payload, loaded in one query per model
+        wanted = {}
+        for field in self.child.fields.values():
+            relation = getattr(field, "child_relation", field)
+            if field.read_only or not isinstance(relation, BulkPrimaryKeyRelatedField):
+                continue
+            ids = wanted.setdefault(relation.get_queryset().model, (relation, set()))[1]
+            for item in data:
+                value = item.get(field.field_name) if isinstance(item, dict) else None
+                for pk in value if isinstance(value, list) else [value]:
+                    try:
+                        ids.add(int(pk))
+                    except (TypeError, ValueError):
+                        pass
+        return {
+            model: relation.get_queryset().in_bulk(ids)
+            for model, (relation, ids) in wanted.items()
+        }
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+        pk = data.get("id") if isinstance(data, dict) else None
+        valid_pk = isinstance(pk, int) and not isinstance(pk, bool)
+        task = self.instance.get(pk) if valid_pk else None
+        if task is None:
+            raise serializers.ValidationError({"id": ["Unknown task id."]})
+        self.child.instance = task
+        validated = super().run_child_validation(data)
+        validated["id"] = pk
+        return validated
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            ids = [item["id"] for item in attrs]
+            if len(ids) != len(set(ids)):
+                raise serializers.ValidationError("Each task id may appear only once.")
+        return attrs
+
+    def create(self, validated_data):
+        tasks, tag_ids = [], []
+        for attrs in validated_data:
+            tags = attrs.pop("tags", ())
+            tasks.append(Task(**attrs))
+            tag_ids.append([tag.pk for tag in tags])
+        return bulk.create_tasks(tasks, tag_ids)
+
+    def update(self, instance, validated_data):
+        tasks, fields, tag_ids = [], set(), {}
+        for attrs in validated_data:
+            task = instance[attrs.pop("id")]
+            if "tags" in attrs:
+                tag_ids[task.pk] = [tag.pk for tag in attrs.pop("tags")]
+            for name, value in attrs.items():
+                setattr(task, name, value)
+                fields.add(name)
+            tasks.append(task)
+        return bulk.update_tasks(tasks, fields, tag_ids)
+
+
+class TaskSerializer(TimedDataMixin, serializers.ModelSerializer):
     """
     Serializer for the Task model.
     Handles nested representation for reads and PKs for writes of related objects.
@@ -89,7 +211,7 @@ class TaskSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     # For writing (POST/PUT/PATCH requests): allow client to send just the category ID
     # 'source=' points to the actual model field
-    category_id = serializers.PrimaryKeyRelatedField(
+    category_id = BulkPrimaryKeyRelatedField(
         queryset=Category.objects.all(), source="category", write_only=True
     )
 
@@ -97,7 +219,7 @@ class TaskSerializer(serializers.ModelSerializer):
     # This will now include 'task_count_status' from the TagSerializer
     tags = TagSerializer(many=True, read_only=True)
     # For writing (POST/PUT/PATCH requests): allow client to send a list of tag IDs
-    tag_ids = serializers.PrimaryKeyRelatedField(
+    tag_ids = BulkPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all(),
         source="tags",
@@ -110,6 +232,8 @@ class TaskSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
+        # Handles many=True writes for the bulk endpoints
+        list_serializer_class = TaskListSerializer
         fields = [
             "id",
             "title",
@@ -136,6 +260,22 @@ class TaskSerializer(serializers.ModelSerializer):
             "is_completed",
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ?fields=/?expand= (tasks/fieldsets.py): drop the other read fields
+        # and render unexpanded relations as ids
+        fieldset = self.context.get("fieldset")
+        if fieldset is None:
+            return
+        for name in set(TASK_READ_FIELDS) - set(fieldset.fields):
+            self.fields.pop(name)
+        if "category" in self.fields and "category" not in fieldset.expand:
+            self.fields["category"] = serializers.PrimaryKeyRelatedField(read_only=True)
+        if "tags" in self.fields and "tags" not in fieldset.expand:
+            self.fields["tags"] = serializers.PrimaryKeyRelatedField(
+                many=True, read_only=True
+            )
+
     def get_status_label(self, obj):
         # Retrieve the label from your TaskStatus Enum
         try:
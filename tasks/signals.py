@@ -0,0 +1,149 @@
+from collections import Counter
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import CATEGORY_NAMESPACE, TAG_NAMESPACE, response_cache
+from .counters import adjust_task_counts, counter_signals_enabled
+from .models import SUMMARY_FIELDS, Category, Tag, Task
+from .summary import adjust_task_summary, summary_deltas
+
+TaskTags = Task.tags.through
+
+
+# --- Category counter ---
+
+
+@receiver(pre_save, sender=Task)
+def remember_previous_category(sender, instance, raw=False, **kwargs):
+    if (
+        raw
+        or not counter_signals_enabled()
+        # A new instance given an existing pk still updates that row
+        or (instance._state.adding and instance.pk is None)
+        or (
+            hasattr(instance, "_loaded_category_id")
+            and hasattr(instance, "_loaded_summary_values")
+        )
+    ):
+        return
+    # The instance wasn't loaded through the ORM (or a column was deferred)
+    stored = Task.objects.filter(pk=instance.pk).values_list(*SUMMARY_FIELDS).first()
+    instance._loaded_category_id = stored and stored[1]
+    instance._loaded_summary_values = stored
+
+
+@receiver(post_save, sender=Task)
+def update_category_count_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or not counter_signals_enabled():
+        return
+    previous = None if created else getattr(instance, "_loaded_category_id", None)
+    current = instance.category_id
+    if previous != current:
+        adjust_task_counts(category_deltas={previous: -1, current: 1})
+    instance._loaded_category_id = current
+
+
+# --- Daily summary (see tasks/summary.py) ---
+
+
+@receiver(post_save, sender=Task)
+def update_summary_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or not counter_signals_enabled():
+        return
+    previous = None if created else getattr(instance, "_loaded_summary_values", None)
+    current = instance.summary_values()
+    adjust_task_summary(summary_deltas([previous], [current]))
+    instance._loaded_summary_values = current
+
+
+# --- Deleting a task releases its category and every tag it had ---
+
+
+@receiver(pre_delete, sender=Task)
+def remember_tags_before_delete(sender, instance, **kwargs):
+    if not counter_signals_enabled():
+        return
+    # The through rows are removed by cascade, which sends no m2m_changed
+    instance._deleted_tag_ids = list(
+        TaskTags.objects.filter(task_id=instance.pk).values_list("tag_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Task)
+def update_counts_on_delete(sender, instance, **kwargs):
+    if not counter_signals_enabled():
+        return
+    adjust_task_counts(
+        category_deltas={instance.category_id: -1},
+        tag_deltas={tag_id: -1 for tag_id in getattr(instance, "_deleted_tag_ids", [])},
+    )
+    stored = getattr(instance, "_loaded_summary_values", None)
+    adjust_task_summary(summary_deltas([stored or instance.summary_values()], [None]))
+
+
+# --- Tag counter, for both task.tags and tag.tasks_with_tag ---
+
+
+def _existing_links(instance, reverse, pk_set):
+    """Returns the through rows that a remove/clear is about to delete."""
+    links = TaskTags.objects.all()
+    if reverse:
+        links = links.filter(tag_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(task_id__in=pk_set)
+    else:
+        links = links.filter(task_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(tag_id__in=pk_set)
+    return list(links.values_list("tag_id", flat=True))
+
+
+@receiver(m2m_changed, sender=TaskTags)
+def update_tag_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if not counter_signals_enabled():
+        return
+    # pk_set holds tag ids when changed from a Task, task ids from a Tag
+    if action == "post_add" and pk_set:
+        # Django has already dropped ids that were linked before
+        if reverse:
+            adjust_task_counts(tag_deltas={instance.pk: len(pk_set)})
+        else:
+            adjust_task_counts(tag_deltas={tag_id: 1 for tag_id in pk_set})
+    elif action in ("pre_remove", "pre_clear"):
+        # remove() doesn't filter pk_set down to existing links, so look
+        # at what is actually there before the rows go away
+        instance._removed_tag_ids = _existing_links(
+            instance, reverse, pk_set if action == "pre_remove" else None
+        )
+    elif action in ("post_remove", "post_clear"):
+        removed = instance.__dict__.pop("_removed_tag_ids", [])
+        if removed:
+            adjust_task_counts(
+                tag_deltas={tag_id: -n for tag_id, n in Counter(removed).items()}
+            )
+
+
+# --- Deleting a tag changes how its tasks serialize ---
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_tasks_of_deleted_tag(sender, instance, **kwargs):
+    # Moves updated_at so the task list ETag/Last-Modified change as well
+    Task.objects.filter(tags=instance).update(updated_at=timezone.now())
+
+
+# --- Cached category/tag responses ---
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_responses(sender, **kwargs):
+    response_cache.invalidate_after_write(CATEGORY_NAMESPACE)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_responses(sender, **kwargs):
+    response_cache.invalidate_after_write(TAG_NAMESPACE)
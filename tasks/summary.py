@@ -0,0 +1,226 @@
+"""
+The TaskDailySummary table behind GET /api/tasks/stats/.
+
+Every task is counted in exactly one (user, category, status, day) row
+(see Task.summary_key). The Task signals and the bulk writers in
+tasks/bulk.py move those counts as tasks change. rebuild_task_summary
+recomputes them from Task.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DateField, F, Sum, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .filters import CLOSED_STATUSES
+from .models import Task, TaskDailySummary, TaskStatus
+
+
+def _add(key, delta):
+    user_id, category_id, status, day = key
+    rows = TaskDailySummary.objects.filter(
+        user_id=user_id, category_id=category_id, status=status, day=day
+    )
+    if rows.update(count=F("count") + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            TaskDailySummary.objects.create(
+                user_id=user_id,
+                category_id=category_id,
+                status=status,
+                day=day,
+                count=delta,
+            )
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(count=F("count") + delta)
+
+
+def adjust_task_summary(deltas):
+    """
+    Applies {summary key: delta} changes in a fixed number of queries: one
+    SELECT for the existing rows, one F() UPDATE per distinct delta (so
+    concurrent writers don't lose changes) and one INSERT for new rows.
+    Rows that reach zero are removed.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if key and delta}
+    if not deltas:
+        return
+    # Callers already run in a transaction; no savepoint needed
+    with transaction.atomic(savepoint=False):
+        # A superset of the rows, matched up below; bounded parameters
+        # however many keys there are
+        fields = list(zip(*deltas))
+        existing = {
+            (row["user_id"], row["category_id"], row["status"], row["day"]): row["pk"]
+            for row in TaskDailySummary.objects.filter(
+                user_id__in=set(fields[0]),
+                category_id__in=set(fields[1]),
+                status__in=set(fields[2]),
+                day__in=set(fields[3]),
+            ).values("pk", "user_id", "category_id", "status", "day")
+        }
+        ids_by_delta = defaultdict(list)
+        missing = []
+        for key, delta in deltas.items():
+            if key in existing:
+                ids_by_delta[delta].append(existing[key])
+            elif delta > 0:
+                missing.append(key)
+
+        for delta, ids in ids_by_delta.items():
+            TaskDailySummary.objects.filter(pk__in=ids).update(count=F("count") + delta)
+        if missing:
+            try:
+                with transaction.atomic():
+                    TaskDailySummary.objects.bulk_create(
+                        [
+                            TaskDailySummary(
+                                user_id=user_id,
+                                category_id=category_id,
+                                status=status,
+                                day=day,
+                                count=deltas[key],
+                            )
+                            for key in missing
+                            for user_id, category_id, status, day in [key]
+                        ]
+                    )
+            except IntegrityError:
+                # Some were created concurrently; take them one at a time
+                for key in missing:
+                    _add(key, deltas[key])
+
+        decremented = [
+            pk for delta, ids in ids_by_delta.items() if delta < 0 for pk in ids
+        ]
+        if decremented:
+            TaskDailySummary.objects.filter(pk__in=decremented, count__lte=0).delete()
+
+
+def summary_deltas(before, after):
+    """
+    Counter of key changes for tasks moving from the `before` to the
+    `after` summary values (None for a task that didn't/doesn't exist).
+    """
+    deltas = Counter()
+    for old, new in zip(before, after):
+        old_key = old and Task.summary_key(old)
+        new_key = new and Task.summary_key(new)
+        if old_key != new_key:
+            deltas[old_key] -= 1
+            deltas[new_key] += 1
+    return deltas
+
+
+def summary_day():
+    """The SQL counterpart of the day in Task.summary_key."""
+    return Case(
+        When(
+            status=TaskStatus.DONE.value,
+            completed_at__isnull=False,
+            then=TruncDate("completed_at"),
+        ),
+        default=TruncDate("created_at"),
+        output_field=DateField(),
+    )
+
+
+def rebuild_summary(user_ids):
+    """
+    Recomputes the summary rows of the given users from Task with one
+    GROUP BY. Returns the number of rows written.
+    """
+    with transaction.atomic():
+        TaskDailySummary.objects.filter(user_id__in=user_ids).delete()
+        rows = (
+            Task.objects.filter(user_id__in=user_ids)
+            .annotate(day=summary_day())
+            .order_by()
+            .values("user_id", "category_id", "status", "day")
+            .annotate(total=Count("id"))
+        )
+        created = TaskDailySummary.objects.bulk_create(
+            [
+                TaskDailySummary(
+                    user_id=row["user_id"],
+                    category_id=row["category_id"],
+                    status=row["status"],
+                    day=row["day"],
+                    count=row["total"],
+                )
+                for row in rows
+            ],
+            batch_size=500,
+        )
+    return len(created)
+
+
+def task_stats(user, days=30):
+    """
+    The dashboard numbers for `user`: counts by status, completion rate
+    per category and tasks completed on each of the last `days` days from
+    the summary table, plus the live overdue count (it changes with the
+    clock, not with writes), read through the (user, due_date) index.
+    """
+    by_status = {status.value: 0 for status in TaskStatus}
+    categories = {}
+    rows = (
+        TaskDailySummary.objects.filter(user=user)
+        .values("category_id", "category__name", "status")
+        .annotate(total=Sum("count"))
+        .order_by()
+    )
+    for row in rows:
+        by_status[row["status"]] = by_status.get(row["status"], 0) + row["total"]
+        category = categories.setdefault(
+            row["category_id"],
+            {
+                "id": row["category_id"],
+                "name": row["category__name"],
+                "total": 0,
+                "done": 0,
+            },
+        )
+        category["total"] += row["total"]
+        if row["status"] == TaskStatus.DONE.value:
+            category["done"] += row["total"]
+    for category in categories.values():
+        total = category["total"]
+        category["completion_rate"] = (
+            round(category["done"] / total, 4) if total else 0.0
+        )
+
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+    completed = dict(
+        TaskDailySummary.objects.filter(
+            user=user, status=TaskStatus.DONE.value, day__gte=since, day__lte=today
+        )
+        .values("day")
+        .annotate(total=Sum("count"))
+        .order_by()
+        .values_list("day", "total")
+    )
+
+    overdue = (
+        Task.objects.filter(user=user, due_date__lt=timezone.now())
+        .exclude(status__in=CLOSED_STATUSES)
+        .count()
+    )
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "overdue": overdue,
+        "categories": sorted(
+            categories.values(), key=lambda category: (category["name"], category["id"])
+        ),
+        "completed_per_day": [
+            {"day": day.isoformat(), "count": completed.get(day, 0)}
+            for day in (since + timedelta(days=n) for n in range(days))
+        ],
+    }
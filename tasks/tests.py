@@ -1,3 +1,1547 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from DjangoY4.routers import ReadReplicaRouter
+
+from .benchmarking import compare_to_baseline
+from .cache import CATEGORY_NAMESPACE, TAG_NAMESPACE, response_cache
+from .fast_serializers import serialize_task_values, serialize_tasks
+from .export import export_lines, export_queryset
+from .filters import TaskFilterBackend
+from .importer import TaskImporter
+from .models import Category, Tag, Task, TaskDailySummary, TaskStatus
+from .pagination import TaskCursorPagination
+from .search import rebuild_index
+from .serializers import TaskSerializer
+from .summary import rebuild_summary
+
+User = get_user_model()
+
+
+def explain(queryset):
+    """Returns SQLite's EXPLAIN QUERY PLAN output for a queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return "\n".join(row[-1] for row in cursor.fetchall())
+
+
+class TaskApiTestCase(TestCase):
+    """Shared fixtures for the API tests below."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="owner@example.com", password="pw")
+        cls.other_user = User.objects.create_user(
+            email="other@example.com", password="pw"
+        )
+
+    def setUp(self):
+        # Cached category/tag responses must not leak between tests
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def make_tasks(self, count, user=None, category=None, tags=()):
+        category = category or Category.objects.create(name="Work")
+        tasks = []
+        for i in range(count):
+            task = Task.objects.create(
+                title=f"Task {i}", user=user or self.user, category=category
+            )
+            task.tags.set(tags)
+            tasks.append(task)
+        return tasks
+
+
+class CategoryTagCountTests(TaskApiTestCase):
+    def test_category_list_counts_without_per_row_queries(self):
+        work = Category.objects.create(name="Work")
+        home = Category.objects.create(name="Home")
+        self.make_tasks(4, category=work)
+        self.make_tasks(1, category=home)
+        Category.objects.create(name="Empty")
+
+        # ETag validator + list
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/categories/")
+
+        by_name = {row["name"]: row for row in response.json()}
+        self.assertEqual(by_name["Work"]["total_tasks"], 4)
+        self.assertEqual(by_name["Work"]["task_count_status"], "too many")
+        self.assertEqual(by_name["Home"]["task_count_status"], "few")
+        self.assertEqual(by_name["Empty"]["total_tasks"], 0)
+        self.assertEqual(by_name["Empty"]["task_count_status"], "none")
+
+    def test_tag_list_counts_without_per_row_queries(self):
+        urgent = Tag.objects.create(label="urgent")
+        Tag.objects.create(label="unused")
+        self.make_tasks(2, tags=[urgent])
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/tags/")
+
+        by_label = {row["label"]: row for row in response.json()}
+        self.assertEqual(by_label["urgent"]["total_tasks"], 2)
+        self.assertEqual(by_label["urgent"]["task_count_status"], "few")
+        self.assertEqual(by_label["unused"]["total_tasks"], 0)
+
+    def test_total_count_prefers_annotation(self):
+        category = Category.objects.create(name="Work")
+        self.make_tasks(2, category=category)
+        Category.objects.filter(pk=category.pk).update(task_count=7)
+        self.assertEqual(Category.objects.get(pk=category.pk).total_count(), 7)
+        self.assertEqual(
+            Category.objects.with_task_counts().get(pk=category.pk).total_count(), 2
+        )
+
+
+class TaskQueryBudgetTests(TaskApiTestCase):
+    """
+    Listing or retrieving tasks must cost the same number of queries no
+    matter how many tasks, categories and tags are involved.
+    """
+
+    # ETag validator + tasks (joined with user and category) + tags
+    LIST_QUERY_BUDGET = 3
+    RETRIEVE_QUERY_BUDGET = 2
+
+    def make_varied_tasks(self, count):
+        categories = [Category.objects.create(name=f"Cat {i}") for i in range(3)]
+        tags = [Tag.objects.create(label=f"tag{i}") for i in range(4)]
+        for i in range(count):
+            self.make_tasks(1, category=categories[i % 3], tags=tags[: i % 4 + 1])
+        return categories, tags
+
+    def test_list_query_budget_is_independent_of_page_size(self):
+        self.make_varied_tasks(5)
+        with self.assertNumQueries(self.LIST_QUERY_BUDGET):
+            small = self.client.get("/api/tasks/")
+
+        self.make_varied_tasks(40)
+        with self.assertNumQueries(self.LIST_QUERY_BUDGET):
+            large = self.client.get("/api/tasks/")
+
+        self.assertEqual(small.status_code, 200)
+        self.assertEqual(large.status_code, 200)
+
+    def test_retrieve_query_budget(self):
+        self.make_varied_tasks(3)
+        task = Task.objects.filter(user=self.user).first()
+        with self.assertNumQueries(self.RETRIEVE_QUERY_BUDGET):
+            response = self.client.get(f"/api/tasks/{task.pk}/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_prefetched_counts_match_totals(self):
+        categories, tags = self.make_varied_tasks(8)
+        # Another user's tasks still count towards shared categories and tags
+        self.make_tasks(2, user=self.other_user, category=categories[0], tags=tags)
+
+        data = self.client.get("/api/tasks/").json()["results"]
+        for row in data:
+            category = Category.objects.get(pk=row["category"]["id"])
+            self.assertEqual(row["category"]["total_tasks"], category.total_count())
+            for tag_row in row["tags"]:
+                tag = Tag.objects.get(pk=tag_row["id"])
+                self.assertEqual(tag_row["total_tasks"], tag.total_count())
+            self.assertEqual(row["user"], self.user.email)
+
+
+class TaskCounterTests(TaskApiTestCase):
+    def assertCounts(self, obj, expected):
+        obj.refresh_from_db()
+        self.assertEqual(obj.task_count, expected)
+        self.assertEqual(
+            type(obj).objects.with_task_counts().get(pk=obj.pk).task_total, expected
+        )
+
+    def test_category_counter_follows_create_move_and_delete(self):
+        work = Category.objects.create(name="Work")
+        home = Category.objects.create(name="Home")
+        task, other = self.make_tasks(2, category=work)
+        self.assertCounts(work, 2)
+
+        task.category = home
+        task.save()
+        self.assertCounts(work, 1)
+        self.assertCounts(home, 1)
+
+        # Saving without a change must not double count
+        task.title = "Renamed"
+        task.save()
+        Task.objects.get(pk=task.pk).save()
+        self.assertCounts(home, 1)
+
+        other.delete()
+        self.assertCounts(work, 0)
+
+    def test_tag_counter_follows_m2m_changes(self):
+        red = Tag.objects.create(label="red")
+        blue = Tag.objects.create(label="blue")
+        (task,) = self.make_tasks(1, tags=[red])
+        self.assertCounts(red, 1)
+
+        task.tags.add(red, blue)  # red is already linked
+        self.assertCounts(red, 1)
+        self.assertCounts(blue, 1)
+
+        task.tags.remove(red)
+        task.tags.remove(red)  # removing twice must not go negative
+        self.assertCounts(red, 0)
+
+        task.tags.set([red])
+        self.assertCounts(red, 1)
+        self.assertCounts(blue, 0)
+
+        (second,) = self.make_tasks(1)
+        red.tasks_with_tag.add(second)
+        self.assertCounts(red, 2)
+        red.tasks_with_tag.clear()
+        self.assertCounts(red, 0)
+
+    def test_deleting_a_task_releases_its_tags(self):
+        red = Tag.objects.create(label="red")
+        self.make_tasks(3, tags=[red])
+        Task.objects.filter(user=self.user).first().delete()
+        self.assertCounts(red, 2)
+        Task.objects.all().delete()
+        self.assertCounts(red, 0)
+
+    def test_reconcile_counters_repairs_drift(self):
+        work = Category.objects.create(name="Work")
+        red = Tag.objects.create(label="red")
+        self.make_tasks(3, category=work, tags=[red])
+        Category.objects.update(task_count=0)
+        Tag.objects.update(task_count=42)
+        before = Category.objects.get(pk=work.pk).updated_at
+        cached = self.client.get(f"/api/categories/{work.pk}/").json()
+
+        call_command("reconcile_counters", batch_size=1, stdout=StringIO())
+
+        self.assertCounts(work, 3)
+        self.assertCounts(red, 3)
+        self.assertGreater(work.updated_at, before)
+        # The cached response with the drifted count was invalidated
+        response = self.client.get(f"/api/categories/{work.pk}/").json()
+        self.assertNotEqual(response, cached)
+        self.assertEqual(response["total_tasks"], 3)
+
+
+class TaskPaginationTests(TaskApiTestCase):
+    def collect_pages(self, url):
+        seen, pages = [], 0
+        while url:
+            body = self.client.get(url).json()
+            seen.extend(row["id"] for row in body["results"])
+            url = body["next"]
+            pages += 1
+        return seen, pages
+
+    def test_walks_every_task_once_in_order(self):
+        tasks = self.make_tasks(7)
+        # Identical timestamps force the id tie-breaker to do the work
+        Task.objects.filter(pk__in=[t.pk for t in tasks[2:6]]).update(
+            created_at=tasks[2].created_at
+        )
+        expected = list(
+            Task.objects.filter(user=self.user)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+
+        seen, pages = self.collect_pages("/api/tasks/?page_size=2")
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 4)
+
+    def test_previous_link_returns_the_prior_page(self):
+        self.make_tasks(5)
+        first = self.client.get("/api/tasks/?page_size=2").json()
+        self.assertIsNone(first["previous"])
+        second = self.client.get(first["next"]).json()
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual(back["results"], first["results"])
+        self.assertIsNone(back["previous"])
+
+    def test_deep_pages_cost_the_same_queries(self):
+        self.make_tasks(6)
+        first = self.client.get("/api/tasks/?page_size=2").json()
+        second = self.client.get(first["next"]).json()
+        with self.assertNumQueries(TaskQueryBudgetTests.LIST_QUERY_BUDGET):
+            self.client.get(second["next"])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get("/api/tasks/?cursor=bm9wZQ==")
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_query_seeks_the_composite_index(self):
+        (task,) = self.make_tasks(1)
+        paginator = TaskCursorPagination()
+        paginator.field_name, paginator.descending = "created_at", True
+        paginator.field = Task._meta.get_field("created_at")
+        queryset = (
+            Task.objects.filter(user=self.user)
+            .filter(paginator._after(paginator._position(task, reverse=False)))
+            .order_by(*paginator._order_by(reverse=False))[:51]
+        )
+        plan = explain(queryset)
+        self.assertIn("task_user_created_id_idx (user_id=? AND created_at<?)", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class TaskFilterTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.work = Category.objects.create(name="Work")
+        self.home = Category.objects.create(name="Home")
+        self.late = Task.objects.create(
+            title="late",
+            user=self.user,
+            category=self.work,
+            status=TaskStatus.TODO.value,
+            due_date=now - timedelta(days=2),
+        )
+        self.done = Task.objects.create(
+            title="done",
+            user=self.user,
+            category=self.home,
+            status=TaskStatus.DONE.value,
+            due_date=now - timedelta(days=1),
+        )
+        self.soon = Task.objects.create(
+            title="soon",
+            user=self.user,
+            category=self.work,
+            status=TaskStatus.IN_PROGRESS.value,
+            due_date=now + timedelta(days=3),
+        )
+        self.undated = Task.objects.create(
+            title="undated", user=self.user, category=self.home
+        )
+        Task.objects.create(
+            title="someone else's",
+            user=self.other_user,
+            category=self.work,
+            status=TaskStatus.TODO.value,
+            due_date=now - timedelta(days=5),
+        )
+
+    def titles(self, query):
+        response = self.client.get(f"/api/tasks/?{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["title"] for row in response.json()["results"]]
+
+    def test_status_accepts_multiple_values(self):
+        self.assertCountEqual(self.titles("status=todo&status=done"), ["late", "done"])
+        self.assertCountEqual(self.titles("status=todo,in_progress"), ["late", "soon"])
+
+    def test_due_range_overdue_and_category(self):
+        cutoff = timezone.now().isoformat().replace("+00:00", "Z")
+        self.assertCountEqual(self.titles(f"due_before={cutoff}"), ["late", "done"])
+        self.assertEqual(self.titles(f"due_after={cutoff}"), ["soon"])
+        self.assertEqual(self.titles("overdue=true"), ["late"])
+        self.assertCountEqual(
+            self.titles(f"category={self.home.pk}"), ["done", "undated"]
+        )
+        self.assertEqual(self.titles("completed_after=2000-01-01T00:00:00Z"), ["done"])
+
+    def test_ordering_by_due_date_keeps_undated_tasks_last(self):
+        self.assertEqual(
+            self.titles("ordering=due_date"), ["late", "done", "soon", "undated"]
+        )
+        self.assertEqual(
+            self.titles("ordering=-due_date"), ["soon", "done", "late", "undated"]
+        )
+        # Page through one task at a time in both directions
+        url, seen = "/api/tasks/?ordering=due_date&page_size=1", []
+        while url:
+            body = self.client.get(url).json()
+            seen.extend(row["title"] for row in body["results"])
+            last, url = body, body["next"]
+        self.assertEqual(seen, ["late", "done", "soon", "undated"])
+        back = self.client.get(last["previous"]).json()
+        self.assertEqual([row["title"] for row in back["results"]], ["soon"])
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in ("status=nope", "due_before=soon", "category=x", "ordering=title"):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    self.client.get(f"/api/tasks/?{query}").status_code, 400
+                )
+
+
+class TaskFilterIndexTests(TaskApiTestCase):
+    """The filters must be answered from the (user, ...) composite indexes."""
+
+    def filtered(self, query):
+        request = Request(APIRequestFactory().get(f"/api/tasks/?{query}"))
+        queryset = Task.objects.filter(user=self.user)
+        return TaskFilterBackend().filter_queryset(request, queryset, view=None)
+
+    def plan(self, query):
+        # Ordered the way TaskCursorPagination orders the first page
+        return explain(self.filtered(query).order_by("-created_at", "-id"))
+
+    def assertUsesIndex(self, query, index, constraint):
+        self.assertIn(f"USING INDEX {index} ({constraint})", self.plan(query))
+
+    def test_status_uses_user_status_index(self):
+        self.assertUsesIndex(
+            "status=todo", "task_user_status_idx", "user_id=? AND status=?"
+        )
+        self.assertNotIn("TEMP B-TREE", self.plan("status=todo"))
+
+    def test_multiple_values_still_seek_on_user(self):
+        # With several values SQLite may prefer walking the ordered
+        # (user, -created_at) index for a LIMITed page; either way it's a seek
+        for query in ("status=todo,done", "category=1,2"):
+            with self.subTest(query=query):
+                self.assertRegex(
+                    self.plan(query),
+                    r"SEARCH tasks_task USING INDEX task_user_\w+ \(user_id=\?",
+                )
+
+    def test_due_range_uses_user_due_date_index(self):
+        self.assertUsesIndex(
+            "due_after=2025-01-01T00:00:00Z&due_before=2025-02-01T00:00:00Z",
+            "task_user_due_date_idx",
+            "user_id=? AND due_date>? AND due_date<?",
+        )
+
+    def test_overdue_uses_user_due_date_index(self):
+        self.assertUsesIndex(
+            "overdue=1", "task_user_due_date_idx", "user_id=? AND due_date<?"
+        )
+
+    def test_completed_range_uses_user_completed_index(self):
+        self.assertUsesIndex(
+            "completed_after=2025-01-01T00:00:00Z",
+            "task_user_completed_idx",
+            "user_id=? AND completed_at>?",
+        )
+
+    def test_category_uses_user_category_index(self):
+        self.assertUsesIndex(
+            "category=1", "task_user_category_idx", "user_id=? AND category_id=?"
+        )
+
+    def test_updated_ordering_walks_user_updated_index(self):
+        queryset = Task.objects.filter(user=self.user).order_by("-updated_at", "-id")
+        plan = explain(queryset)
+        self.assertIn("USING INDEX task_user_updated_idx (user_id=?)", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class TaskSearchTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name="Work")
+        self.report = Task.objects.create(
+            title="Quarterly report",
+            description="Collect numbers from finance",
+            user=self.user,
+            category=category,
+        )
+        self.mention = Task.objects.create(
+            title="Email finance",
+            description="Ask about the quarterly report deadline",
+            user=self.user,
+            category=category,
+        )
+        Task.objects.create(
+            title="Quarterly report for someone else",
+            user=self.other_user,
+            category=category,
+        )
+
+    def search(self, query):
+        response = self.client.get("/api/tasks/search/", {"q": query})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_ranks_title_matches_first_and_only_searches_own_tasks(self):
+        self.assertEqual(
+            self.search("quarterly report"), [self.report.pk, self.mention.pk]
+        )
+
+    def test_prefix_match_and_operator_characters_are_safe(self):
+        self.assertEqual(self.search("quart"), [self.report.pk, self.mention.pk])
+        self.assertEqual(self.search('finance" -(*'), [self.mention.pk, self.report.pk])
+        self.assertEqual(self.search("???"), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.report.title = "Annual summary"
+        self.report.description = None
+        self.report.save()
+        self.assertEqual(self.search("annual"), [self.report.pk])
+        self.assertEqual(self.search("quarterly"), [self.mention.pk])
+
+        self.mention.delete()
+        self.assertEqual(self.search("quarterly"), [])
+
+    def test_paginates_with_offset(self):
+        first = self.client.get(
+            "/api/tasks/search/", {"q": "finance", "limit": 1}
+        ).json()
+        self.assertEqual(len(first["results"]), 1)
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(len(second["results"]), 1)
+        self.assertIsNone(second["next"])
+
+    def test_requires_a_query(self):
+        self.assertEqual(self.client.get("/api/tasks/search/").status_code, 400)
+
+    def test_rebuild_command_restores_the_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('delete-all')"
+            )
+        self.assertEqual(self.search("quarterly"), [])
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(self.search("quarterly"), [self.report.pk, self.mention.pk])
+
+    def test_failed_rebuild_keeps_the_index(self):
+        # An index that a rebuild would change: drop one task's entry
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description)"
+                " SELECT 'delete', id, title, description FROM tasks_task"
+                " WHERE id = %s",
+                [self.mention.pk],
+            )
+        self.assertEqual(self.search("quarterly"), [self.report.pk])
+
+        def fail_after_rebuild(execute, sql, params, many, context):
+            # The count runs after the rebuild, inside its transaction
+            if sql.startswith("SELECT COUNT(*) FROM tasks_task"):
+                raise DatabaseError("boom")
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(fail_after_rebuild):
+            with self.assertRaises(DatabaseError):
+                rebuild_index()
+        self.assertEqual(self.search("quarterly"), [self.report.pk])
+
+
+class TaskBulkTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.work = Category.objects.create(name="Work")
+        self.home = Category.objects.create(name="Home")
+        self.red = Tag.objects.create(label="red")
+        self.blue = Tag.objects.create(label="blue")
+
+    def assertCountersMatch(self):
+        for model in (Category, Tag):
+            for obj in model.objects.with_task_counts():
+                self.assertEqual(obj.task_count, obj.task_total, obj)
+
+    def test_bulk_create_validates_and_writes_in_fixed_queries(self):
+        payload = [
+            {
+                "title": f"Task {i}",
+                "category_id": self.work.pk if i % 2 else self.home.pk,
+                "tag_ids": [self.red.pk, self.blue.pk][: i % 3],
+                "status": "done" if i == 0 else "todo",
+            }
+            for i in range(30)
+        ]
+        # 2 lookups, 2 inserts, 3 counter updates, 2 reads, the daily
+        # summary (1 read, 1 insert) + savepoints
+        with self.assertNumQueries(17):
+            response = self.client.post("/api/tasks/bulk/", payload, format="json")
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(len(response.json()), 30)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 30)
+        done = Task.objects.get(title="Task 0")
+        self.assertIsNotNone(done.completed_at)
+        self.assertEqual(response.json()[1]["tags"][0]["label"], "red")
+        self.assertCountersMatch()
+
+    def test_bulk_create_reports_errors_per_item_and_writes_nothing(self):
+        payload = [
+            {"title": "ok", "category_id": self.work.pk},
+            {"title": "bad category", "category_id": 999},
+            {"title": "bad tag", "category_id": self.work.pk, "tag_ids": [998]},
+        ]
+        response = self.client.post("/api/tasks/bulk/", payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn("category_id", errors[1])
+        self.assertIn("tag_ids", errors[2])
+        self.assertFalse(Task.objects.exists())
+
+    def test_bulk_update_applies_completed_at_and_counter_changes(self):
+        first, second = self.make_tasks(2, category=self.work, tags=[self.red])
+        other_users_task = self.make_tasks(1, user=self.other_user)[0]
+
+        payload = [
+            {"id": first.pk, "status": "done", "category_id": self.home.pk},
+            {"id": second.pk, "title": "Renamed", "tag_ids": [self.blue.pk]},
+        ]
+        response = self.client.patch("/api/tasks/bulk/", payload, format="json")
+
+        self.assertEqual(response.status_code, 200, response.content)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertIsNotNone(first.completed_at)
+        self.assertEqual(first.category, self.home)
+        self.assertEqual(second.title, "Renamed")
+        self.assertEqual(list(second.tags.all()), [self.blue])
+        self.assertGreater(second.updated_at, second.created_at)
+        self.assertCountersMatch()
+
+        # Other users' tasks are unknown ids
+        response = self.client.patch(
+            "/api/tasks/bulk/",
+            [{"id": other_users_task.pk, "title": "x"}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        # Reopening clears completed_at again
+        self.client.patch(
+            "/api/tasks/bulk/", [{"id": first.pk, "status": "todo"}], format="json"
+        )
+        first.refresh_from_db()
+        self.assertIsNone(first.completed_at)
+
+    def test_bulk_delete_only_touches_own_tasks(self):
+        mine = self.make_tasks(3, category=self.work, tags=[self.red])
+        theirs = self.make_tasks(1, user=self.other_user, category=self.work)
+
+        response = self.client.delete(
+            "/api/tasks/bulk/",
+            {"ids": [mine[0].pk, mine[1].pk, theirs[0].pk]},
+            format="json",
+        )
+
+        self.assertEqual(response.json(), {"deleted": 2})
+        self.assertEqual(
+            list(Task.objects.order_by("pk").values_list("pk", flat=True)),
+            [mine[2].pk, theirs[0].pk],
+        )
+        self.assertCountersMatch()
+
+
+class SeedDataTests(TestCase):
+    def seed(self, **options):
+        options = {
+            "num_users": 2,
+            "num_categories": 3,
+            "num_tags": 4,
+            "num_tasks": 25,
+            "batch_size": 10,
+            "seed": 42,
+            "clear": True,
+            **options,
+        }
+        call_command("seed_data", stdout=StringIO(), **options)
+        return list(Task.objects.order_by("pk").values_list("title", "status"))
+
+    def test_seeded_data_is_reproducible_and_counted(self):
+        first = self.seed()
+        self.assertEqual(len(first), 25)
+        self.assertEqual(self.seed(), first)
+        for model in (Category, Tag):
+            for obj in model.objects.with_task_counts():
+                self.assertEqual(obj.task_count, obj.task_total)
+
+    def test_clear_runs_the_same_queries_for_any_number_of_tasks(self):
+        counts = []
+        for num_tasks in (5, 40):
+            self.seed(num_tasks=num_tasks)
+            with CaptureQueriesContext(connection) as queries:
+                self.seed(num_tasks=0)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(TaskDailySummary.objects.exists())
+
+
+class ConditionalGetTests(TaskApiTestCase):
+    def test_task_list_answers_304_until_something_changes(self):
+        (task,) = self.make_tasks(1)
+        first = self.client.get("/api/tasks/")
+        etag = first["ETag"]
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        # Only the validator query runs; nothing is serialized
+        with self.assertNumQueries(1):
+            cached = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+
+        task.title = "Changed"
+        task.save()
+        changed = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_etag_depends_on_query_user_and_deletions(self):
+        self.make_tasks(2)
+        etag = self.client.get("/api/tasks/")["ETag"]
+        self.assertNotEqual(self.client.get("/api/tasks/?status=done")["ETag"], etag)
+
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(
+            self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+        self.client.force_authenticate(user=self.user)
+        Task.objects.filter(user=self.user).first().delete()
+        self.assertEqual(
+            self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    def test_counter_changes_from_other_users_invalidate(self):
+        category = Category.objects.create(name="Shared")
+        self.make_tasks(1, category=category)
+        tag_etag = self.client.get("/api/tags/")["ETag"]
+        category_etag = self.client.get("/api/categories/")["ETag"]
+        task_etag = self.client.get("/api/tasks/")["ETag"]
+
+        # Another user's task changes the shared category's count
+        self.make_tasks(1, user=self.other_user, category=category)
+
+        for url, etag in (
+            ("/api/categories/", category_etag),
+            ("/api/tasks/", task_etag),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.get("/api/tags/", HTTP_IF_NONE_MATCH=tag_etag).status_code, 304
+        )
+
+    def test_time_relative_lists_are_not_validated(self):
+        (task,) = self.make_tasks(1)
+        task.due_date = timezone.now() + timedelta(seconds=1)
+        task.save()
+        etag = self.client.get("/api/tasks/")["ETag"]
+        first = self.client.get("/api/tasks/?overdue=true")
+        self.assertFalse(first.has_header("ETag"))
+        self.assertFalse(first.has_header("Last-Modified"))
+        self.assertEqual(first.json()["results"], [])
+
+        # The task becomes overdue without any row changing
+        Task.objects.filter(pk=task.pk).update(
+            due_date=timezone.now() - timedelta(seconds=1),
+            updated_at=task.updated_at,
+        )
+        response = self.client.get("/api/tasks/?overdue=true", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_if_modified_since(self):
+        self.make_tasks(1)
+        last_modified = self.client.get("/api/categories/")["Last-Modified"]
+        response = self.client.get(
+            "/api/categories/", HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+class ResponseCacheTests(TaskApiTestCase):
+    def test_list_and_detail_are_served_from_cache(self):
+        category = Category.objects.create(name="Work")
+        first = self.client.get("/api/categories/")
+        self.assertEqual(first["X-Cache"], "MISS")
+
+        # Only the ETag validator query runs
+        with self.assertNumQueries(1):
+            second = self.client.get("/api/categories/")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.json(), first.json())
+
+        url = f"/api/categories/{category.pk}/"
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+    def test_task_writes_invalidate_counts(self):
+        category = Category.objects.create(name="Work")
+        tag = Tag.objects.create(label="urgent")
+        self.client.get("/api/categories/")
+        self.client.get("/api/tags/")
+
+        task = self.make_tasks(1, category=category, tags=[tag])[0]
+        categories = self.client.get("/api/categories/")
+        tags = self.client.get("/api/tags/")
+        self.assertEqual(categories["X-Cache"], "MISS")
+        self.assertEqual(categories.json()[0]["total_tasks"], 1)
+        self.assertEqual(tags.json()[0]["total_tasks"], 1)
+
+        # No count changes: the tag responses stay cached
+        task.title = "Renamed"
+        task.save()
+        self.assertEqual(self.client.get("/api/tags/")["X-Cache"], "HIT")
+
+        task.tags.clear()
+        tags = self.client.get("/api/tags/")
+        self.assertEqual(tags["X-Cache"], "MISS")
+        self.assertEqual(tags.json()[0]["total_tasks"], 0)
+        self.assertEqual(self.client.get("/api/categories/")["X-Cache"], "HIT")
+
+    def test_category_and_tag_writes_invalidate(self):
+        Tag.objects.create(label="urgent")
+        self.client.get("/api/categories/")
+        self.client.get("/api/tags/")
+
+        self.client.post("/api/categories/", {"name": "Home"}, format="json")
+        self.assertEqual(len(self.client.get("/api/categories/").json()), 1)
+
+        Tag.objects.get().delete()
+        self.assertEqual(self.client.get("/api/tags/").json(), [])
+
+    def test_invalidation_is_repeated_after_commit(self):
+        self.client.get("/api/tags/")
+        with self.captureOnCommitCallbacks() as callbacks:
+            Tag.objects.create(label="urgent")
+        # Cached between the write and the commit, under the new version
+        self.client.get("/api/tags/")
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get("/api/tags/")["X-Cache"], "MISS")
+
+    def test_hit_and_miss_counters(self):
+        self.client.get("/api/tags/")
+        self.client.get("/api/tags/")
+        self.client.get("/api/tags/")
+        self.assertEqual(
+            response_cache.stats(TAG_NAMESPACE),
+            {TAG_NAMESPACE: {"hits": 2, "misses": 1}},
+        )
+
+        self.assertEqual(self.client.get("/api/cache-stats/").status_code, 403)
+        admin = User.objects.create_superuser(email="admin@example.com", password="pw")
+        self.client.force_authenticate(user=admin)
+        stats = self.client.get("/api/cache-stats/").json()["responses"]
+        self.assertEqual(stats[TAG_NAMESPACE], {"hits": 2, "misses": 1})
+        self.assertEqual(stats[CATEGORY_NAMESPACE], {"hits": 0, "misses": 0})
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches = {
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": location,
+                }
+            }
+            with override_settings(CACHES=caches):
+                Category.objects.create(name="Work")
+                self.assertEqual(self.client.get("/api/categories/")["X-Cache"], "MISS")
+                self.assertEqual(self.client.get("/api/categories/")["X-Cache"], "HIT")
+                Category.objects.create(name="Home")
+                response = self.client.get("/api/categories/")
+                self.assertEqual(response["X-Cache"], "MISS")
+                self.assertEqual(len(response.json()), 2)
+
+
+class FastSerializerTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        work = Category.objects.create(name="Work", hex_color="#ff0000")
+        home = Category.objects.create(name="Home", hex_color=None)
+        urgent = Tag.objects.create(label="urgent")
+        later = Tag.objects.create(label="later")
+        self.make_tasks(4, category=work, tags=[urgent, later])
+        self.make_tasks(1, category=home)
+        Task.objects.create(
+            title="Done",
+            description="",
+            status=TaskStatus.DONE.value,
+            due_date=timezone.now() + timedelta(days=2),
+            user=self.user,
+            category=home,
+        ).tags.set([later])
+        self.queryset = (
+            Task.objects.filter(user=self.user)
+            .select_related("user", "category")
+            .prefetch_related("tags")
+        )
+
+    def assertSameBytes(self, data):
+        renderer = JSONRenderer()
+        expected = renderer.render(TaskSerializer(self.queryset, many=True).data)
+        self.assertEqual(renderer.render(data), expected)
+
+    def test_instances_match_task_serializer(self):
+        self.assertSameBytes(serialize_tasks(self.queryset))
+
+    def test_values_match_task_serializer(self):
+        self.assertSameBytes(serialize_task_values(self.queryset))
+
+    def test_non_utc_time_zone(self):
+        with timezone.override("Asia/Phnom_Penh"):
+            self.assertSameBytes(serialize_tasks(self.queryset))
+            self.assertSameBytes(serialize_task_values(self.queryset))
+
+    def test_list_endpoint_output_unchanged(self):
+        response = self.client.get("/api/tasks/?page_size=100")
+        expected = TaskSerializer(
+            self.queryset.order_by("-created_at", "-id"), many=True
+        )
+        self.assertEqual(response.json()["results"], expected.data)
+
+
+class SparseFieldsetTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name="Work")
+        self.tag = Tag.objects.create(label="urgent")
+        self.tasks = self.make_tasks(3, category=self.category, tags=[self.tag])
+
+    def test_lean_list_skips_joins_and_prefetches(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/tasks/?fields=id,title,status,due_date")
+        self.assertEqual(response.status_code, 200)
+        row = response.json()["results"][0]
+        self.assertEqual(list(row), ["id", "title", "status", "due_date"])
+
+        # ETag validator + the page, no tag prefetch
+        self.assertEqual(len(queries), 2)
+        sql = queries[1]["sql"]
+        self.assertNotIn("JOIN", sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_relations_are_ids_unless_expanded(self):
+        row = self.client.get("/api/tasks/?fields=id,category,tags").json()["results"][
+            0
+        ]
+        self.assertEqual(row["category"], self.category.pk)
+        self.assertEqual(row["tags"], [self.tag.pk])
+
+        row = self.client.get("/api/tasks/?fields=id&expand=category,tags").json()[
+            "results"
+        ][0]
+        self.assertEqual(list(row), ["id", "category", "tags"])
+        self.assertEqual(row["category"]["name"], "Work")
+        self.assertEqual(row["tags"][0]["label"], "urgent")
+
+    def test_retrieve_matches_list(self):
+        query = "?fields=id,title,status_label,is_completed,user,category&expand=tags"
+        listed = self.client.get(f"/api/tasks/{query}").json()["results"]
+        task = self.tasks[0]
+        with self.assertNumQueries(2):
+            detail = self.client.get(f"/api/tasks/{task.pk}/{query}").json()
+        self.assertEqual(detail, next(row for row in listed if row["id"] == task.pk))
+        self.assertEqual(detail["user"], self.user.email)
+
+    def test_pagination_and_search_with_fields(self):
+        first = self.client.get("/api/tasks/?fields=id&ordering=due_date&page_size=2")
+        with self.assertNumQueries(2):
+            second = self.client.get(first.json()["next"])
+        ids = [row["id"] for row in first.json()["results"] + second.json()["results"]]
+        self.assertEqual(sorted(ids), sorted(task.pk for task in self.tasks))
+
+        found = self.client.get("/api/tasks/search/?q=task&fields=id,title").json()
+        self.assertEqual(list(found["results"][0]), ["id", "title"])
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get("/api/tasks/?fields=id,secret&expand=user")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"fields", "expand"})
+
+    def test_writes_return_full_representation(self):
+        response = self.client.patch(
+            f"/api/tasks/{self.tasks[0].pk}/?fields=id",
+            {"title": "Renamed"},
+            format="json",
+        )
+        self.assertEqual(response.json()["title"], "Renamed")
+        self.assertIn("category", response.json())
+
+
+class ExportTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name="Work")
+        self.tags = [
+            Tag.objects.create(label="urgent"),
+            Tag.objects.create(label="a,b"),
+        ]
+        self.tasks = self.make_tasks(5, category=self.category, tags=self.tags)
+        self.make_tasks(2, user=self.other_user)
+
+    def export(self, query=""):
+        response = self.client.get(f"/api/tasks/export/{query}")
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response, body = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["id"] for row in rows], [task.pk for task in self.tasks])
+        self.assertEqual(rows[0]["category"], "Work")
+        self.assertEqual(sorted(rows[0]["tags"]), ["a,b", "urgent"])
+
+    def test_csv(self):
+        response, body = self.export("?export_format=csv")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(body.splitlines()))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["description"], "")
+        self.assertEqual(sorted(rows[0]["tags"].split("|")), ["a,b", "urgent"])
+
+    def test_filters_apply(self):
+        Task.objects.filter(pk=self.tasks[0].pk).update(status=TaskStatus.DONE.value)
+        _, body = self.export("?status=done")
+        self.assertEqual(
+            [json.loads(line)["id"] for line in body.splitlines()], [self.tasks[0].pk]
+        )
+
+    def test_tags_are_prefetched_per_chunk(self):
+        # One task query, then one tag query per chunk of two
+        with self.assertNumQueries(4):
+            lines = list(
+                export_lines(export_queryset(self.user), "ndjson", chunk_size=2)
+            )
+        self.assertEqual(len(lines), 5)
+
+    def test_unknown_format(self):
+        self.assertEqual(
+            self.client.get("/api/tasks/export/?export_format=xml").status_code, 400
+        )
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/tasks.csv"
+            call_command(
+                "export_tasks",
+                self.user.email,
+                "--format=csv",
+                f"--output={path}",
+                stderr=StringIO(),
+            )
+            with open(path, encoding="utf-8", newline="") as exported:
+                self.assertEqual(len(list(csv.DictReader(exported))), 5)
+
+        out = StringIO()
+        call_command("export_tasks", self.user.email, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
+
+
+class ImportTests(TaskApiTestCase):
+    def ndjson(self, *rows):
+        return [json.dumps(row) + "\n" for row in rows]
+
+    def test_creates_tasks_and_resolves_names(self):
+        existing = Category.objects.create(name="Work")
+        lines = self.ndjson(
+            {"title": "One", "category": "Work", "tags": ["urgent", "later"]},
+            {"title": "Two", "category": "Home", "tags": ["urgent"], "status": "done"},
+            {"title": "Three", "category": "Home", "due_date": "2030-01-01T09:00:00Z"},
+        )
+        result = TaskImporter(self.user, batch_size=2).run(lines, "ndjson")
+
+        self.assertEqual(
+            (result.imported, result.error_count, result.offset), (3, 0, 3)
+        )
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertEqual(Task.objects.get(title="One").category, existing)
+        home = Category.objects.get(name="Home")
+        self.assertEqual(home.task_count, 2)
+        self.assertEqual(Tag.objects.get(label="urgent").task_count, 2)
+        self.assertIsNotNone(Task.objects.get(title="Two").completed_at)
+
+    def test_names_are_looked_up_once(self):
+        lines = self.ndjson(
+            *({"title": f"T{i}", "category": "Work", "tags": ["a"]} for i in range(6))
+        )
+        importer = TaskImporter(self.user, batch_size=2)
+        importer.run(lines[:2], "ndjson")
+        # Later batches find every name in the cache: no SELECTs or INSERTs
+        # on categories/tags besides the counter UPDATEs
+        with CaptureQueriesContext(connection) as queries:
+            importer.run(lines[2:], "ndjson")
+        lookups = [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith(("SELECT", "INSERT"))
+            and ('"tasks_category"' in q["sql"] or '"tasks_tag"' in q["sql"])
+        ]
+        self.assertEqual(lookups, [])
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        lines = [
+            *self.ndjson({"title": "Good", "category": "Work"}),
+            "{not json\n",
+            *self.ndjson(
+                {"title": "", "category": "Work"},
+                {"title": "No category"},
+                {"title": "Bad status", "category": "Work", "status": "nope"},
+                {"title": "Good too", "category": "Work"},
+            ),
+        ]
+        result = TaskImporter(self.user).run(lines, "ndjson")
+        self.assertEqual(result.imported, 2)
+        self.assertEqual([error.row for error in result.errors], [1, 2, 3, 4])
+        self.assertIn("category", result.errors[2].message)
+
+    def test_resume_from_offset(self):
+        lines = self.ndjson(*({"title": f"T{i}", "category": "Work"} for i in range(5)))
+        result = TaskImporter(self.user).run(lines, "ndjson", start=3)
+        self.assertEqual((result.imported, result.offset), (2, 5))
+        self.assertEqual(
+            sorted(Task.objects.values_list("title", flat=True)), ["T3", "T4"]
+        )
+
+    def test_export_round_trip_through_api(self):
+        self.make_tasks(3, tags=[Tag.objects.create(label="x")])
+        exported = b"".join(
+            self.client.get("/api/tasks/export/?export_format=csv").streaming_content
+        )
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.post(
+            "/api/tasks/import/",
+            {"file": SimpleUploadedFile("tasks.csv", exported), "start": "1"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["imported"], 2)
+        self.assertEqual(response.json()["offset"], 3)
+        imported = Task.objects.filter(user=self.other_user)
+        self.assertEqual(imported.count(), 2)
+        self.assertEqual(Tag.objects.get(label="x").task_count, 5)
+
+    def test_command_with_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/tasks.ndjson"
+            checkpoint = f"{directory}/offset"
+            with open(path, "w", encoding="utf-8") as source:
+                source.writelines(
+                    self.ndjson(
+                        *({"title": f"T{i}", "category": "W"} for i in range(3))
+                    )
+                )
+            with open(checkpoint, "w", encoding="utf-8") as saved:
+                saved.write("1")
+            call_command(
+                "import_tasks",
+                path,
+                f"--user={self.user.email}",
+                f"--checkpoint={checkpoint}",
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+            with open(checkpoint, encoding="utf-8") as saved:
+                self.assertEqual(saved.read(), "3")
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+
+    def test_command_reports_readable_row_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/tasks.ndjson"
+            with open(path, "w", encoding="utf-8") as source:
+                source.writelines(
+                    self.ndjson(
+                        {"category": "W", "status": "bogus"},
+                        {"title": "Fine", "category": "W"},
+                    )
+                )
+                source.write("not json\n")
+            stderr = StringIO()
+            call_command(
+                "import_tasks",
+                path,
+                f"--user={self.user.email}",
+                stdout=StringIO(),
+                stderr=stderr,
+            )
+        self.assertEqual(
+            stderr.getvalue().splitlines(),
+            [
+                "row 0: title: This field is required.;"
+                ' status: "bogus" is not a valid choice.',
+                "row 2: Could not parse row.",
+            ],
+        )
+
+
+class AsyncViewTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        token = Token.objects.create(user=self.user)
+        self.auth = {"headers": {"Authorization": f"Token {token.key}"}}
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.category = Category.objects.create(name="Work")
+        self.tag = Tag.objects.create(label="urgent")
+        self.tasks = self.make_tasks(5, category=self.category, tags=[self.tag])
+        self.make_tasks(2, user=self.other_user)
+
+    async def assertSameAsSync(self, sync_url, async_url):
+        expected = await sync_to_async(self.client.get)(sync_url)
+        response = await self.async_client.get(async_url, **self.auth)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    async def test_task_list_matches_sync_api(self):
+        await self.assertSameAsSync("/api/tasks/", "/api/async/tasks/")
+        await self.assertSameAsSync(
+            "/api/tasks/?fields=id,title&expand=tags",
+            "/api/async/tasks/?fields=id,title&expand=tags",
+        )
+
+    async def test_pagination_and_filters(self):
+        first = await self.async_client.get(
+            "/api/async/tasks/?page_size=2&ordering=due_date", **self.auth
+        )
+        next_url = first.json()["next"].replace("/api/async/", "/api/")
+        # The cursor is interchangeable with the sync endpoint's
+        expected = await sync_to_async(self.client.get)(next_url)
+        second = await self.async_client.get(
+            next_url.replace("/api/", "/api/async/"), **self.auth
+        )
+        self.assertEqual(second.json()["results"], expected.json()["results"])
+        self.assertEqual(len(second.json()["results"]), 2)
+
+        response = await self.async_client.get(
+            "/api/async/tasks/?status=done&count=true", **self.auth
+        )
+        self.assertEqual(response.json()["results"], [])
+        self.assertEqual(response["X-Total-Count"], "0")
+
+    async def test_details(self):
+        pk = self.tasks[0].pk
+        await self.assertSameAsSync(f"/api/tasks/{pk}/", f"/api/async/tasks/{pk}/")
+        await self.assertSameAsSync("/api/categories/", "/api/async/categories/")
+        await self.assertSameAsSync(
+            f"/api/tags/{self.tag.pk}/", f"/api/async/tags/{self.tag.pk}/"
+        )
+        await self.assertSameAsSync("/api/tasks/999999/", "/api/async/tasks/999999/")
+        await self.assertSameAsSync(
+            "/api/categories/999999/", "/api/async/categories/999999/"
+        )
+
+    async def test_other_users_tasks_are_hidden(self):
+        other = await Task.objects.filter(user=self.other_user).afirst()
+        response = await self.async_client.get(
+            f"/api/async/tasks/{other.pk}/", **self.auth
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_authentication_required(self):
+        response = await self.async_client.get("/api/async/tasks/")
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(
+            "/api/async/tasks/", headers={"Authorization": "Token nope"}
+        )
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.post("/api/async/tasks/", **self.auth)
+        self.assertEqual(response.status_code, 405)
+
+
+class TaskSummaryTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.work = Category.objects.create(name="Work")
+        self.home = Category.objects.create(name="Home")
+
+    def summary(self, user=None):
+        return {
+            (row.category_id, row.status, row.day): row.count
+            for row in TaskDailySummary.objects.filter(user=user or self.user)
+        }
+
+    def assertSummaryMatchesRebuild(self):
+        incremental = self.summary()
+        rebuild_summary([self.user.pk])
+        self.assertEqual(incremental, self.summary())
+
+    def test_saves_and_deletes_move_counts(self):
+        today = timezone.localdate()
+        task = Task.objects.create(title="a", user=self.user, category=self.work)
+        Task.objects.create(title="b", user=self.user, category=self.work)
+        self.assertEqual(self.summary(), {(self.work.pk, "init", today): 2})
+
+        task.status = TaskStatus.DONE.value
+        task.category = self.home
+        task.save()
+        self.assertEqual(
+            self.summary(),
+            {(self.work.pk, "init", today): 1, (self.home.pk, "done", today): 1},
+        )
+        # An instance that wasn't loaded from the database
+        Task(
+            pk=task.pk,
+            title="a",
+            user=self.user,
+            category=self.home,
+            status="todo",
+            created_at=task.created_at,
+        ).save()
+        task.refresh_from_db()
+        task.delete()
+        self.assertEqual(self.summary(), {(self.work.pk, "init", today): 1})
+        self.assertSummaryMatchesRebuild()
+
+    def test_bulk_endpoints_keep_the_summary(self):
+        response = self.client.post(
+            "/api/tasks/bulk/",
+            [
+                {"title": f"T{i}", "category_id": self.work.pk, "status": "todo"}
+                for i in range(6)
+            ],
+            format="json",
+        )
+        ids = [task["id"] for task in response.json()]
+        self.client.patch(
+            "/api/tasks/bulk/",
+            [{"id": pk, "status": "done"} for pk in ids[:3]],
+            format="json",
+        )
+        self.client.delete("/api/tasks/bulk/", {"ids": ids[2:4]}, format="json")
+        today = timezone.localdate()
+        self.assertEqual(
+            self.summary(),
+            {(self.work.pk, "done", today): 2, (self.work.pk, "todo", today): 2},
+        )
+        self.assertSummaryMatchesRebuild()
+
+    def test_stats_endpoint(self):
+        now = timezone.now()
+        for i in range(3):
+            Task.objects.create(
+                title=f"done {i}", user=self.user, category=self.work, status="done"
+            )
+        Task.objects.create(
+            title="late",
+            user=self.user,
+            category=self.home,
+            status="todo",
+            due_date=now - timedelta(days=1),
+        )
+        Task.objects.create(title="open", user=self.user, category=self.work)
+        self.make_tasks(2, user=self.other_user, category=self.work)
+        # A task completed two days ago (local days)
+        old = Task.objects.create(
+            title="old", user=self.user, category=self.home, status="done"
+        )
+        Task.objects.filter(pk=old.pk).update(completed_at=now - timedelta(days=2))
+        rebuild_summary([self.user.pk])
+
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/tasks/stats/?days=7")
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()
+        self.assertEqual(stats["total"], 6)
+        self.assertEqual(stats["by_status"]["done"], 4)
+        self.assertEqual(stats["by_status"]["cancelled"], 0)
+        self.assertEqual(stats["overdue"], 1)
+        self.assertEqual(
+            [(c["name"], c["total"], c["done"]) for c in stats["categories"]],
+            [("Home", 2, 1), ("Work", 4, 3)],
+        )
+        self.assertEqual(stats["categories"][1]["completion_rate"], 0.75)
+        per_day = stats["completed_per_day"]
+        self.assertEqual(len(per_day), 7)
+        self.assertEqual(
+            per_day[-1], {"day": timezone.localdate().isoformat(), "count": 3}
+        )
+        self.assertEqual(per_day[-3]["count"], 1)
+
+        self.assertEqual(self.client.get("/api/tasks/stats/?days=0").status_code, 400)
+
+    def test_rebuild_command(self):
+        self.make_tasks(3, category=self.work)
+        TaskDailySummary.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_task_summary", "--batch-size", "1", stdout=out)
+        self.assertIn("Rebuilt 1 summary rows for 2 users", out.getvalue())
+        self.assertEqual(
+            self.summary(), {(self.work.pk, "init", timezone.localdate()): 3}
+        )
+
+
+class ServerTimingTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.make_tasks(3, tags=[Tag.objects.create(label="urgent")])
+
+    def timings(self, response):
+        metrics = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, *params = metric.split(";")
+            metrics[name] = dict(param.split("=", 1) for param in params)
+        return metrics
+
+    def test_header_reports_queries_and_spans(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/tasks/")
+        metrics = self.timings(response)
+        self.assertEqual(list(metrics), ["db", "serialize", "render", "total"])
+        self.assertEqual(metrics["db"]["desc"], f'"{len(queries)} queries"')
+        self.assertGreaterEqual(
+            float(metrics["total"]["dur"]), float(metrics["render"]["dur"])
+        )
+
+        # The DRF serializer path too
+        task = Task.objects.filter(user=self.user).first()
+        response = self.client.get(f"/api/tasks/{task.pk}/")
+        self.assertIn("serialize", self.timings(response))
+
+    @override_settings(SERVER_TIMING_LOG_SAMPLE_RATE=1)
+    def test_sampled_log_lines_name_the_view(self):
+        with self.assertLogs("DjangoY4.timing", "INFO") as logs:
+            self.client.get("/api/tasks/")
+            self.client.get("/api/categories/")
+        records = [json.loads(record.getMessage()) for record in logs.records]
+        self.assertEqual(
+            [record["view"] for record in records], ["task-list", "category-list"]
+        )
+        self.assertEqual(records[0]["status"], 200)
+        self.assertIn("serialize_ms", records[0])
+        self.assertGreater(records[0]["db_queries"], 0)
+
+    @override_settings(SERVER_TIMING_LOG_SAMPLE_RATE=0)
+    def test_only_slow_requests_are_logged_when_unsampled(self):
+        with self.assertNoLogs("DjangoY4.timing"):
+            self.client.get("/api/tasks/")
+        with self.settings(SERVER_TIMING_LOG_SLOW_MS=0):
+            with self.assertLogs("DjangoY4.timing", "WARNING"):
+                self.client.get("/api/tasks/")
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_turned_off(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/tasks/"))
+
+    async def test_async_views(self):
+        token = await Token.objects.acreate(user=self.user)
+        response = await self.async_client.get(
+            "/api/async/tasks/", headers={"Authorization": f"Token {token.key}"}
+        )
+        metrics = self.timings(response)
+        self.assertNotEqual(metrics["db"]["desc"], '"0 queries"')
+        self.assertIn("serialize", metrics)
+        self.assertIn("render", metrics)
+
+    async def test_concurrent_async_requests_are_counted_apart(self):
+        token = await Token.objects.acreate(user=self.user)
+        category = await Category.objects.afirst()
+        headers = {"Authorization": f"Token {token.key}"}
+        urls = ["/api/async/tasks/", f"/api/async/categories/{category.pk}/"]
+
+        async def queries(url):
+            response = await self.async_client.get(url, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            return self.timings(response)["db"]["desc"]
+
+        # One at a time first (this also warms the token cache)
+        for url in urls:
+            await queries(url)
+        alone = [await queries(url) for url in urls]
+        # Interleaved on the same connection
+        together = await asyncio.gather(*(queries(url) for url in urls * 5))
+        self.assertEqual(together, alone * 5)
+
+
+class BenchmarkBaselineTests(TestCase):
+    def test_flags_metrics_worse_than_the_threshold(self):
+        baseline = {
+            "task-list": {"p50_ms": 10.0, "p95_ms": 20.0, "requests_per_second": 100},
+            "login": {"p50_ms": 500.0, "p95_ms": 600.0, "requests_per_second": 2},
+        }
+        results = {
+            # Slower p95 and fewer requests per second
+            "task-list": {"p50_ms": 11.0, "p95_ms": 30.0, "requests_per_second": 70},
+            "tag-list": {"p50_ms": 1.0, "p95_ms": 2.0, "requests_per_second": 900},
+        }
+        rows = compare_to_baseline(results, baseline, threshold=0.2)
+        self.assertEqual(
+            [(scenario, metric, regressed) for scenario, metric, *_, regressed in rows],
+            [
+                ("task-list", "p50_ms", False),
+                ("task-list", "p95_ms", True),
+                ("task-list", "requests_per_second", True),
+            ],
+        )
+        self.assertAlmostEqual(rows[1][4], 0.5)
+        # Faster is never a regression
+        faster = {
+            "task-list": {"p50_ms": 1.0, "p95_ms": 2.0, "requests_per_second": 999}
+        }
+        self.assertFalse(
+            any(row[5] for row in compare_to_baseline(faster, baseline, 0))
+        )
+
+
+class DatabaseSettingsTests(TestCase):
+    def test_connections_are_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone()[0], -64000)
+
+    def test_replica_router(self):
+        router = ReadReplicaRouter()
+        self.assertEqual(router.db_for_write(Task), "default")
+        self.assertIsNone(router.db_for_read(User))
+        # TestCase wraps every test in a transaction
+        self.assertEqual(router.db_for_read(Task), "default")
+        atomic = connection.in_atomic_block
+        try:
+            connection.in_atomic_block = False
+            self.assertEqual(router.db_for_read(Task), "replica")
+        finally:
+            connection.in_atomic_block = atomic
+        self.assertFalse(router.allow_migrate("replica", "tasks"))
+        self.assertIsNone(router.allow_migrate("default", "tasks"))
+
+
+class BenchApiCommandTests(SimpleTestCase):
+    def test_concurrent_writes_on_the_scratch_database(self):
+        # A separate process: the scratch database replaces the test one
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "results.json"
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    "manage.py",
+                    "bench_api",
+                    "--users=1",
+                    "--tasks=50",
+                    "--requests=40",
+                    "--warmup=0",
+                    "--concurrency=2",
+                    "--scenario=task-create",
+                    f"--output={output}",
+                ],
+                cwd=Path(__file__).resolve().parent.parent,
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(completed.returncode, 0, completed.stderr)
+            results = json.loads(output.read_text())["results"]
+        self.assertEqual(list(results), ["task-create"])
+        self.assertEqual(results["task-create"]["requests"], 40)
@@ -1,7 +1,11 @@
 # your_app_name/urls.py (e.g., 'tasks_app/urls.py')
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from . import views  # Make sure this imports your new views.py with ViewSets
+from . import (
+    async_views,
+    views,
+)  # Make sure this imports your new views.py with ViewSets
 
 # Create a router instance
 router = DefaultRouter()
@@ -16,4 +20,17 @@ router.register(r"categories", views.CategoryViewSet, basename="category")
 router.register(r"tags", views.TagViewSet, basename="tag")
 
 # The router generates all the necessary URL patterns for you
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("cache-stats/", views.CacheStatsView.as_view(), name="cache-stats"),
+    # Async-native reads for the ASGI deployment (tasks/async_views.py)
+    path("async/tasks/", async_views.task_list, name="async-task-list"),
+    path("async/tasks/<int:pk>/", async_views.task_detail, name="async-task-detail"),
+    path("async/categories/", async_views.category_list, name="async-category-list"),
+    path(
+        "async/categories/<int:pk>/",
+        async_views.category_detail,
+        name="async-category-detail",
+    ),
+    path("async/tags/", async_views.tag_list, name="async-tag-list"),
+    path("async/tags/<int:pk>/", async_views.tag_detail, name="async-tag-detail"),
+]
@@ -1,32 +1,96 @@
 # your_app_name/views.py
-from rest_framework import authentication, permissions, viewsets
+import io
+
+from django.http import StreamingHttpResponse
+from rest_framework import authentication, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from accounts.authentication import CachedTokenAuthentication, token_cache_stats
+
+from .bulk import delete_tasks
+from .cache import (
+    CATEGORY_NAMESPACE,
+    TAG_NAMESPACE,
+    CachedResponseMixin,
+    response_cache,
+)
+from .conditional import ConditionalListMixin, aggregate_validator, task_list_validators
+from .export import EXPORT_FORMATS, export_lines, export_queryset
+from .fast_serializers import FastTaskListMixin, serialize_tasks
+from .fieldsets import apply_fieldset, parse_fieldset
+from .filters import TaskFilterBackend
+from .importer import IMPORT_FORMATS, TaskImporter
 
 # Import all your models
 from .models import Category, Tag, Task
+from .pagination import TaskCursorPagination
+from .search import search_task_ids
 
 # Import all your serializers
 from .serializers import CategorySerializer, TagSerializer, TaskSerializer
+from .summary import task_stats
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalListMixin, FastTaskListMixin, viewsets.ModelViewSet):
     """
     A ViewSet for viewing and editing Task instances.
     Provides 'list', 'create', 'retrieve', 'update', 'partial_update', 'destroy' actions.
     """
 
+    # Writes and detail views; list and search render with serialize_tasks()
     serializer_class = TaskSerializer
+    # Keyset pagination on (created_at, id): constant cost however deep the page
+    pagination_class = TaskCursorPagination
+    # ?status=, ?category=, ?due_before=, ?overdue=... (ordering is handled
+    # by the paginator so the cursor follows it)
+    filter_backends = [TaskFilterBackend]
     authentication_classes = [
         authentication.SessionAuthentication,
-        authentication.TokenAuthentication,
+        CachedTokenAuthentication,
     ]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         """
         Ensures that a user can only see and manage their own tasks.
+
+        Related objects are loaded up front so serializing a page costs a
+        fixed number of queries: one for the tasks (joined with their user
+        and category) and one for their tags. Counts come from the
+        denormalized task_count columns. Reads with ?fields= load only
+        what those fields need (see tasks/fieldsets.py).
         """
         # Filter tasks based on the authenticated user
-        return Task.objects.filter(user=self.request.user).order_by("-created_at")
+        queryset = Task.objects.filter(user=self.request.user).order_by("-created_at")
+        # The paginator reads the cursor position from the ordering fields
+        return apply_fieldset(
+            queryset,
+            self.get_fieldset(),
+            always=TaskCursorPagination.ordering_fields,
+        )
+
+    def get_fieldset(self):
+        # Writes always load (and return) the full task
+        if self.request.method not in permissions.SAFE_METHODS:
+            return None
+        if not hasattr(self, "_fieldset"):
+            self._fieldset = parse_fieldset(self.request.query_params)
+        return self._fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fieldset"] = self.get_fieldset()
+        return context
+
+    def get_list_validators(self):
+        return task_list_validators(self.request.user)
+
+    def list_depends_on_time(self):
+        return TaskFilterBackend.depends_on_time(self.request.query_params)
 
     def perform_create(self, serializer):
         """
@@ -35,30 +99,206 @@ class TaskViewSet(viewsets.ModelViewSet):
         """
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Creates many tasks in one transaction.
+        POST /api/tasks/bulk/ with a JSON list of task payloads.
+        """
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        tasks = serializer.save(user=request.user)
+        return Response(
+            self.serialize_bulk_result(tasks), status=status.HTTP_201_CREATED
+        )
+
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """
+        Partially updates many tasks in one transaction.
+        PATCH /api/tasks/bulk/ with a JSON list of {"id": ..., <fields>}.
+        """
+        ids = [
+            item.get("id")
+            for item in (request.data if isinstance(request.data, list) else [])
+            if isinstance(item, dict)
+        ]
+        # Only the user's own tasks can be addressed
+        instances = Task.objects.filter(user=request.user).in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+        serializer = self.get_serializer(
+            instances, data=request.data, many=True, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        tasks = serializer.save()
+        return Response(self.serialize_bulk_result(tasks))
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        """
+        Deletes many tasks in one transaction.
+        DELETE /api/tasks/bulk/ with {"ids": [...]}.
+        """
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not all(
+            isinstance(pk, int) and not isinstance(pk, bool) for pk in ids
+        ):
+            raise ValidationError({"ids": ["Expected a list of task ids."]})
+        deleted = delete_tasks(Task.objects.filter(user=request.user, pk__in=ids))
+        return Response({"deleted": deleted})
+
+    def serialize_bulk_result(self, tasks):
+        # Re-read with the list queryset so relations load in fixed queries
+        loaded = self.get_queryset().in_bulk([task.pk for task in tasks])
+        return self.get_serializer([loaded[task.pk] for task in tasks], many=True).data
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        Full-text search over the user's task titles and descriptions.
+        GET /api/tasks/search/?q=<text>[&limit=20&offset=0]
+        Results are ranked by bm25, best match first.
+        """
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": ["This query parameter is required."]})
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), 100)
+            offset = max(int(request.query_params.get("offset", 0)), 0)
+        except ValueError:
+            raise ValidationError({"limit": ["limit and offset must be integers."]})
 
-class CategoryViewSet(viewsets.ModelViewSet):
+        # Ask for one extra id to know whether there is a next page
+        ids = search_task_ids(text, user=request.user, limit=limit + 1, offset=offset)
+        has_next = len(ids) > limit
+        ids = ids[:limit]
+        tasks = self.get_queryset().in_bulk(ids)
+        results = serialize_tasks(
+            [tasks[pk] for pk in ids if pk in tasks], self.get_fieldset()
+        )
+
+        next_url = None
+        if has_next:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "offset", offset + limit
+            )
+        return Response({"next": next_url, "results": results})
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Streams all of the user's tasks (narrowed by the list filters) with
+        their category name and tag labels.
+        GET /api/tasks/export/?export_format=ndjson|csv
+        (not ?format=, which DRF reserves for picking a renderer)
+        """
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {"export_format": [f"Choices are: {', '.join(EXPORT_FORMATS)}."]}
+            )
+        content_type, _, extension = EXPORT_FORMATS[export_format]
+        queryset = self.filter_queryset(export_queryset(request.user))
+        response = StreamingHttpResponse(
+            export_lines(queryset, export_format), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="tasks.{extension}"'
+        return response
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        """
+        Dashboard numbers for the user: task counts by status, overdue
+        count, completion rate per category and tasks completed per day.
+        GET /api/tasks/stats/?days=30 (1-365 days of completions)
+        """
+        try:
+            days = int(request.query_params.get("days", 30))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= 365:
+            raise ValidationError({"days": ["Must be an integer from 1 to 365."]})
+        return Response(task_stats(request.user, days=days))
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_tasks(self, request):
+        """
+        Imports tasks from an uploaded NDJSON or CSV file (multipart field
+        "file"), in the layout the export writes. Bad rows are reported,
+        not fatal. POST /api/tasks/import/ with optional import_format
+        (default: from the file name) and start (rows to skip).
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["No file was submitted."]})
+        import_format = request.data.get("import_format") or (
+            "csv" if upload.name.lower().endswith(".csv") else "ndjson"
+        )
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError(
+                {"import_format": [f"Choices are: {', '.join(IMPORT_FORMATS)}."]}
+            )
+        try:
+            start = max(0, int(request.data.get("start") or 0))
+        except ValueError:
+            raise ValidationError({"start": ["A valid integer is required."]})
+
+        # Decoded line by line; large uploads are read from their temp file
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+        result = TaskImporter(request.user).run(lines, import_format, start=start)
+        return Response(result.as_dict())
+
+
+class CategoryViewSet(ConditionalListMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     A ViewSet for viewing and editing Category instances.
     """
 
+    # total_tasks reads the denormalized task_count column, no extra queries
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    # list/retrieve are served from the response cache (see tasks/cache.py)
+    cache_namespace = CATEGORY_NAMESPACE
     authentication_classes = [
         authentication.SessionAuthentication,
-        authentication.TokenAuthentication,
+        CachedTokenAuthentication,
     ]
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_list_validators(self):
+        return [aggregate_validator(Category.objects.all())]
 
-class TagViewSet(viewsets.ModelViewSet):
+
+class TagViewSet(ConditionalListMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     A ViewSet for viewing and editing Tag instances.
     """
 
+    # total_tasks reads the denormalized task_count column, no extra queries
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    # list/retrieve are served from the response cache (see tasks/cache.py)
+    cache_namespace = TAG_NAMESPACE
     authentication_classes = [
         authentication.SessionAuthentication,
-        authentication.TokenAuthentication,
+        CachedTokenAuthentication,
     ]
     permission_classes = [permissions.IsAuthenticated]
+
+    def get_list_validators(self):
+        return [aggregate_validator(Tag.objects.all())]
+
+
+class CacheStatsView(APIView):
+    """Hit and miss counters of the response and token caches."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "responses": response_cache.stats(CATEGORY_NAMESPACE, TAG_NAMESPACE),
+                "tokens": token_cache_stats(),
+            }
+        )